@@ -0,0 +1,31 @@
+import logging
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis: Optional[Redis] = None
+
+
+async def init_cache() -> Optional[Redis]:
+    """Подключить Redis (вызывается из lifespan). Без Redis API работает, просто без кэша."""
+    global _redis
+    try:
+        client = Redis.from_url(settings.redis_url, decode_responses=True)
+        await client.ping()
+        _redis = client
+        logger.info("Redis cache OK (%s)", settings.redis_url)
+    except Exception as e:
+        logger.warning("Redis not available, API cache disabled: %s", e)
+        _redis = None
+    return _redis
+
+
+async def close_cache() -> None:
+    global _redis
+    if _redis:
+        await _redis.close()
+    _redis = None
@@ -1,31 +1,99 @@
+import logging
+import time
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from db.pool import InstrumentedPool, instrument_engine
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
+POOL_OPTIONS = dict(
+    poolclass=InstrumentedPool,
     pool_pre_ping=True,
-    pool_recycle=280,
-    pool_size=5,
-    max_overflow=5,
+    pool_recycle=settings.db_pool_recycle,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
 )
 
+engine = create_async_engine(settings.database_url, echo=settings.debug, **POOL_OPTIONS)
+instrument_engine(engine, "primary", settings.db_pool_slow_checkout_ms)
+
 Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Реплика для чтения (READ_DATABASE_URL); может указывать и на ту же БД
+read_engine = create_async_engine(settings.replica_url, echo=settings.debug, **POOL_OPTIONS) if settings.replica_url else None
+if read_engine:
+    instrument_engine(read_engine, "replica", settings.db_pool_slow_checkout_ms)
+
+ReadSession = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False) if read_engine else None
+
+# Отставание реплики в секундах: 0, если это не реплика или всё полученное WAL уже применено
+# (иначе на простаивающей основной БД время последнего применения растёт без отставания)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+_replica_checked_at = 0.0
+_replica_usable = False
+
 
 async def get_session() -> AsyncSession:
     async with Session() as session:
         yield session
 
 
+async def replica_usable() -> bool:
+    """True if the replica is configured, reachable and lags less than REPLICA_MAX_LAG_SECONDS.
+
+    The check runs at most every REPLICA_CHECK_INTERVAL seconds; requests in between use the last result.
+    """
+    global _replica_checked_at, _replica_usable
+    if not read_engine:
+        return False
+    now = time.monotonic()
+    if now - _replica_checked_at < settings.replica_check_interval:
+        return _replica_usable
+    _replica_checked_at = now
+    try:
+        async with read_engine.connect() as conn:
+            lag = await conn.scalar(REPLICA_LAG_SQL)
+        usable = lag is not None and lag <= settings.replica_max_lag_seconds
+        if not usable:
+            logger.warning("Read replica lags %s s, reading from primary", lag)
+    except Exception as e:
+        logger.warning("Read replica unavailable, reading from primary: %s", e)
+        usable = False
+    _replica_usable = usable
+    return usable
+
+
+async def get_read_session(recent_write: bool = False) -> AsyncSession:
+    """Session on the replica when it is usable and the client has not written recently, else on the primary"""
+    factory = ReadSession if not recent_write and await replica_usable() else Session
+    async with factory() as session:
+        yield session
+
+
 async def init_db():
-    from db.models import Base
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    from db.migrate import upgrade_database
+    from bot.services.rollup_service import RollupService
+    from bot.services.activity_service import ActivityService
+    await upgrade_database(engine)
+    # Первый запуск с rollup-таблицами статистики: заполнить их из уже существующих данных
+    async with Session() as session:
+        rollups = RollupService(session)
+        if await rollups.needs_backfill():
+            await rollups.rebuild()
+        activity = ActivityService(session)
+        if await activity.needs_backfill():
+            await activity.rebuild()
@@ -1,8 +1,12 @@
+import time
 from typing import AsyncGenerator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .database import get_session
+from .database import get_session, get_read_session
+
+# Cookie с временем (unix), до которого клиент читает с основной БД (см. middleware в main.py)
+READ_YOUR_WRITES_COOKIE = "primary_until"
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -14,6 +18,19 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get read-only database session (replica if configured and fresh, see get_read_session)"""
+    try:
+        primary_until = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    async for session in get_read_session(recent_write=time.time() < primary_until):
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def get_current_admin(db: AsyncSession = Depends(get_db)) -> dict:
     """Get current admin user (simplified for demo)"""
     # In production, implement proper JWT authentication
@@ -0,0 +1,52 @@
+"""Условные GET для списков: слабый ETag из счётчиков версий таблиц и параметров запроса.
+
+Зависимость conditional_get(...) подключается в dependencies маршрута, поэтому
+выполняется раньше сессии БД: при совпадении If-None-Match ответ 304 уходит
+без запроса к Postgres. Заголовок ETag к ответу 200 добавляет middleware в main.py.
+"""
+import hashlib
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from .config import settings
+from bot.services.table_versions import get_versions
+
+
+ETAG_STATE = "etag"  # request.state: ETag текущего ответа
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Слабое сравнение (RFC 9110): W/ не учитывается
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def conditional_get(*tables: str):
+    """Dependency: weak ETag from the versions of `tables`; 304 when If-None-Match matches"""
+
+    async def dependency(request: Request) -> None:
+        versions = await get_versions(tables)
+        if versions is None:
+            return
+        if settings.replica_url:
+            # Реплика может ещё не содержать последнюю запись — пока не истёк допустимый лаг, не кэшируем
+            last_change = max(versions[f"{table}:at"] for table in tables)
+            if time.time() - last_change < settings.replica_max_lag_seconds:
+                return
+        key = "|".join([
+            request.url.path,
+            "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items())),
+            *(f"{table}:{versions[table]}" for table in tables),
+        ])
+        etag = f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+        if _matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        setattr(request.state, ETAG_STATE, etag)
+
+    return dependency
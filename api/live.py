@@ -0,0 +1,115 @@
+"""Живая лента заказов (GET /orders/stream, Server-Sent Events).
+
+Процесс API держит одну подписку Redis на ORDER_EVENTS_CHANNEL и раскладывает
+события по ограниченным очередям клиентов. Клиент, который не успевает читать
+(очередь заполнена), получает событие resync и отключается: EventSource
+переподключается сам, а дашборд перечитывает список. Тот же resync получают все
+клиенты после обрыва подписки — события за это время могли потеряться.
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Optional, Set
+
+from bot.services.order_events import ORDER_EVENTS_CHANNEL
+
+
+logger = logging.getLogger(__name__)
+
+CLIENT_QUEUE_SIZE = 100  # событий на клиента; больше — клиент считается медленным
+HEARTBEAT_SECONDS = 15  # комментарий-пинг держит соединение через nginx (proxy_read_timeout 30s)
+RECONNECT_DELAY = 1.0  # секунд между попытками переподписаться
+CLIENT_RETRY_MS = 3000  # поле retry: пауза EventSource перед переподключением
+RESYNC = '{"type":"resync"}'
+
+
+class OrderFeed:
+    """One Redis subscription per API process, fanned out to SSE clients"""
+
+    def __init__(self):
+        self._clients: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, redis_client) -> None:
+        """Subscribe in the background (lifespan); without Redis the feed stays off"""
+        if redis_client and not self.running:
+            self._task = asyncio.create_task(self._listen(redis_client))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in list(self._clients):
+            self._close(queue)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._clients.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._clients.discard(queue)
+
+    async def _listen(self, redis_client) -> None:
+        lost = False
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(ORDER_EVENTS_CHANNEL)
+                if lost:
+                    self._broadcast(RESYNC)
+                    lost = False
+                async for message in pubsub.listen():
+                    self._broadcast(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not lost:
+                    logger.warning("Order feed subscription lost, resubscribing: %s", e)
+                lost = True
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                await pubsub.close()
+
+    def _broadcast(self, payload: str) -> None:
+        for queue in list(self._clients):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                logger.info("Order feed client too slow, disconnecting")
+                self._close(queue)
+
+    def _close(self, queue: asyncio.Queue) -> None:
+        # Очередь очищается: клиент получит только resync и конец потока
+        self._clients.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+        queue.put_nowait(None)
+
+
+order_feed = OrderFeed()
+
+
+async def event_stream(queue: asyncio.Queue) -> AsyncIterator[str]:
+    """SSE frames for one client; ends after a resync caused by overflow or shutdown"""
+    try:
+        yield f"retry: {CLIENT_RETRY_MS}\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if payload is None:
+                return
+            yield f"data: {payload}\n\n"
+    finally:
+        order_feed.unsubscribe(queue)
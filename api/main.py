@@ -1,12 +1,22 @@
 import logging
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from .config import settings
-from .database import init_db, engine
-from .routes import orders_router, suppliers_router, filters_router, stats_router, activity_router
+from .database import init_db, engine, Session
+from .cache import init_cache, close_cache
+from .dependencies import READ_YOUR_WRITES_COOKIE, get_current_admin
+from .etag import ETAG_STATE
+from .live import order_feed
+from db.pool import pool_snapshot
+from bot.services.stats_service import set_redis as set_stats_redis
+from bot.services.table_versions import set_redis as set_versions_redis
+from bot.services.order_events import set_redis as set_events_redis
+from bot.services.activity_service import start_activity_sink, stop_activity_sink
+from .routes import orders_router, suppliers_router, filters_router, stats_router, activity_router, search_router
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +32,16 @@ async def lifespan(app: FastAPI):
         await init_db()
     except Exception as e:
         logger.error("Database connection failed: %s — check POSTGRES_HOST, POSTGRES_PASSWORD, volume", e)
+    redis_client = await init_cache()
+    set_stats_redis(redis_client)
+    set_versions_redis(redis_client)
+    set_events_redis(redis_client)
+    order_feed.start(redis_client)
+    start_activity_sink(Session)
     yield
+    await order_feed.stop()
+    await stop_activity_sink()
+    await close_cache()
 
 
 # Create FastAPI app (redirect_slashes=False чтобы дашборд за /api/* не получал 307 на путь без /api/)
@@ -32,6 +51,7 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan,
     redirect_slashes=False,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -43,12 +63,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """После успешного изменения клиент READ_YOUR_WRITES_SECONDS читает с основной БД, а не с реплики"""
+    response = await call_next(request)
+    if settings.replica_url and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        window = settings.read_your_writes_seconds
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE, str(int(time.time()) + window), max_age=window, httponly=True, samesite="lax"
+        )
+    return response
+
+
+@app.middleware("http")
+async def etag_header(request: Request, call_next):
+    """ETag, посчитанный зависимостью conditional_get, — в заголовок успешного ответа"""
+    response = await call_next(request)
+    etag = getattr(request.state, ETAG_STATE, None)
+    if etag and response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"  # браузер переспрашивает с If-None-Match
+    return response
+
+
 # Include routers
 app.include_router(orders_router)
 app.include_router(suppliers_router)
 app.include_router(filters_router)
 app.include_router(stats_router)
 app.include_router(activity_router)
+app.include_router(search_router)
 
 
 @app.get("/")
@@ -85,6 +129,12 @@ async def ready_check():
         )
 
 
+@app.get("/debug/pool")
+async def debug_pool(reset: bool = False, current_user: dict = Depends(get_current_admin)):
+    """Метрики пулов соединений процесса (ожидание выдачи, занятые, overflow, возраст). reset=true — начать новое окно."""
+    return pool_snapshot(reset=reset)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
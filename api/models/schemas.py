@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 
 
 # Supplier schemas
@@ -131,9 +131,37 @@ class OrderListResponse(OrderBase):
 
 
 class OrderListPaginatedResponse(BaseModel):
-    """Ответ списка заказов с пагинацией."""
+    """Ответ списка заказов с пагинацией (total — оценка, если total_exact=false)."""
     items: List[OrderListResponse]
     total: int
+    total_exact: bool = True
+    next_cursor: Optional[str] = None
+
+
+class OrderSearchResponse(BaseModel):
+    """Результаты поиска по тексту, лучшие совпадения первыми; next_cursor — следующая страница."""
+    items: List[OrderListResponse]
+    next_cursor: Optional[str] = None
+
+
+class OrderBulkAction(BaseModel):
+    """Одно действие над выбранными заказами; supplier_id нужен только для reassign."""
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
+    action: Literal["delete", "cancel", "complete", "reassign"]
+    supplier_id: Optional[int] = None
+
+
+class OrderBulkResult(BaseModel):
+    id: str
+    ok: bool
+    detail: Optional[str] = None
+
+
+class OrderBulkResponse(BaseModel):
+    """Результат по каждому ID в порядке запроса; processed — сколько заказов изменено."""
+    action: str
+    processed: int
+    results: List[OrderBulkResult]
 
 
 class SupplierListPaginatedResponse(BaseModel):
@@ -179,6 +207,14 @@ class ActivityLogResponse(ActivityLogBase):
         from_attributes = True
 
 
+class ActivityLogPaginatedResponse(BaseModel):
+    """Журнал действий с курсорной пагинацией."""
+    items: List[ActivityLogResponse]
+    total: int
+    total_exact: bool = True
+    next_cursor: Optional[str] = None
+
+
 # Stats schemas
 class OrderStats(BaseModel):
     total: int
@@ -200,5 +236,66 @@ class StatsResponse(BaseModel):
     period: str
 
 
+class StatusCount(BaseModel):
+    status: str
+    count: int
+
+
+class DailyCount(BaseModel):
+    date: str
+    count: int
+
+
+class StatsSummaryResponse(BaseModel):
+    """Сводка для главной панели дашборда (один запрос вместо трёх)."""
+    period: str
+    orders: OrderStats
+    suppliers: SupplierStats
+    status_distribution: List[StatusCount]
+    daily: List[DailyCount]
+
+
+class LatencyPercentiles(BaseModel):
+    """Перцентили задержки в секундах (None, если в окне нет замеров)."""
+    count: int
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+
+class SupplierLatency(LatencyPercentiles):
+    supplier_id: int
+    name: Optional[str] = None
+
+
+class LatencyMetric(BaseModel):
+    overall: LatencyPercentiles
+    suppliers: List[SupplierLatency]
+
+
+class LatencyResponse(BaseModel):
+    """Время до принятия (от назначения) и до выполнения (от создания) заказа."""
+    hours: int
+    since: datetime
+    accept: LatencyMetric
+    complete: LatencyMetric
+
+
+class SearchHit(BaseModel):
+    """Совпадение полнотекстового поиска: текст заказа или сообщение по заказу."""
+    order_id: str
+    message_id: Optional[int] = None
+    source: str  # order, message
+    rank: float
+    created_at: Optional[datetime] = None
+    status: Optional[str] = None
+    snippet: str  # ts_headline, совпадения выделены <b>…</b>
+
+
+class SearchResponse(BaseModel):
+    query: str
+    items: List[SearchHit]
+
+
 # Update forward references
 OrderResponse.model_rebuild()
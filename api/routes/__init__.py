@@ -3,5 +3,6 @@ from .suppliers import router as suppliers_router
 from .filters import router as filters_router
 from .stats import router as stats_router
 from .activity import router as activity_router
+from .search import router as search_router
 
-__all__ = ["orders_router", "suppliers_router", "filters_router", "stats_router", "activity_router"]
+__all__ = ["orders_router", "suppliers_router", "filters_router", "stats_router", "activity_router", "search_router"]
@@ -1,79 +1,78 @@
+from datetime import datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc
 
-from ..dependencies import get_db, get_current_admin
-from ..models.schemas import ActivityLogResponse
+from ..dependencies import get_read_db, get_current_admin
+from ..models.schemas import ActivityLogResponse, ActivityLogPaginatedResponse
 from db.models import ActivityLog
+from bot.services import ActivityService
+from bot.services.pagination import count_total, created_before, next_created_cursor
 
 
 router = APIRouter(prefix="/activity", tags=["activity"])
 
 
-@router.get("/", response_model=List[ActivityLogResponse])
+@router.get("/", response_model=ActivityLogPaginatedResponse)
 async def get_activity_logs(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
     user_id: Optional[int] = Query(None),
     action: Optional[str] = Query(None),
     hours: Optional[int] = Query(None, ge=1, le=168),  # Max 1 week
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_admin)
 ):
-    """Get activity logs with filtering"""
-    
-    # Build base query
-    query = select(ActivityLog).order_by(desc(ActivityLog.created_at))
-    
-    # Apply filters
+    """Get activity logs with filtering, newest first (keyset via `cursor`, see GET /orders/)"""
+    conditions = []
     if user_id:
-        query = query.where(ActivityLog.user_id == user_id)
-    
+        conditions.append(ActivityLog.user_id == user_id)
     if action:
-        query = query.where(ActivityLog.action == action)
-    
+        conditions.append(ActivityLog.action == action)
     if hours:
-        from datetime import datetime, timedelta
         start_date = datetime.utcnow() - timedelta(hours=hours)
-        query = query.where(ActivityLog.created_at >= start_date)
-    
-    # Apply pagination
-    query = query.offset(skip).limit(limit)
-    
+        conditions.append(ActivityLog.created_at >= start_date)
+
+    total, total_exact = await count_total(db, select(ActivityLog.id).where(*conditions), exact=include_total)
+
+    query = select(ActivityLog).where(*conditions)
+    if cursor:
+        try:
+            query = query.where(created_before(ActivityLog.created_at, ActivityLog.id, cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    else:
+        query = query.offset(skip)
+    query = query.order_by(desc(ActivityLog.created_at), desc(ActivityLog.id)).limit(limit + 1)
     result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    return logs
+    logs, next_cursor = next_created_cursor(result.scalars().all(), limit)
+
+    return {"items": logs, "total": total, "total_exact": total_exact, "next_cursor": next_cursor}
 
 
 @router.get("/actions")
 async def get_available_actions(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_admin)
 ):
-    """Get list of available activity actions"""
-    
-    # Get distinct actions
-    result = await db.execute(
-        select(ActivityLog.action).distinct().order_by(ActivityLog.action)
-    )
-    actions = result.scalars().all()
-    
-    return {"actions": list(actions)}
+    """Get list of available activity actions (from the activity_actions catalog)"""
+    return {"actions": await ActivityService(db).actions()}
 
 
 @router.get("/recent")
 async def get_recent_activity(
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_admin)
 ):
     """Get recent activity across all users"""
     
     result = await db.execute(
         select(ActivityLog)
-        .order_by(desc(ActivityLog.created_at))
+        .order_by(desc(ActivityLog.created_at), desc(ActivityLog.id))
         .limit(limit)
     )
     logs = result.scalars().all()
@@ -87,7 +86,7 @@ async def get_user_activity(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     hours: Optional[int] = Query(None, ge=1, le=168),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_admin)
 ):
     """Get activity for specific user"""
@@ -96,11 +95,10 @@ async def get_user_activity(
     query = select(ActivityLog).where(ActivityLog.user_id == user_id)
     
     if hours:
-        from datetime import datetime, timedelta
         start_date = datetime.utcnow() - timedelta(hours=hours)
         query = query.where(ActivityLog.created_at >= start_date)
     
-    query = query.order_by(desc(ActivityLog.created_at)).offset(skip).limit(limit)
+    query = query.order_by(desc(ActivityLog.created_at), desc(ActivityLog.id)).offset(skip).limit(limit)
     
     result = await db.execute(query)
     logs = result.scalars().all()
@@ -2,7 +2,8 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_db, get_current_admin
+from ..dependencies import get_db, get_read_db, get_current_admin
+from ..etag import conditional_get
 from ..models.schemas import FilterCreate, FilterUpdate, FilterResponse, FilterListPaginatedResponse, FilterBulkCreate
 from bot.services import FilterService, SupplierService
 
@@ -10,29 +11,31 @@ from bot.services import FilterService, SupplierService
 router = APIRouter(prefix="/filters", tags=["filters"])
 
 
-@router.get("/", response_model=FilterListPaginatedResponse)
+@router.get(
+    "/",
+    response_model=FilterListPaginatedResponse,
+    dependencies=[Depends(conditional_get("filters"))],
+)
 async def get_filters(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     supplier_id: Optional[int] = Query(None),
     active_only: bool = Query(True),
     search: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get filters with filtering and pagination. Returns items and total count."""
-    filter_service = FilterService(db)
-    if supplier_id:
-        filters = await filter_service.get_filters_by_supplier(supplier_id, active_only=active_only)
-    elif search:
-        filters = await filter_service.search_filters(search)
-    else:
-        filters = await filter_service.get_all_filters(active_only=active_only)
-    total = len(filters)
-    page = filters[skip : skip + limit]
-    return {"items": page, "total": total}
-
-
-@router.get("/{filter_id}", response_model=FilterResponse)
+    filters, total = await FilterService(db).list_filters(
+        skip=skip, limit=limit, supplier_id=supplier_id, active_only=active_only, search=search
+    )
+    return {"items": filters, "total": total}
+
+
+@router.get(
+    "/{filter_id}",
+    response_model=FilterResponse,
+    dependencies=[Depends(conditional_get("filters"))],
+)
 async def get_filter(
     filter_id: int,
     db: AsyncSession = Depends(get_db)
@@ -81,28 +84,17 @@ async def update_filter(
     """Update filter"""
     filter_service = FilterService(db)
     
-    # Check if filter exists
-    filter_obj = await filter_service.get_filter_by_id(filter_id)
+    # Один UPDATE ... RETURNING (без полей — просто чтение)
+    update_data = filter_update.model_dump(exclude_unset=True)
+    filter_obj = await filter_service.update_filter(
+        filter_id,
+        keyword=update_data.get("keyword"),
+        priority=update_data.get("priority"),
+        active=update_data.get("active"),
+    )
     if not filter_obj:
         raise HTTPException(status_code=404, detail="Filter not found")
-    
-    # Update filter
-    update_data = filter_update.model_dump(exclude_unset=True)
-    
-    if update_data:
-        success = await filter_service.update_filter(
-            filter_id,
-            keyword=update_data.get("keyword"),
-            priority=update_data.get("priority"),
-            active=update_data.get("active"),
-        )
-        
-        if not success:
-            raise HTTPException(status_code=400, detail="Failed to update filter")
-    
-    # Return updated filter
-    updated_filter = await filter_service.get_filter_by_id(filter_id)
-    return updated_filter
+    return filter_obj
 
 
 @router.delete("/{filter_id}")
@@ -1,21 +1,31 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import selectinload
 
 from sqlalchemy import func
 
-from ..dependencies import get_db, get_current_admin
-from ..models.schemas import OrderCreate, OrderUpdate, OrderResponse, OrderListResponse, OrderListPaginatedResponse, OrderMessageResponse
+from ..dependencies import get_db, get_read_db, get_current_admin
+from ..etag import conditional_get
+from ..live import order_feed, event_stream
+from ..serialization import order_list_select, order_rows, list_response
+from ..models.schemas import OrderCreate, OrderUpdate, OrderResponse, OrderListResponse, OrderListPaginatedResponse, OrderSearchResponse, OrderMessageResponse, OrderBulkAction, OrderBulkResponse
 from db.models import Order, OrderMessage
-from bot.services import OrderService, MessageService
+from bot.services import OrderService, MessageService, SupplierService
+from bot.services.order_service import search_condition
+from bot.services.pagination import count_total, created_before, next_created_cursor
 
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
-@router.get("/", response_model=OrderListPaginatedResponse)
+@router.get(
+    "/",
+    response_model=OrderListPaginatedResponse,
+    dependencies=[Depends(conditional_get("orders", "suppliers"))],
+)
 async def get_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
@@ -23,9 +33,16 @@ async def get_orders(
     supplier_id: Optional[int] = Query(None),
     admin_id: Optional[int] = Query(None),
     search: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get orders with filtering and pagination. Returns items and total count."""
+    """Get orders with filtering, newest first.
+
+    Pass next_cursor as `cursor` for the next page (keyset, cost does not grow with depth);
+    `skip` is still accepted for page jumps. `total` is a planner estimate for large
+    results unless include_total=true (then `total_exact` is true).
+    """
     # Base conditions
     conditions = []
     if status:
@@ -35,22 +52,56 @@ async def get_orders(
     if admin_id:
         conditions.append(Order.admin_id == admin_id)
     if search:
-        conditions.append(Order.text.ilike(f"%{search}%"))
-
-    # Total count (same filters, no pagination)
-    count_q = select(func.count(Order.id)).where(*conditions) if conditions else select(func.count(Order.id))
-    total_result = await db.execute(count_q)
-    total = total_result.scalar() or 0
-
-    # Paginated list
-    query = select(Order).options(selectinload(Order.supplier))
-    if conditions:
-        query = query.where(*conditions)
-    query = query.order_by(Order.created_at.desc()).offset(skip).limit(limit)
+        conditions.append(search_condition(search))
+
+    total, total_exact = await count_total(db, select(Order.id).where(*conditions), exact=include_total)
+
+    query = order_list_select().where(*conditions)
+    if cursor:
+        try:
+            query = query.where(created_before(Order.created_at, Order.id, cursor, id_type=str))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    else:
+        query = query.offset(skip)
+    query = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
     result = await db.execute(query)
-    orders = result.scalars().all()
+    rows, next_cursor = next_created_cursor(result.all(), limit)
+
+    # Без Pydantic: словари из кортежей, сериализация orjson
+    return list_response(order_rows(rows), total=total, total_exact=total_exact, next_cursor=next_cursor)
 
-    return {"items": orders, "total": total}
+
+@router.get("/search", response_model=OrderSearchResponse)
+async def search_orders(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Search orders by text, ranked by similarity. Pass next_cursor as cursor for the next page."""
+    try:
+        orders, next_cursor = await OrderService(db).search_orders(q, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": orders, "next_cursor": next_cursor}
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_orders():
+    """Live order feed (Server-Sent Events): order_created / order_updated / order_deleted / order_message.
+
+    Each event is a JSON `data:` line; {"type": "resync"} means events may have been
+    missed (slow client, lost subscription) and the list should be re-read.
+    """
+    if not order_feed.running:
+        raise HTTPException(status_code=503, detail="Live feed requires Redis")
+    return StreamingResponse(
+        event_stream(order_feed.subscribe()),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx отдаёт события сразу, без буферизации ответа
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -60,7 +111,7 @@ async def get_order(
 ):
     """Get specific order by ID"""
     order_service = OrderService(db)
-    order = await order_service.get_order(order_id)
+    order = await order_service.get_order(order_id, with_messages=True)
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -68,7 +119,7 @@ async def get_order(
     return order
 
 
-@router.post("/", response_model=OrderResponse)
+@router.post("/", response_model=OrderListResponse)
 async def create_order(
     order: OrderCreate,
     db: AsyncSession = Depends(get_db),
@@ -81,15 +132,11 @@ async def create_order(
     order_data = order.model_dump()
     order_data["admin_id"] = current_user["id"]
     
-    new_order = await order_service.create_order(order_data["text"], order_data["admin_id"])
-    
-    # Load full order with relationships
-    created_order = await order_service.get_order(new_order.id)
-    
-    return created_order
+    # INSERT ... RETURNING уже с поставщиком — без повторного чтения
+    return await order_service.create_order(order_data["text"], order_data["admin_id"])
 
 
-@router.put("/{order_id}", response_model=OrderResponse)
+@router.put("/{order_id}", response_model=OrderListResponse)
 async def update_order(
     order_id: str,
     order_update: OrderUpdate,
@@ -99,35 +146,15 @@ async def update_order(
     """Update order"""
     order_service = OrderService(db)
     
-    # Check if order exists
-    order = await order_service.get_order(order_id)
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Update order
+    # Один UPDATE ... RETURNING; пустое тело — просто чтение
     update_data = order_update.model_dump(exclude_unset=True)
-    
     if update_data:
-        from sqlalchemy import update
-        from datetime import datetime
-        
-        # Add updated_at timestamp
-        update_data["updated_at"] = datetime.utcnow()
-        
-        result = await db.execute(
-            update(Order)
-            .where(Order.id == order_id)
-            .values(**update_data)
-        )
-        
-        if result.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Order not found")
-        
-        await db.commit()
-    
-    # Return updated order
-    updated_order = await order_service.get_order(order_id)
-    return updated_order
+        order = await order_service.update_order(order_id, **update_data)
+    else:
+        order = await order_service.get_order(order_id, include_archived=False)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
 
 
 @router.delete("/{order_id}")
@@ -139,33 +166,56 @@ async def delete_order(
     """Delete order and its messages (messages are deleted first due to FK)."""
     order_service = OrderService(db)
 
-    order = await order_service.get_order(order_id)
-    if not order:
+    # Отсутствующий заказ — delete_order вернёт False (блокировка строки и есть проверка)
+    try:
+        deleted = await order_service.delete_order(order_id)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Ошибка удаления заказа. Попробуйте ещё раз или проверьте логи API.",
+        ) from e
+    if not deleted:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    from sqlalchemy import delete
+    return {"message": "Order deleted successfully"}
+
+
+@router.post("/bulk", response_model=OrderBulkResponse)
+async def bulk_order_action(
+    body: OrderBulkAction,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Delete, cancel, complete or reassign many orders in one transaction.
+    Body: { ids: string[], action, supplier_id? }"""
+    if body.action == "reassign":
+        if body.supplier_id is None:
+            raise HTTPException(status_code=400, detail="supplier_id required for reassign")
+        if not await SupplierService(db).get_supplier_by_id(body.supplier_id):
+            raise HTTPException(status_code=404, detail="Supplier not found")
 
     try:
-        await db.execute(delete(OrderMessage).where(OrderMessage.order_id == order_id))
-        await db.flush()
-        result = await db.execute(delete(Order).where(Order.id == order_id))
-        if result.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Order not found")
-        await db.commit()
+        outcome = await OrderService(db).bulk_action(body.ids, body.action, current_user["id"], body.supplier_id)
     except Exception as e:
         await db.rollback()
         raise HTTPException(
             status_code=400,
-            detail="Ошибка удаления заказа. Попробуйте ещё раз или проверьте логи API.",
+            detail="Ошибка массового действия. Попробуйте ещё раз или проверьте логи API.",
         ) from e
 
-    return {"message": "Order deleted successfully"}
+    errors = {"not_found": "Order not found", "invalid_status": f"Cannot {body.action} order in its current status"}
+    results = [
+        {"id": order_id, "ok": outcome[order_id] is None, "detail": errors.get(outcome[order_id])}
+        for order_id in body.ids
+    ]
+    return {"action": body.action, "processed": sum(1 for error in outcome.values() if error is None), "results": results}
 
 
 @router.get("/{order_id}/messages", response_model=List[OrderMessageResponse])
 async def get_order_messages(
     order_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all messages for order"""
     message_service = MessageService(db)
@@ -185,7 +235,7 @@ async def add_order_message(
     message_service = MessageService(db)
     
     # Check if order exists
-    order = await order_service.get_order(order_id)
+    order = await order_service.get_order(order_id, include_archived=False)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -208,10 +258,13 @@ async def accept_order(
     """Accept order (for suppliers)"""
     order_service = OrderService(db)
     
-    success = await order_service.accept_order(order_id, supplier_id)
+    try:
+        success = await order_service.accept_order(order_id, supplier_id)
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="Order is assigned to another supplier")
     
     if not success:
-        raise HTTPException(status_code=400, detail="Failed to accept order")
+        raise HTTPException(status_code=400, detail="Order not found or cannot be accepted in its current status")
     
     return {"message": "Order accepted successfully"}
 
@@ -225,10 +278,13 @@ async def decline_order(
     """Decline order (for suppliers)"""
     order_service = OrderService(db)
     
-    success = await order_service.decline_order(order_id, supplier_id)
+    try:
+        success = await order_service.decline_order(order_id, supplier_id)
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="Order is assigned to another supplier")
     
     if not success:
-        raise HTTPException(status_code=400, detail="Failed to decline order")
+        raise HTTPException(status_code=400, detail="Order not found or cannot be declined in its current status")
     
     return {"message": "Order declined successfully"}
 
@@ -242,10 +298,13 @@ async def complete_order(
     """Complete order (for suppliers)"""
     order_service = OrderService(db)
     
-    success = await order_service.complete_order(order_id, supplier_id)
+    try:
+        success = await order_service.complete_order(order_id, supplier_id)
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="Order is assigned to another supplier")
     
     if not success:
-        raise HTTPException(status_code=400, detail="Failed to complete order")
+        raise HTTPException(status_code=400, detail="Order not found or cannot be completed in its current status")
     
     return {"message": "Order completed successfully"}
 
@@ -262,6 +321,6 @@ async def cancel_order(
     success = await order_service.cancel_order(order_id, supplier_id)
     
     if not success:
-        raise HTTPException(status_code=400, detail="Failed to cancel order")
+        raise HTTPException(status_code=400, detail="Order not found or cannot be cancelled in its current status")
     
     return {"message": "Order cancelled successfully"}
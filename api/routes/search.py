@@ -0,0 +1,25 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..dependencies import get_read_db, get_current_admin
+from ..models.schemas import SearchResponse
+from bot.services import SearchService
+
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Full-text search across order text and order messages (websearch syntax: "фраза", -слово, or)"""
+    items = await SearchService(db).search(q, date_from=date_from, date_to=date_to, limit=limit)
+    return {"query": q, "items": items}
@@ -1,42 +1,48 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
-from ..dependencies import get_db, get_current_admin
-from ..models.schemas import SupplierCreate, SupplierUpdate, SupplierResponse, SupplierListPaginatedResponse, FilterResponse
+from ..dependencies import get_db, get_read_db, get_current_admin
+from ..etag import conditional_get
+from ..models.schemas import SupplierCreate, SupplierUpdate, SupplierResponse, SupplierListPaginatedResponse, FilterResponse, OrderListResponse
+from ..serialization import order_list_select, order_rows
 from db.models import Supplier, Filter, Order
-from sqlalchemy import delete, update
+from sqlalchemy import delete
 from bot.services import SupplierService, FilterService, OrderService
+from bot.services.stats_service import remove_supplier_from_leaderboard
 
 
 router = APIRouter(prefix="/suppliers", tags=["suppliers"])
 
 
-@router.get("/", response_model=SupplierListPaginatedResponse)
+@router.get(
+    "/",
+    response_model=SupplierListPaginatedResponse,
+    dependencies=[Depends(conditional_get("suppliers"))],
+)
 async def get_suppliers(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     active_only: bool = Query(True),
     role: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get suppliers with filtering and pagination. Returns items and total count."""
-    supplier_service = SupplierService(db)
-    suppliers = await supplier_service.get_all_suppliers(active_only=active_only)
-    if role:
-        suppliers = [s for s in suppliers if s.role == role]
-    if search:
-        search_lower = search.lower()
-        suppliers = [s for s in suppliers if search_lower in s.name.lower()]
-    total = len(suppliers)
-    page = suppliers[skip : skip + limit]
-    return {"items": page, "total": total}
-
-
-@router.get("/{supplier_id}", response_model=SupplierResponse)
+    suppliers, total = await SupplierService(db).list_suppliers(
+        skip=skip, limit=limit, active_only=active_only, role=role, search=search
+    )
+    return {"items": suppliers, "total": total}
+
+
+@router.get(
+    "/{supplier_id}",
+    response_model=SupplierResponse,
+    dependencies=[Depends(conditional_get("suppliers"))],
+)
 async def get_supplier(
     supplier_id: int,
     db: AsyncSession = Depends(get_db)
@@ -85,36 +91,15 @@ async def update_supplier(
     """Update supplier"""
     supplier_service = SupplierService(db)
     
-    # Check if supplier exists
-    supplier = await supplier_service.get_supplier_by_id(supplier_id)
-    if not supplier:
-        raise HTTPException(status_code=404, detail="Supplier not found")
-    
-    # Update supplier
+    # Все поля одним UPDATE ... RETURNING; пустое тело — просто чтение
     update_data = supplier_update.model_dump(exclude_unset=True)
-    
     if update_data:
-        if "name" in update_data:
-            await supplier_service.update_supplier_name(supplier_id, update_data["name"])
-        
-        if "active" in update_data:
-            if update_data["active"]:
-                await supplier_service.activate_supplier(supplier_id)
-            else:
-                await supplier_service.deactivate_supplier(supplier_id)
-        
-        if "role" in update_data:
-            result = await db.execute(
-                update(Supplier)
-                .where(Supplier.id == supplier_id)
-                .values(role=update_data["role"])
-            )
-            if result.rowcount > 0:
-                await db.commit()
-    
-    # Return updated supplier
-    updated_supplier = await supplier_service.get_supplier_by_id(supplier_id)
-    return updated_supplier
+        supplier = await supplier_service.update_supplier(supplier_id, **update_data)
+    else:
+        supplier = await supplier_service.get_supplier_by_id(supplier_id)
+    if not supplier:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    return supplier
 
 
 @router.delete("/{supplier_id}")
@@ -132,7 +117,7 @@ async def delete_supplier(
         raise HTTPException(status_code=404, detail="Supplier not found")
     
     # Core delete does not trigger ORM cascade: unassign orders, delete filters, then supplier
-    await db.execute(update(Order).where(Order.supplier_id == supplier_id).values(supplier_id=None))
+    await OrderService(db).unassign_supplier_orders(supplier_id)
     await db.execute(delete(Filter).where(Filter.supplier_id == supplier_id))
     result = await db.execute(delete(Supplier).where(Supplier.id == supplier_id))
     
@@ -140,6 +125,7 @@ async def delete_supplier(
         raise HTTPException(status_code=404, detail="Supplier not found")
     
     await db.commit()
+    await remove_supplier_from_leaderboard(supplier_id)
     
     return {"message": "Supplier deleted successfully"}
 
@@ -178,11 +164,15 @@ async def deactivate_supplier(
     return {"message": "Supplier deactivated successfully"}
 
 
-@router.get("/{supplier_id}/filters", response_model=List[FilterResponse])
+@router.get(
+    "/{supplier_id}/filters",
+    response_model=List[FilterResponse],
+    dependencies=[Depends(conditional_get("suppliers", "filters"))],
+)
 async def get_supplier_filters(
     supplier_id: int,
     active_only: bool = Query(True),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get supplier's filters"""
     filter_service = FilterService(db)
@@ -197,13 +187,17 @@ async def get_supplier_filters(
     return filters
 
 
-@router.get("/{supplier_id}/orders")
+@router.get(
+    "/{supplier_id}/orders",
+    response_model=List[OrderListResponse],
+    dependencies=[Depends(conditional_get("orders", "suppliers"))],
+)
 async def get_supplier_orders(
     supplier_id: int,
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get supplier's orders"""
     # Check if supplier exists
@@ -212,10 +206,10 @@ async def get_supplier_orders(
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
     
-    order_service = OrderService(db)
-    orders = await order_service.get_orders_by_supplier(supplier_id, status=status)
-    
-    # Apply pagination
-    orders = orders[skip:skip+limit]
-    
-    return orders
+    # Как OrderService.get_orders_by_supplier, но столбцами — ответ собирается без Pydantic
+    query = order_list_select().where(Order.supplier_id == supplier_id)
+    if status:
+        query = query.where(Order.status == status)
+    query = query.order_by(Order.created_at.desc(), Order.id.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return ORJSONResponse(order_rows(result.all()))
@@ -0,0 +1,45 @@
+"""Быстрый путь для списков заказов: словари ответа строятся прямо из кортежей строк.
+
+Маршрут выбирает столбцы (order_list_select), а не ORM-объекты, и возвращает
+ORJSONResponse — FastAPI не валидирует такой ответ через Pydantic. Ключи и их
+порядок совпадают с OrderListResponse / SupplierResponse; response_model у
+маршрута остаётся для документации OpenAPI.
+"""
+from typing import Iterable, List
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+
+from db.models import Order, Supplier
+
+
+# Порядок полей как в OrderListResponse (сначала поля OrderBase)
+ORDER_FIELDS = (
+    "text", "status", "supplier_id", "id", "admin_id", "created_at", "updated_at", "assigned_at", "completed_at",
+)
+SUPPLIER_FIELDS = ("telegram_id", "name", "active", "role", "id", "created_at")
+_SUPPLIER_ID = len(ORDER_FIELDS) + SUPPLIER_FIELDS.index("id")
+
+
+def order_list_select():
+    """select of the OrderListResponse columns, supplier joined in the same query"""
+    return select(
+        *(getattr(Order, field) for field in ORDER_FIELDS),
+        *(getattr(Supplier, field).label(f"supplier__{field}") for field in SUPPLIER_FIELDS),
+    ).outerjoin(Supplier, Supplier.id == Order.supplier_id)
+
+
+def order_rows(rows: Iterable) -> List[dict]:
+    """OrderListResponse-shaped dicts from order_list_select() rows"""
+    split = len(ORDER_FIELDS)
+    items = []
+    for row in rows:
+        item = dict(zip(ORDER_FIELDS, row[:split]))
+        item["supplier"] = dict(zip(SUPPLIER_FIELDS, row[split:])) if row[_SUPPLIER_ID] is not None else None
+        items.append(item)
+    return items
+
+
+def list_response(items: List[dict], **extra) -> ORJSONResponse:
+    """{"items": [...], **extra} serialized by orjson (datetimes as ISO 8601, like Pydantic)"""
+    return ORJSONResponse({"items": items, **extra})
@@ -20,11 +20,30 @@ class Settings(BaseSettings):
     postgres_host: str = "localhost"
     postgres_port: int = 5432
 
+    # Пул соединений с БД (на процесс; у api — отдельно для основной БД и реплики)
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: float = 30.0  # ожидание свободного соединения, потом ошибка
+    db_pool_recycle: int = 280
+    db_pool_slow_checkout_ms: float = 100.0  # ожидание дольше — предупреждение о насыщении в лог
+
     # Redis
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_db: int = 0
 
+    # Фоновые задачи (секунды)
+    leaderboard_reconcile_interval: int = 600
+    partition_maintenance_interval: int = 86400
+    pool_stats_log_interval: int = 300
+    order_archive_interval: int = 3600
+
+    # Хранение activity_logs: текущий месяц + столько предыдущих (0 — не удалять)
+    activity_retention_months: int = 12
+
+    # Заказы, закрытые (COMPLETED/CANCELLED) больше стольких дней назад, переносятся в orders_archive (0 — не переносить)
+    order_archive_after_days: int = 90
+
     @property
     def database_url(self) -> str:
         pwd = (self.postgres_password or "").strip() or "postgres"
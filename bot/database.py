@@ -3,6 +3,7 @@ from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from db.pool import InstrumentedPool, instrument_engine
 from .config import settings
 
 
@@ -13,11 +14,14 @@ class Base(DeclarativeBase):
 engine = create_async_engine(
     settings.database_url,
     echo=False,
+    poolclass=InstrumentedPool,
     pool_pre_ping=True,
-    pool_recycle=280,
-    pool_size=5,
-    max_overflow=5,
+    pool_recycle=settings.db_pool_recycle,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
 )
+instrument_engine(engine, "bot", settings.db_pool_slow_checkout_ms)
 
 Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -30,6 +34,15 @@ async def get_session():
 
 
 async def init_db():
-    from db.models import Base
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    from db.migrate import upgrade_database
+    from .services.rollup_service import RollupService
+    from .services.activity_service import ActivityService
+    await upgrade_database(engine)
+    # Первый запуск с rollup-таблицами статистики: заполнить их из уже существующих данных
+    async with Session() as session:
+        rollups = RollupService(session)
+        if await rollups.needs_backfill():
+            await rollups.rebuild()
+        activity = ActivityService(session)
+        if await activity.needs_backfill():
+            await activity.rebuild()
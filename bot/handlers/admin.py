@@ -3,7 +3,7 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.enums import ParseMode
-from aiogram.filters import Command
+from aiogram.filters import Command, StateFilter
 
 from sqlalchemy.ext.asyncio import AsyncSession
 import asyncpg
@@ -11,12 +11,13 @@ import asyncpg
 import logging
 import re
 from ..database import get_session
-from ..services import OrderService, SupplierService, FilterService, MessageService
+from ..services import OrderService, SupplierService, FilterService, MessageService, StatsService
 from ..keyboards import (
     admin_keyboard,
     admin_reply_keyboard,
     supplier_management_keyboard,
     stats_keyboard,
+    search_more_keyboard,
     BTN_ORDER,
     BTN_SUPPLIERS,
     BTN_STATS,
@@ -279,35 +280,17 @@ async def show_stats(callback: CallbackQuery):
     try:
         period = callback.data.split("_")[1]
         async with get_session() as session:
-            order_service = OrderService(session)
-            orders = await order_service.get_orders_by_admin(callback.from_user.id, limit=1000)
-            from datetime import datetime, timedelta
-            now = datetime.utcnow()
-            if period == "today":
-                start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            elif period == "week":
-                start_date = now - timedelta(days=7)
-            elif period == "month":
-                start_date = now - timedelta(days=30)
-            else:
-                start_date = None
-            if start_date:
-                filtered_orders = [o for o in orders if o.created_at >= start_date]
-            else:
-                filtered_orders = orders
-            total = len(filtered_orders)
-            completed = len([o for o in filtered_orders if o.status == "COMPLETED"])
-            pending = len([o for o in filtered_orders if o.status in ["NEW", "ASSIGNED", "ACCEPTED"]])
-            cancelled = len([o for o in filtered_orders if o.status in ["DECLINED", "CANCELLED"]])
+            stats_service = StatsService(session)
+            stats = await stats_service.order_stats(period, admin_id=callback.from_user.id)
+            total = stats["total"]
             period_label = {"today": "Сегодня", "week": "Неделя", "month": "Месяц", "all": "Всё время"}.get(period, period)
             text = f"📊 Статистика: {period_label}\n\n"
             text += f"📦 Всего заказов: {total}\n"
-            text += f"✅ Выполнено: {completed}\n"
-            text += f"⏳ В работе: {pending}\n"
-            text += f"❌ Отменено: {cancelled}\n"
+            text += f"✅ Выполнено: {stats['completed']}\n"
+            text += f"⏳ В работе: {stats['pending']}\n"
+            text += f"❌ Отменено: {stats['cancelled']}\n"
             if total > 0:
-                completion_rate = (completed / total) * 100
-                text += f"\n📈 Процент выполнения: {completion_rate:.1f}%"
+                text += f"\n📈 Процент выполнения: {stats['completion_rate']:.1f}%"
             await callback.message.answer(text, reply_markup=admin_keyboard())
     except (asyncpg.exceptions.InvalidPasswordError, OSError, Exception):
         await callback.message.answer(
@@ -325,36 +308,60 @@ async def search_orders_start(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@admin_router.message(F.state == "search_orders")
+SEARCH_PAGE_SIZE = 20
+
+
+@admin_router.message(StateFilter("search_orders"), F.text)
 async def search_orders_process(message: Message, state: FSMContext):
     """Process order search"""
     if message.text == BTN_MENU:
         await state.clear()
         await message.answer("◀️ Главное меню", reply_markup=admin_reply_keyboard())
         return
+    await state.clear()
+    await _send_search_page(message, state, message.text, cursor=None)
+
+
+@admin_router.callback_query(F.data == "search_more")
+async def search_orders_more(callback: CallbackQuery, state: FSMContext):
+    """Next page of the last search (query and cursor are kept in FSM data)"""
+    data = await state.get_data()
+    await callback.message.edit_reply_markup(reply_markup=None)
+    if not data.get("search_query") or not data.get("search_cursor"):
+        await callback.answer("Поиск устарел, начните заново")
+        return
+    await _send_search_page(callback.message, state, data["search_query"], data["search_cursor"])
+    await callback.answer()
+
+
+async def _send_search_page(message: Message, state: FSMContext, query: str, cursor):
     try:
         async with get_session() as session:
             order_service = OrderService(session)
-            orders = await order_service.search_orders(message.text)
+            orders, next_cursor = await order_service.search_orders(query, limit=SEARCH_PAGE_SIZE, cursor=cursor)
             if not orders:
                 await message.answer(
                     "📭 Заказы не найдены",
                     reply_markup=admin_reply_keyboard(),
                 )
-            else:
-                text = f"🔍 Найдено заказов: {len(orders)}\n\n"
-                for order in orders[:20]:
-                    supplier_name = order.supplier.name if order.supplier else "Не назначен"
-                    text += f"📦 #{order.id} - {order_status_ru(order.status)}\n"
-                    text += f"👤 {supplier_name}\n"
-                    text += f"📝 {order.text[:50]}...\n\n"
-                await message.answer(text, reply_markup=admin_reply_keyboard())
+                return
+            text = "🔍 Найденные заказы:\n\n" if cursor is None else "🔍 Ещё заказы:\n\n"
+            for order in orders:
+                supplier_name = order.supplier.name if order.supplier else "Не назначен"
+                text += f"📦 #{order.id} - {order_status_ru(order.status)}\n"
+                text += f"👤 {supplier_name}\n"
+                text += f"📝 {order.text[:50]}...\n\n"
     except (asyncpg.exceptions.InvalidPasswordError, OSError, Exception):
         await message.answer(
             "Ошибка подключения к базе данных. Проверьте POSTGRES_PASSWORD в .env и перезапустите бота.",
             reply_markup=admin_reply_keyboard(),
         )
-    await state.clear()
+        return
+    await state.update_data(search_query=query, search_cursor=next_cursor)
+    await message.answer(
+        text,
+        reply_markup=search_more_keyboard() if next_cursor else admin_reply_keyboard(),
+    )
 
 
 # --- Обработчики кнопок закреплённой панели (только для админов) ---
@@ -470,7 +477,7 @@ async def admin_reply_to_supplier_message(message: Message, bot: Bot):
             order_service = OrderService(session)
             message_service = MessageService(session)
             supplier_service = SupplierService(session)
-            order = await order_service.get_order(order_id)
+            order = await order_service.get_order(order_id, include_archived=False)
             if not order or order.admin_id != message.from_user.id:
                 await message.answer("❌ Заказ не найден или нет доступа.")
                 return
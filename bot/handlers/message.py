@@ -4,6 +4,7 @@ from aiogram.types import Message
 from ..database import get_session
 from ..services import OrderService, MessageService, SupplierService
 from ..config import settings
+from ..utils import find_order_id
 
 
 message_router = Router()
@@ -52,21 +53,18 @@ async def handle_order_reply(message: Message):
         # Try to extract order ID from the replied message
         replied_text = message.reply_to_message.text or ""
         
-        # Look for order ID pattern like "#ABC12345"
-        import re
-        order_match = re.search(r"#([A-Z0-9]{8})", replied_text)
+        # Look for order ID pattern like "#0A1B2C3D4E5" (or legacy "#ABC12345")
+        order_id = find_order_id(replied_text)
         
-        if not order_match:
+        if not order_id:
             await message.answer("❌ Не удалось определить заказ. Используйте кнопку 'Сообщение' у заказа.")
             return
         
-        order_id = order_match.group(1)
-        
         order_service = OrderService(session)
         message_service = MessageService(session)
         
         # Check if order exists and user has access
-        order = await order_service.get_order(order_id)
+        order = await order_service.get_order(order_id, include_archived=False)
         if not order:
             await message.answer("❌ Заказ не найден")
             return
@@ -2,13 +2,13 @@ from aiogram import Router, F, Bot
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.enums import ParseMode
-from aiogram.filters import BaseFilter
+from aiogram.filters import BaseFilter, StateFilter
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_session
 from ..services import OrderService, MessageService, SupplierService
-from ..keyboards import order_keyboard, order_status_keyboard
+from ..keyboards import order_keyboard, order_status_keyboard, history_keyboard
 from ..pending_store import set_pending, get_pending, clear_pending
 from ..utils import order_status_ru
 
@@ -25,6 +25,15 @@ class PendingOrderMessageFilter(BaseFilter):
         return False
 
 
+async def _reject_foreign_order(callback: CallbackQuery):
+    """Кнопка по заказу другого поставщика (например, оставшаяся после переназначения): убираем её"""
+    await callback.answer("❌ Заказ назначен другому поставщику", show_alert=True)
+    try:
+        await callback.message.edit_reply_markup(reply_markup=None)
+    except Exception:
+        pass  # сообщение уже изменено или слишком старое
+
+
 @order_router.callback_query(F.data.startswith("accept:"))
 async def accept_order(callback: CallbackQuery, bot: Bot):
     """Accept order"""
@@ -37,7 +46,11 @@ async def accept_order(callback: CallbackQuery, bot: Bot):
             return
         order_service = OrderService(session)
         message_service = MessageService(session)
-        success = await order_service.accept_order(order_id, supplier.id)
+        try:
+            success = await order_service.accept_order(order_id, supplier.id)
+        except PermissionError:
+            await _reject_foreign_order(callback)
+            return
         if success:
             # Add status message
             await message_service.add_status_message(order_id, "ACCEPTED")
@@ -49,7 +62,7 @@ async def accept_order(callback: CallbackQuery, bot: Bot):
             
             await callback.answer("✅ Заказ принят!")
         else:
-            await callback.answer("❌ Ошибка принятия заказа", show_alert=True)
+            await callback.answer("❌ Заказ уже принят или закрыт", show_alert=True)
 
 
 @order_router.callback_query(F.data.startswith("decline:"))
@@ -64,10 +77,13 @@ async def decline_order(callback: CallbackQuery, bot: Bot):
             return
         order_service = OrderService(session)
         message_service = MessageService(session)
-        success = await order_service.decline_order(order_id, supplier.id)
-        if success:
+        try:
+            order = await order_service.decline_order(order_id, supplier.id)
+        except PermissionError:
+            await _reject_foreign_order(callback)
+            return
+        if order:
             await message_service.add_status_message(order_id, "DECLINED")
-            order = await order_service.get_order(order_id)
             if order.supplier_id and order.supplier_id != supplier.id:
                 # Order was reassigned to another supplier
                 supplier_service = SupplierService(session)
@@ -97,7 +113,7 @@ async def decline_order(callback: CallbackQuery, bot: Bot):
                 )
                 await callback.answer("❌ Заказ отклонен")
         else:
-            await callback.answer("❌ Ошибка отклонения заказа", show_alert=True)
+            await callback.answer("❌ Заказ уже отклонён или закрыт", show_alert=True)
 
 
 @order_router.callback_query(F.data.startswith("complete:"))
@@ -112,7 +128,11 @@ async def complete_order(callback: CallbackQuery):
             return
         order_service = OrderService(session)
         message_service = MessageService(session)
-        success = await order_service.complete_order(order_id, supplier.id)
+        try:
+            success = await order_service.complete_order(order_id, supplier.id)
+        except PermissionError:
+            await _reject_foreign_order(callback)
+            return
         if success:
             # Add status message
             await message_service.add_status_message(order_id, "COMPLETED")
@@ -123,7 +143,7 @@ async def complete_order(callback: CallbackQuery):
             )
             await callback.answer("✅ Заказ завершен!")
         else:
-            await callback.answer("❌ Ошибка завершения заказа", show_alert=True)
+            await callback.answer("❌ Заказ нельзя завершить: он ещё не принят или уже закрыт", show_alert=True)
 
 
 @order_router.callback_query(F.data.startswith("cancel:"))
@@ -149,7 +169,7 @@ async def cancel_order(callback: CallbackQuery):
             )
             await callback.answer("❌ Заказ отменен")
         else:
-            await callback.answer("❌ Ошибка отмены заказа", show_alert=True)
+            await callback.answer("❌ Заказ уже закрыт", show_alert=True)
 
 
 @order_router.callback_query(F.data.startswith("message:"))
@@ -185,7 +205,7 @@ async def message_order_process(
         async with get_session() as session:
             order_service = OrderService(session)
             message_service = MessageService(session)
-            order = await order_service.get_order(order_id)
+            order = await order_service.get_order(order_id, include_archived=False)
             if not order:
                 await clear_pending(message.from_user.id)
                 await message.answer("❌ Заказ не найден.")
@@ -258,50 +278,65 @@ async def show_order_status(callback: CallbackQuery):
         if order.completed_at:
             text += f"✅ Завершен: {order.completed_at.strftime('%Y-%m-%d %H:%M')}\n"
         
-        # Show messages
-        messages = await message_service.get_order_messages(order_id)
-        if messages:
-            text += f"\n💬 Сообщения ({len(messages)}):\n"
-            for msg in messages[-5:]:  # Show last 5 messages
-                if msg.message_type == "text":
-                    text += f"• {msg.message_text}\n"
+        # Show messages: счётчик и последние 5 текстовых сообщений, без загрузки всей переписки
+        total = await message_service.count_messages(order_id)
+        if total:
+            text += f"\n💬 Сообщения ({total}):\n"
+            for msg in await message_service.get_last_messages(order_id, 5, message_type="text"):
+                text += f"• {msg.message_text}\n"
         
         await callback.message.answer(text)
         await callback.answer()
 
 
+HISTORY_MESSAGE_CHARS = 300  # длинные сообщения обрезаются, чтобы страница влезла в 4096 символов
+
+
+def _history_page_text(order_id: str, messages) -> str:
+    text = f"📦 История заказа #{order_id}\n\n"
+    for msg in messages:
+        icon = {"system": "🔧", "status_change": "📊"}.get(msg.message_type, "💬")
+        body = msg.message_text
+        if len(body) > HISTORY_MESSAGE_CHARS:
+            body = body[:HISTORY_MESSAGE_CHARS] + "…"
+        text += f"{icon} {msg.created_at.strftime('%d.%m %H:%M')} - {body}\n"
+    return text
+
+
 @order_router.callback_query(F.data.startswith("history:"))
 async def show_order_history(callback: CallbackQuery):
-    """Show full order message history"""
-    order_id = callback.data.split(":")[1]
+    """Show order message history page by page (history:<id>[:before|after:<message id>])"""
+    parts = callback.data.split(":")
+    order_id = parts[1]
+    before_id = after_id = None
+    if len(parts) == 4 and parts[3].isdigit():
+        if parts[2] == "before":
+            before_id = int(parts[3])
+        elif parts[2] == "after":
+            after_id = int(parts[3])
     
     async with get_session() as session:
         message_service = MessageService(session)
-        
-        messages = await message_service.get_order_messages(order_id)
-        if not messages:
-            await callback.answer("Нет сообщений", show_alert=True)
-            return
-        
-        text = f"📦 История заказа #{order_id}\n\n"
-        
-        for msg in messages:
-            if msg.message_type == "system":
-                text += f"🔧 {msg.created_at.strftime('%H:%M')} - {msg.message_text}\n"
-            elif msg.message_type == "status_change":
-                text += f"📊 {msg.created_at.strftime('%H:%M')} - {msg.message_text}\n"
-            else:
-                text += f"💬 {msg.created_at.strftime('%H:%M')} - {msg.message_text}\n"
-        
-        # Split if too long
-        if len(text) > 4000:
-            parts = [text[i:i+4000] for i in range(0, len(text), 4000)]
-            for part in parts:
-                await callback.message.answer(part)
-        else:
-            await callback.message.answer(text)
-        
-        await callback.answer()
+        messages, has_older, has_newer = await message_service.get_history_page(
+            order_id, before_id=before_id, after_id=after_id
+        )
+    
+    if not messages:
+        await callback.answer("Нет сообщений", show_alert=True)
+        return
+    
+    text = _history_page_text(order_id, messages)
+    keyboard = history_keyboard(
+        order_id,
+        messages[0].id if has_older else None,
+        messages[-1].id if has_newer else None,
+    )
+    if before_id is None and after_id is None:
+        # Первое открытие — новым сообщением, листание — правкой этого же сообщения
+        await callback.message.answer(text, reply_markup=keyboard)
+    else:
+        await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.answer()
 
 
 @order_router.callback_query(F.data.startswith("reassign:"))
@@ -318,7 +353,7 @@ async def reassign_order_start(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@order_router.message(F.state == "reassign_order")
+@order_router.message(StateFilter("reassign_order"))
 async def reassign_order_process(message: Message, state: FSMContext, bot: Bot):
     """Process order reassignment"""
     data = await state.get_data()
@@ -343,27 +378,15 @@ async def reassign_order_process(message: Message, state: FSMContext, bot: Bot):
             return
         
         # Reassign order
-        from sqlalchemy import update
-        from datetime import datetime
-        
-        result = await session.execute(
-            update(Order)
-            .where(Order.id == order_id)
-            .values(
-                supplier_id=new_supplier_id,
-                assigned_at=datetime.utcnow(),
-                status="ASSIGNED"
-            )
-        )
+        order = await order_service.reassign_order(order_id, new_supplier_id)
         
-        if result.rowcount > 0:
+        if order:
             # Add system message
             await message_service.add_system_message(
                 order_id, 
                 f"🔄 Заказ переназначен поставщику {supplier.name}"
             )
             
-            order = await order_service.get_order(order_id)
             try:
                 await bot.send_message(
                     supplier.telegram_id,
@@ -375,6 +398,6 @@ async def reassign_order_process(message: Message, state: FSMContext, bot: Bot):
                     raise
             await message.answer(f"✅ Заказ #{order_id} переназначен поставщику {supplier.name}")
         else:
-            await message.answer("❌ Ошибка переназначения заказа")
+            await message.answer("❌ Заказ не найден или уже закрыт")
     
     await state.clear()
@@ -6,9 +6,9 @@ from aiogram.filters import Command, StateFilter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_session
-from ..services import OrderService, SupplierService
+from ..services import OrderService, SupplierService, StatsService
 from ..keyboards import order_keyboard, supplier_reply_keyboard, BTN_MY_ORDERS, BTN_SUPPLIER_HELP, BTN_CONTACT_BUYER, BTN_SUPPLIER_MENU
-from ..utils import order_status_ru
+from ..utils import order_status_ru, normalize_order_id
 from ..pending_store import set_pending
 from ..config import settings
 
@@ -116,15 +116,8 @@ async def supplier_profile(message: Message):
         filter_service = FilterService(session)
         filters = await filter_service.get_filters_by_supplier(supplier.id)
         
-        # Get order stats
-        order_service = OrderService(session)
-        all_orders = await order_service.get_orders_by_supplier(supplier.id)
-        stats = {
-            "total": len(all_orders),
-            "completed": len([o for o in all_orders if o.status == "COMPLETED"]),
-            "accepted": len([o for o in all_orders if o.status == "ACCEPTED"]),
-            "declined": len([o for o in all_orders if o.status == "DECLINED"]),
-        }
+        # Get order stats (счётчики supplier_stats, без загрузки заказов)
+        stats = await StatsService(session).supplier_counters(supplier.id)
         
         text = f"👤 Профиль поставщика\n\n"
         text += f"📛 Имя: {supplier.name}\n"
@@ -207,7 +200,7 @@ async def btn_supplier_help(message: Message):
 async def contact_buyer_ask_order(message: Message, state: FSMContext):
     """Кнопка «Связаться с покупателем» — запрос ID заказа."""
     await state.set_state("contact_buyer_wait_order")
-    await message.answer("Введите ID заказа (например DE5A2138) или /cancel для отмены:")
+    await message.answer("Введите ID заказа (например 2J8B6CMQ61X) или /cancel для отмены:")
 
 
 @supplier_router.message(StateFilter("contact_buyer_wait_order"), F.text)
@@ -220,7 +213,10 @@ async def contact_buyer_got_order(message: Message, state: FSMContext):
         await state.clear()
         await message.answer("Отменено.", reply_markup=supplier_reply_keyboard())
         return
-    order_id = message.text.strip().upper()
+    order_id = normalize_order_id(message.text)
+    if not order_id:
+        await message.answer("Неверный ID заказа. Введите ID заказа или /cancel.")
+        return
     async with get_session() as session:
         supplier_service = SupplierService(session)
         order_service = OrderService(session)
@@ -229,7 +225,7 @@ async def contact_buyer_got_order(message: Message, state: FSMContext):
             await state.clear()
             await message.answer("❌ Вы не зарегистрированы как поставщик.", reply_markup=supplier_reply_keyboard())
             return
-        order = await order_service.get_order(order_id)
+        order = await order_service.get_order(order_id, include_archived=False)
         if not order:
             await message.answer("Заказ с таким ID не найден. Введите ID заказа или /cancel.")
             return
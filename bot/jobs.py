@@ -0,0 +1,64 @@
+"""Фоновые задачи бота: периодическое обслуживание данных, не связанное с обработкой сообщений."""
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+from db.pool import pool_snapshot
+from .config import settings
+from .database import get_session
+from .services import StatsService, PartitionService, ArchiveService
+
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_leaderboard() -> None:
+    """Сверить рейтинг поставщиков в Redis с Postgres"""
+    async with get_session() as session:
+        count = await StatsService(session).reconcile_leaderboard()
+    logger.info("Supplier leaderboard reconciled: %s suppliers", count)
+
+
+async def maintain_partitions() -> None:
+    """Создать секции activity_logs на следующие месяцы и удалить вышедшие за срок хранения"""
+    async with get_session() as session:
+        partitions = PartitionService(session)
+        created = await partitions.ensure_partitions()
+        dropped = await partitions.drop_expired(settings.activity_retention_months) if settings.activity_retention_months else []
+    if created or dropped:
+        logger.info("Partitions created: %s, dropped: %s", created, dropped)
+
+
+async def archive_orders() -> None:
+    """Перенести давно закрытые заказы с сообщениями в orders_archive / order_messages_archive"""
+    if not settings.order_archive_after_days:
+        return
+    async with get_session() as session:
+        await ArchiveService(session).archive_closed(settings.order_archive_after_days)
+
+
+async def log_pool_stats() -> None:
+    """Записать в лог метрики пула соединений за прошедший интервал (у бота нет /debug/pool)"""
+    for name, stats in pool_snapshot(reset=True).items():
+        logger.info("DB pool %s: %s", name, stats)
+
+
+async def _run_every(interval: int, job: Callable[[], Awaitable[None]]) -> None:
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background job %s failed", job.__name__)
+        await asyncio.sleep(interval)
+
+
+def start_background_jobs() -> List[asyncio.Task]:
+    """Запустить периодические задачи (первый прогон — сразу при старте)."""
+    return [
+        asyncio.create_task(_run_every(settings.leaderboard_reconcile_interval, reconcile_leaderboard)),
+        asyncio.create_task(_run_every(settings.partition_maintenance_interval, maintain_partitions)),
+        asyncio.create_task(_run_every(settings.order_archive_interval, archive_orders)),
+        asyncio.create_task(_run_every(settings.pool_stats_log_interval, log_pool_stats)),
+    ]
@@ -1,10 +1,11 @@
-from .order import order_keyboard, order_status_keyboard
+from .order import order_keyboard, order_status_keyboard, history_keyboard
 from .admin import (
     admin_keyboard,
     admin_reply_keyboard,
     supplier_reply_keyboard,
     supplier_management_keyboard,
     stats_keyboard,
+    search_more_keyboard,
     BTN_ORDER,
     BTN_SUPPLIERS,
     BTN_STATS,
@@ -20,11 +21,13 @@ from .admin import (
 __all__ = [
     "order_keyboard",
     "order_status_keyboard",
+    "history_keyboard",
     "admin_keyboard",
     "admin_reply_keyboard",
     "supplier_reply_keyboard",
     "supplier_management_keyboard",
     "stats_keyboard",
+    "search_more_keyboard",
     "BTN_ORDER",
     "BTN_SUPPLIERS",
     "BTN_STATS",
@@ -59,6 +59,13 @@ def admin_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+def search_more_keyboard() -> InlineKeyboardMarkup:
+    """Следующая страница результатов поиска (запрос и курсор хранятся в FSM)."""
+    builder = InlineKeyboardBuilder()
+    builder.add(InlineKeyboardButton(text="➡️ Показать ещё", callback_data="search_more"))
+    return builder.as_markup()
+
+
 def supplier_management_keyboard(supplier_id: int) -> InlineKeyboardMarkup:
     """Supplier management keyboard"""
     builder = InlineKeyboardBuilder()
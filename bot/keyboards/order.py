@@ -1,3 +1,5 @@
+from typing import Optional
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
@@ -83,3 +85,16 @@ def admin_order_keyboard(order_id: str) -> InlineKeyboardMarkup:
     builder.adjust(1)
     
     return builder.as_markup()
+
+
+def history_keyboard(order_id: str, older_id: Optional[int], newer_id: Optional[int]) -> Optional[InlineKeyboardMarkup]:
+    """Paging buttons of the order history viewer (None when everything fits on one page)"""
+    builder = InlineKeyboardBuilder()
+    if older_id is not None:
+        builder.add(InlineKeyboardButton(text="◀️ Раньше", callback_data=f"history:{order_id}:before:{older_id}"))
+    if newer_id is not None:
+        builder.add(InlineKeyboardButton(text="Позже ▶️", callback_data=f"history:{order_id}:after:{newer_id}"))
+    if older_id is None and newer_id is None:
+        return None
+    builder.adjust(2)
+    return builder.as_markup()
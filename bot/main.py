@@ -11,9 +11,14 @@ from aiogram.fsm.storage.redis import RedisStorage
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from .config import settings
-from .database import init_db, engine
+from .database import init_db, engine, Session
 from .pending_store import set_redis as set_pending_store_redis
+from .services.stats_service import set_redis as set_stats_redis
+from .services.table_versions import set_redis as set_versions_redis
+from .services.order_events import set_redis as set_events_redis
+from .services.activity_service import start_activity_sink, stop_activity_sink
 from .handlers import admin_router, order_router, supplier_router, message_router
+from .jobs import start_background_jobs
 
 
 # Configure logging
@@ -54,17 +59,26 @@ async def main():
         await redis_fsm.ping()
         storage = RedisStorage(redis=redis_fsm)
         set_pending_store_redis(redis_fsm)
+        set_stats_redis(redis_fsm)
+        set_versions_redis(redis_fsm)
+        set_events_redis(redis_fsm)
         logger.info("Using Redis storage")
     except Exception as e:
         logger.warning(f"Redis not available, using memory storage: {e}")
         storage = MemoryStorage()
         set_pending_store_redis(None)
+        set_stats_redis(None)
+        set_versions_redis(None)
+        set_events_redis(None)
     
     # Проверка БД до старта (чтобы сразу увидеть ошибку пароля/доступа в логах)
+    jobs = []
     if not await _check_db_connection():
         logger.warning("Бот запускается без БД — проверьте .env и контейнер db. Команды: из каталога проекта docker compose logs db")
     else:
         await init_db()
+        start_activity_sink(Session)
+        jobs = start_background_jobs()
 
     # Initialize dispatcher
     dp = Dispatcher(storage=storage)
@@ -81,6 +95,9 @@ async def main():
     try:
         await dp.start_polling(bot)
     finally:
+        for job in jobs:
+            job.cancel()
+        await stop_activity_sink()
         await bot.session.close()
 
 
@@ -0,0 +1,93 @@
+"""Служебные команды обслуживания БД.
+
+Запуск (в контейнере bot или api):
+    python -m bot.maintenance rebuild-rollups
+    python -m bot.maintenance reconcile-leaderboard
+    python -m bot.maintenance rebuild-latency
+    python -m bot.maintenance rebuild-activity
+    python -m bot.maintenance maintain-partitions
+    python -m bot.maintenance archive-orders
+"""
+import argparse
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+
+from .config import settings
+from .database import get_session
+from .services.rollup_service import RollupService
+from .services.latency_service import LatencyService
+from .services.activity_service import ActivityService
+from .jobs import maintain_partitions, archive_orders
+from .services.stats_service import StatsService, set_redis as set_stats_redis
+from .services.table_versions import set_redis as set_versions_redis, wait_for_bumps
+
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_rollups() -> None:
+    """Пересчитать order_daily_stats и supplier_stats из orders"""
+    async with get_session() as session:
+        rows = await RollupService(session).rebuild()
+    logger.info("order_daily_stats rebuilt: %s rows", rows)
+
+
+async def reconcile_leaderboard() -> None:
+    """Пересобрать рейтинг поставщиков в Redis из Postgres"""
+    redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    set_stats_redis(redis)
+    try:
+        async with get_session() as session:
+            count = await StatsService(session).reconcile_leaderboard()
+        logger.info("Supplier leaderboard reconciled: %s suppliers", count)
+    finally:
+        await redis.close()
+
+
+async def rebuild_latency() -> None:
+    """Пересчитать гистограммы времени выполнения из orders (время принятия не восстанавливается)"""
+    async with get_session() as session:
+        samples = await LatencyService(session).rebuild_completed()
+    logger.info("order_latency_buckets rebuilt: %s completed orders", samples)
+
+
+async def rebuild_activity() -> None:
+    """Пересчитать activity_hourly_stats и activity_actions из activity_logs"""
+    async with get_session() as session:
+        rows = await ActivityService(session).rebuild()
+    logger.info("activity_hourly_stats rebuilt: %s rows", rows)
+
+
+async def archive_orders_now() -> None:
+    """Перенести давно закрытые заказы в архив (с обновлением версий таблиц для ETag API)"""
+    redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    set_versions_redis(redis)
+    try:
+        await archive_orders()
+        await wait_for_bumps()
+    finally:
+        await redis.close()
+
+
+COMMANDS = {
+    "rebuild-rollups": rebuild_rollups,
+    "reconcile-leaderboard": reconcile_leaderboard,
+    "rebuild-latency": rebuild_latency,
+    "rebuild-activity": rebuild_activity,
+    "maintain-partitions": maintain_partitions,
+    "archive-orders": archive_orders_now,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supply DB maintenance")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(COMMANDS[args.command]())
+
+
+if __name__ == "__main__":
+    main()
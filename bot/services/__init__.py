@@ -2,5 +2,12 @@ from .order_service import OrderService
 from .supplier_service import SupplierService
 from .filter_service import FilterService
 from .message_service import MessageService
+from .rollup_service import RollupService
+from .stats_service import StatsService
+from .latency_service import LatencyService
+from .activity_service import ActivityService
+from .search_service import SearchService
+from .partition_service import PartitionService
+from .archive_service import ArchiveService
 
-__all__ = ["OrderService", "SupplierService", "FilterService", "MessageService"]
+__all__ = ["OrderService", "SupplierService", "FilterService", "MessageService", "RollupService", "StatsService", "LatencyService", "ActivityService", "SearchService", "PartitionService", "ArchiveService"]
@@ -0,0 +1,297 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Deque, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, delete, event, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session as SyncSession
+
+from db.models import ActivityLog, ActivityHourlyStat, ActivityAction
+
+
+logger = logging.getLogger(__name__)
+
+# Запись в activity_logs: (user_id, action, details, created_at)
+ActivityRecord = Tuple[int, str, Optional[str], datetime]
+ACTIVITY_COLUMNS = ("user_id", "action", "details", "created_at")
+
+FLUSH_BATCH_SIZE = 500  # сбросить буфер, как только набралось столько событий
+FLUSH_INTERVAL = 1.0  # ... или раз в столько секунд
+MAX_PENDING = 10_000  # выше этого log() ждёт сброса (backpressure)
+BACKPRESSURE_TIMEOUT = 2.0  # не дождались — пишем событие в транзакции запроса, как раньше
+MAX_FLUSH_ATTEMPTS = 5  # столько раз подряд пачка не записалась — пишем её по одной строке
+
+_PENDING_KEY = "activity_records"  # session.info: события транзакции до коммита
+_sink: Optional["ActivitySink"] = None
+
+
+class ActivityService:
+    """Activity log writes together with the hourly rollup and action catalog.
+
+    Statistics and the action list are read from activity_hourly_stats and
+    activity_actions, so they never scan activity_logs.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def log(self, user_id: int, action: str, details: Optional[str] = None) -> None:
+        """Record an activity event of the caller's transaction.
+
+        With a running ActivitySink the event is only queued: it is handed to the
+        sink when the transaction commits and dropped on rollback. Otherwise the row
+        and its rollup counters are written in the caller's transaction.
+        """
+        # Время события — по часам приложения (UTC) в обоих путях, как и в write_batch
+        created_at = datetime.utcnow()
+        if _sink and await _sink.wait_for_capacity(BACKPRESSURE_TIMEOUT):
+            record = (user_id, action, details, created_at)
+            self.session.info.setdefault(_PENDING_KEY, []).append(record)
+            return
+        self.session.add(ActivityLog(user_id=user_id, action=action, details=details, created_at=created_at))
+        stmt = insert(ActivityHourlyStat).values(
+            hour=created_at.replace(minute=0, second=0, microsecond=0),
+            action=action,
+            count=1,
+        )
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ActivityHourlyStat.hour, ActivityHourlyStat.action],
+                set_={"count": ActivityHourlyStat.count + stmt.excluded.count},
+            )
+        )
+        await self.session.execute(
+            insert(ActivityAction).values(action=action).on_conflict_do_nothing()
+        )
+
+    async def write_batch(self, records: List[ActivityRecord]) -> None:
+        """Stage a batch of log rows (COPY) and their rollup counters; the caller commits"""
+        hourly = Counter(
+            (created_at.replace(minute=0, second=0, microsecond=0), action)
+            for _user_id, action, _details, created_at in records
+        )
+        stmt = insert(ActivityHourlyStat).values([
+            {"hour": hour, "action": action, "count": count}
+            for (hour, action), count in sorted(hourly.items())
+        ])
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ActivityHourlyStat.hour, ActivityHourlyStat.action],
+                set_={"count": ActivityHourlyStat.count + stmt.excluded.count},
+            )
+        )
+        await self.session.execute(
+            insert(ActivityAction)
+            .values([{"action": action} for action in sorted({action for _hour, action in hourly})])
+            .on_conflict_do_nothing()
+        )
+        # COPY идёт через соединение asyncpg той же транзакции, что и счётчики выше
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            ActivityLog.__tablename__, records=records, columns=ACTIVITY_COLUMNS
+        )
+
+    async def actions(self) -> List[str]:
+        """All known actions, sorted"""
+        result = await self.session.execute(select(ActivityAction.action).order_by(ActivityAction.action))
+        return list(result.scalars().all())
+
+    async def hourly_stats(self, hours: int) -> dict:
+        """Action counts and per-hour totals for the last `hours` hours (whole hours)"""
+        start = (datetime.utcnow() - timedelta(hours=hours)).replace(minute=0, second=0, microsecond=0)
+        result = await self.session.execute(
+            select(ActivityHourlyStat.action, func.sum(ActivityHourlyStat.count))
+            .where(ActivityHourlyStat.hour >= start)
+            .group_by(ActivityHourlyStat.action)
+        )
+        action_counts = {action: int(count) for action, count in result.all()}
+
+        result = await self.session.execute(
+            select(ActivityHourlyStat.hour, func.sum(ActivityHourlyStat.count))
+            .where(ActivityHourlyStat.hour >= start)
+            .group_by(ActivityHourlyStat.hour)
+            .order_by(ActivityHourlyStat.hour)
+        )
+        hourly = [{"hour": hour.isoformat(), "count": int(count)} for hour, count in result.all()]
+        return {"period_hours": hours, "action_counts": action_counts, "hourly_activity": hourly}
+
+    async def rebuild(self) -> int:
+        """Recompute the hourly rollup and action catalog from activity_logs. Returns rollup rows."""
+        await self.session.execute(text("LOCK TABLE activity_hourly_stats IN SHARE ROW EXCLUSIVE MODE"))
+        await self.session.execute(delete(ActivityHourlyStat))
+        hour = func.date_trunc("hour", ActivityLog.created_at)
+        await self.session.execute(
+            insert(ActivityHourlyStat).from_select(
+                ["hour", "action", "count"],
+                select(hour, ActivityLog.action, func.count())
+                .where(ActivityLog.created_at.is_not(None))
+                .group_by(hour, ActivityLog.action),
+            )
+        )
+        await self.session.execute(
+            insert(ActivityAction)
+            .from_select(["action"], select(ActivityLog.action).distinct())
+            .on_conflict_do_nothing()
+        )
+        result = await self.session.execute(select(func.count()).select_from(ActivityHourlyStat))
+        await self.session.commit()
+        return result.scalar() or 0
+
+    async def needs_backfill(self) -> bool:
+        """True if activity_logs has rows but the rollup is empty"""
+        result = await self.session.execute(
+            select(
+                select(ActivityHourlyStat.hour).exists(),
+                select(ActivityLog.id).exists(),
+            )
+        )
+        has_rollup, has_logs = result.one()
+        return has_logs and not has_rollup
+
+
+class ActivitySink:
+    """In-memory buffer of committed activity events, flushed to Postgres in batches.
+
+    A flush is triggered by FLUSH_BATCH_SIZE pending events or every FLUSH_INTERVAL
+    seconds; a failed batch stays in the buffer and is retried on the next flush.
+    After MAX_FLUSH_ATTEMPTS failures in a row it is written one event at a time,
+    and events that still fail are dropped with an error, so one bad row cannot
+    block the log.
+    Events still buffered when the process is killed are lost — the log is a
+    dashboard aid, not an audit trail.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+        self._buffer: Deque[ActivityRecord] = deque()
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._failed_attempts = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out what is left"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    def push(self, records: List[ActivityRecord]) -> None:
+        self._buffer.extend(records)
+        if len(self._buffer) >= FLUSH_BATCH_SIZE:
+            self._wakeup.set()
+        if len(self._buffer) >= MAX_PENDING:
+            self._drained.clear()
+
+    async def wait_for_capacity(self, timeout: float) -> bool:
+        """Wait until the buffer is below MAX_PENDING; False on timeout"""
+        if len(self._buffer) < MAX_PENDING:
+            return True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def flush(self) -> int:
+        """Write all buffered events in batches. Returns number of events written."""
+        written = 0
+        async with self._lock:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(FLUSH_BATCH_SIZE, len(self._buffer)))]
+                try:
+                    await self._write(batch)
+                except asyncio.CancelledError:
+                    self._buffer.extendleft(reversed(batch))
+                    raise
+                except Exception:
+                    self._failed_attempts += 1
+                    if self._failed_attempts < MAX_FLUSH_ATTEMPTS:
+                        self._buffer.extendleft(reversed(batch))
+                        raise
+                    logger.exception(
+                        "Activity batch failed %s times, writing its %s events one by one",
+                        self._failed_attempts, len(batch),
+                    )
+                    written += await self._write_each(batch)
+                else:
+                    written += len(batch)
+                self._failed_attempts = 0
+                if len(self._buffer) < MAX_PENDING:
+                    self._drained.set()
+        return written
+
+    async def _write(self, records: List[ActivityRecord]) -> None:
+        async with self.session_factory() as session:
+            await ActivityService(session).write_batch(records)
+            await session.commit()
+
+    async def _write_each(self, records: List[ActivityRecord]) -> int:
+        """Write events in separate transactions, dropping the ones that fail. Returns written count."""
+        written = 0
+        for record in records:
+            try:
+                await self._write([record])
+                written += 1
+            except Exception as e:
+                logger.error("Activity event dropped after failed writes: %r (%s)", record, e)
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Activity log flush failed, %s events pending", len(self._buffer))
+
+
+def start_activity_sink(session_factory: async_sessionmaker) -> ActivitySink:
+    """Switch ActivityService.log to batched writes (called at process start)"""
+    global _sink
+    _sink = ActivitySink(session_factory)
+    _sink.start()
+    return _sink
+
+
+async def stop_activity_sink() -> None:
+    """Flush pending events and return to in-transaction writes (called at shutdown)"""
+    global _sink
+    sink, _sink = _sink, None
+    if sink:
+        await sink.stop()
+
+
+@event.listens_for(SyncSession, "after_commit")
+def _hand_over_committed(session) -> None:
+    records = session.info.pop(_PENDING_KEY, None)
+    if not records:
+        return
+    if _sink:
+        _sink.push(records)
+    else:
+        logger.warning("Activity sink stopped, %s committed events dropped", len(records))
+
+
+@event.listens_for(SyncSession, "after_rollback")
+def _drop_rolled_back(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,88 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, union_all, text
+
+from db.models import Order, OrderArchive, OrderMessage, OrderMessageArchive
+from .table_versions import mark_changed
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 500  # заказов за транзакцию: короткие блокировки, небольшой WAL на коммит
+CLOSED_STATUSES = ("COMPLETED", "CANCELLED")
+
+
+def _copied_columns(model) -> List[str]:
+    # search_vector — вычисляемый столбец, archived_at заполняется по умолчанию
+    return [column.name for column in model.__table__.columns if column.name not in ("search_vector", "archived_at")]
+
+
+ORDER_COLUMNS = _copied_columns(Order)
+MESSAGE_COLUMNS = _copied_columns(OrderMessage)
+
+# Один оператор на пачку: DELETE ... RETURNING из горячих таблиц прямо в INSERT архива.
+# Внешние ключи проверяются в конце оператора, поэтому порядок подзапросов не важен.
+ARCHIVE_BATCH_SQL = text(
+    f"""
+    WITH batch AS (
+        SELECT id FROM orders
+        WHERE status IN ({", ".join(f"'{status}'" for status in CLOSED_STATUSES)})
+          AND coalesce(completed_at, updated_at) < :cutoff
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ), moved_messages AS (
+        DELETE FROM order_messages m USING batch WHERE m.order_id = batch.id
+        RETURNING {", ".join(f"m.{name}" for name in MESSAGE_COLUMNS)}
+    ), moved_orders AS (
+        DELETE FROM orders o USING batch WHERE o.id = batch.id
+        RETURNING {", ".join(f"o.{name}" for name in ORDER_COLUMNS)}
+    ), archived_orders AS (
+        INSERT INTO {OrderArchive.__tablename__} ({", ".join(ORDER_COLUMNS)})
+        SELECT {", ".join(ORDER_COLUMNS)} FROM moved_orders
+        RETURNING id
+    ), archived_messages AS (
+        INSERT INTO {OrderMessageArchive.__tablename__} ({", ".join(MESSAGE_COLUMNS)})
+        SELECT {", ".join(MESSAGE_COLUMNS)} FROM moved_messages
+    )
+    SELECT count(*) FROM archived_orders
+    """
+)
+
+
+def all_orders():
+    """Hot and archived orders as one subquery (columns used by statistics rebuilds)"""
+    columns = ("id", "status", "supplier_id", "admin_id", "created_at", "completed_at")
+    return union_all(
+        select(*(getattr(Order, name) for name in columns)),
+        select(*(getattr(OrderArchive, name) for name in columns)),
+    ).subquery("all_orders")
+
+
+class ArchiveService:
+    """Moves long-closed orders and their messages to orders_archive / order_messages_archive.
+
+    Statistics rollups are not touched: archived orders stay counted.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def archive_closed(self, older_than_days: int, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+        """Archive orders closed more than `older_than_days` ago, one transaction per batch. Returns count."""
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        archived = 0
+        while True:
+            moved = await self.session.scalar(ARCHIVE_BATCH_SQL, {"cutoff": cutoff, "batch_size": batch_size})
+            if moved:
+                mark_changed(self.session, "orders")
+            await self.session.commit()
+            archived += moved
+            if moved < batch_size:
+                break
+        if archived:
+            logger.info("Archived %s orders closed before %s", archived, cutoff.isoformat(timespec="seconds"))
+        return archived
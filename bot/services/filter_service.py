@@ -1,9 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, and_
 
-from db.models import Filter, ActivityLog
+from db.models import Filter
+from .activity_service import ActivityService
+from .pagination import paginate
 
 
 class FilterService:
@@ -33,6 +35,31 @@ class FilterService:
         result = await self.session.execute(query.order_by(Filter.supplier_id, Filter.priority.desc(), Filter.keyword))
         return result.scalars().all()
 
+    async def list_filters(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        supplier_id: Optional[int] = None,
+        active_only: bool = True,
+        search: Optional[str] = None,
+    ) -> Tuple[List[Filter], int]:
+        """One page of filters (by supplier, priority, keyword) and the total number of matches"""
+        conditions = []
+        if supplier_id:
+            conditions.append(Filter.supplier_id == supplier_id)
+        if active_only:
+            conditions.append(Filter.active == True)
+        if search:
+            conditions.append(Filter.keyword.icontains(search, autoescape=True))
+        return await paginate(
+            self.session,
+            Filter,
+            conditions,
+            (Filter.supplier_id, Filter.priority.desc(), Filter.keyword, Filter.id),
+            skip,
+            limit,
+        )
+
     async def get_filters_by_supplier(self, supplier_id: int, active_only: bool = True) -> List[Filter]:
         """Get all filters for supplier"""
         query = select(Filter).where(Filter.supplier_id == supplier_id)
@@ -51,12 +78,11 @@ class FilterService:
 
     async def update_filter(
         self, filter_id: int, keyword: str = None, priority: int = None, active: bool = None
-    ) -> bool:
-        """Update filter (keyword, priority, active)."""
-        filter_obj = await self.get_filter_by_id(filter_id)
-        if not filter_obj:
-            return False
-        
+    ) -> Optional[Filter]:
+        """Update filter (keyword, priority, active) in one UPDATE ... RETURNING.
+
+        Returns the updated filter, None if there is no such filter.
+        """
         updates = {}
         if keyword is not None:
             updates["keyword"] = keyword
@@ -65,18 +91,21 @@ class FilterService:
         if active is not None:
             updates["active"] = active
         
-        if updates:
-            result = await self.session.execute(
-                update(Filter)
-                .where(Filter.id == filter_id)
-                .values(**updates)
-            )
-            
-            if result.rowcount > 0:
-                await self._log_activity(filter_obj.supplier_id, "filter_updated", f"Filter {filter_id} updated")
-                await self.session.commit()
-                return True
-        return False
+        if not updates:
+            return await self.get_filter_by_id(filter_id)
+        
+        result = await self.session.execute(
+            update(Filter)
+            .where(Filter.id == filter_id)
+            .values(**updates)
+            .returning(Filter),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        filter_obj = result.scalar_one_or_none()
+        if filter_obj:
+            await self._log_activity(filter_obj.supplier_id, "filter_updated", f"Filter {filter_id} updated")
+            await self.session.commit()
+        return filter_obj
 
     async def delete_filter(self, filter_id: int) -> bool:
         """Delete filter"""
@@ -153,11 +182,4 @@ class FilterService:
 
     async def _log_activity(self, user_id: int, action: str, details: str = None):
         """Log user activity"""
-        from db.models import ActivityLog
-        
-        log = ActivityLog(
-            user_id=user_id,
-            action=action,
-            details=details
-        )
-        self.session.add(log)
+        await ActivityService(self.session).log(user_id, action, details)
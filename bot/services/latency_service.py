@@ -0,0 +1,179 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, case, cast, literal, Integer
+from sqlalchemy.dialects.postgresql import insert
+
+from db.models import Supplier, OrderLatencyBucket
+from .archive_service import all_orders
+from .rollup_service import UNASSIGNED
+
+
+METRICS = ("accept", "complete")  # назначение -> принятие, создание -> выполнение
+QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+# Логарифмические корзины (как в DDSketch): относительная погрешность квантилей <= 2%.
+# Корзина i покрывает (GAMMA^(i-1), GAMMA^i] секунд, всё до 1 секунды — корзина 0.
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket_index(seconds: float) -> int:
+    """Sketch bucket for a latency in seconds"""
+    if seconds <= 1:
+        return 0
+    return math.ceil(math.log(seconds) / LOG_GAMMA)
+
+
+def bucket_value(index: int) -> float:
+    """Representative latency (seconds) of a bucket, within RELATIVE_ACCURACY of any value in it"""
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+def quantiles(buckets: Dict[int, int]) -> dict:
+    """count and p50/p90/p99 (seconds) of a merged sketch {bucket: count}"""
+    total = sum(buckets.values())
+    result = {"count": total}
+    ordered = sorted(buckets.items())
+    for name, q in QUANTILES:
+        if not total:
+            result[name] = None
+            continue
+        rank = q * (total - 1)
+        seen = 0
+        for index, count in ordered:
+            seen += count
+            if seen > rank:
+                result[name] = round(bucket_value(index), 1)
+                break
+    return result
+
+
+class LatencyService:
+    """Time-to-accept / time-to-complete percentiles from hourly mergeable histograms.
+
+    OrderService records one sample per transition in the caller's transaction;
+    percentiles for a window merge the hourly buckets instead of sorting orders.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def record(
+        self, metric: str, supplier_id: Optional[int], start: Optional[datetime], end: datetime
+    ) -> None:
+        """Record latency from `start` to `end` (skipped when start is unknown).
+
+        Both come from the order row, stamped by Postgres (now()), so they share
+        one clock; the sample is counted in the hour of `end`, as in rebuild_completed.
+        """
+        await self.record_many(metric, [(supplier_id, start, end)])
+
+    async def record_many(
+        self, metric: str, samples: Iterable[Tuple[Optional[int], Optional[datetime], datetime]]
+    ) -> None:
+        """Record (supplier_id, start, end) latencies in one statement"""
+        counts: Dict[Tuple[datetime, int, int], int] = defaultdict(int)
+        for supplier_id, start, end in samples:
+            if start is not None:
+                hour = end.replace(minute=0, second=0, microsecond=0)
+                counts[(hour, supplier_id or UNASSIGNED, bucket_index((end - start).total_seconds()))] += 1
+        if not counts:
+            return
+        stmt = insert(OrderLatencyBucket).values([
+            {
+                "hour": hour,
+                "metric": metric,
+                "supplier_id": supplier_id,
+                "bucket": bucket,
+                "count": count,
+            }
+            for (hour, supplier_id, bucket), count in sorted(counts.items())
+        ])
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    OrderLatencyBucket.hour,
+                    OrderLatencyBucket.metric,
+                    OrderLatencyBucket.supplier_id,
+                    OrderLatencyBucket.bucket,
+                ],
+                set_={"count": OrderLatencyBucket.count + stmt.excluded.count},
+            )
+        )
+
+    async def percentiles(self, hours: int) -> dict:
+        """p50/p90/p99 per metric, overall and per supplier, for the last `hours` hours"""
+        # Часы корзин — по часам базы (время переходов в заказе), граница окна тоже
+        since = await self.session.scalar(
+            select(func.date_trunc("hour", func.localtimestamp() - timedelta(hours=hours)))
+        )
+        result = await self.session.execute(
+            select(
+                OrderLatencyBucket.metric,
+                OrderLatencyBucket.supplier_id,
+                OrderLatencyBucket.bucket,
+                func.sum(OrderLatencyBucket.count),
+            )
+            .where(OrderLatencyBucket.hour >= since)
+            .group_by(OrderLatencyBucket.metric, OrderLatencyBucket.supplier_id, OrderLatencyBucket.bucket)
+        )
+        overall: Dict[str, Dict[int, int]] = {metric: defaultdict(int) for metric in METRICS}
+        per_supplier: Dict[Tuple[str, int], Dict[int, int]] = defaultdict(dict)
+        for metric, supplier_id, bucket, count in result.all():
+            if metric not in overall:
+                continue
+            overall[metric][bucket] += count
+            per_supplier[(metric, supplier_id)][bucket] = count
+
+        names = await self._supplier_names(supplier_id for _metric, supplier_id in per_supplier)
+        metrics = {}
+        for metric in METRICS:
+            suppliers = [
+                {"supplier_id": supplier_id, "name": names.get(supplier_id), **quantiles(buckets)}
+                for (row_metric, supplier_id), buckets in per_supplier.items()
+                if row_metric == metric and supplier_id != UNASSIGNED
+            ]
+            suppliers.sort(key=lambda row: row["count"], reverse=True)
+            metrics[metric] = {"overall": quantiles(overall[metric]), "suppliers": suppliers}
+        return {"hours": hours, "since": since, **metrics}
+
+    async def rebuild_completed(self) -> int:
+        """Recompute the 'complete' sketches from completed_at of orders and orders_archive (backfill).
+
+        'accept' cannot be reconstructed: accept_order overwrites assigned_at.
+        Returns number of samples.
+        """
+        await self.session.execute(delete(OrderLatencyBucket).where(OrderLatencyBucket.metric == "complete"))
+        orders = all_orders()
+        seconds = func.extract("epoch", orders.c.completed_at - orders.c.created_at)
+        bucket = case(
+            (seconds <= 1, 0),
+            else_=cast(func.ceil(func.ln(seconds) / LOG_GAMMA), Integer),
+        )
+        hour = func.date_trunc("hour", orders.c.completed_at)
+        supplier = func.coalesce(orders.c.supplier_id, UNASSIGNED)
+        rows = (
+            select(hour, literal("complete"), supplier, bucket, func.count())
+            .where(orders.c.completed_at.is_not(None), orders.c.created_at.is_not(None))
+            .group_by(hour, supplier, bucket)
+        )
+        await self.session.execute(
+            insert(OrderLatencyBucket).from_select(["hour", "metric", "supplier_id", "bucket", "count"], rows)
+        )
+        total = await self.session.scalar(
+            select(func.coalesce(func.sum(OrderLatencyBucket.count), 0)).where(OrderLatencyBucket.metric == "complete")
+        )
+        await self.session.commit()
+        return total
+
+    async def _supplier_names(self, supplier_ids: Iterable[int]) -> Dict[int, str]:
+        ids: List[int] = sorted(set(supplier_ids) - {UNASSIGNED})
+        if not ids:
+            return {}
+        result = await self.session.execute(select(Supplier.id, Supplier.name).where(Supplier.id.in_(ids)))
+        return dict(result.all())
@@ -1,15 +1,34 @@
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import aliased
 
-from db.models import OrderMessage, Order
+from db.models import OrderMessage, OrderMessageArchive
+from .order_events import emit_message
+
+
+HISTORY_PAGE_SIZE = 10
+
+T = TypeVar("T")
 
 
 class MessageService:
+    """Order chat. Reads fall back to order_messages_archive for archived orders (see ArchiveService)."""
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def _read(self, run: Callable[[type], Awaitable[T]]) -> T:
+        """run(OrderMessage); if it found nothing, run(OrderMessageArchive).
+
+        Архивируются заказ и все его сообщения разом, поэтому пустой результат по
+        горячей таблице — единственный случай, когда нужен архив (лишний запрос
+        по индексу только для заказов без сообщений).
+        """
+        result = await run(OrderMessage)
+        return result or await run(OrderMessageArchive)
+
     async def send_message(self, order_id: str, sender_id: int, message_text: str, message_type: str = "text") -> OrderMessage:
         """Send message to order"""
         message = OrderMessage(
@@ -20,17 +39,81 @@ class MessageService:
         )
         
         self.session.add(message)
+        await self.session.flush()
+        emit_message(self.session, message)
         await self.session.commit()
         return message
 
     async def get_order_messages(self, order_id: str) -> List[OrderMessage]:
-        """Get all messages for order"""
-        result = await self.session.execute(
-            select(OrderMessage)
-            .where(OrderMessage.order_id == order_id)
-            .order_by(OrderMessage.created_at)
-        )
-        return result.scalars().all()
+        """Get all messages for order (OrderMessageArchive rows for an archived order)"""
+        async def run(model):
+            result = await self.session.execute(
+                select(model)
+                .where(model.order_id == order_id)
+                .order_by(model.created_at, model.id)
+            )
+            return result.scalars().all()
+
+        return await self._read(run)
+
+    async def count_messages(self, order_id: str) -> int:
+        """Number of messages of an order (index-only on idx_order_messages_order_created)"""
+        async def run(model):
+            return await self.session.scalar(
+                select(func.count()).select_from(model).where(model.order_id == order_id)
+            ) or 0
+
+        return await self._read(run)
+
+    async def get_last_messages(self, order_id: str, limit: int, message_type: Optional[str] = None) -> List[OrderMessage]:
+        """Last `limit` messages of an order, oldest first"""
+        async def run(model):
+            query = select(model).where(model.order_id == order_id)
+            if message_type:
+                query = query.where(model.message_type == message_type)
+            result = await self.session.execute(
+                query.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+            )
+            return list(reversed(result.scalars().all()))
+
+        return await self._read(run)
+
+    async def get_history_page(
+        self,
+        order_id: str,
+        limit: int = HISTORY_PAGE_SIZE,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> Tuple[List[OrderMessage], bool, bool]:
+        """Page of order history, oldest first: (messages, has_older, has_newer).
+
+        Without a cursor — the newest page; `before_id` / `after_id` page to older /
+        newer messages relative to that message (keyset over (created_at, id)).
+        """
+        newer = after_id is not None
+        cursor_id = after_id if newer else before_id
+
+        async def run(model):
+            key = tuple_(model.created_at, model.id)
+            query = select(model).where(model.order_id == order_id)
+            if cursor_id is not None:
+                # (created_at, id) сообщения-курсора — подзапросом по первичному ключу
+                anchor = aliased(model)
+                cursor = select(anchor.created_at, anchor.id).where(anchor.id == cursor_id).scalar_subquery()
+                query = query.where(key > cursor if newer else key < cursor)
+            if newer:
+                query = query.order_by(model.created_at, model.id)
+            else:
+                query = query.order_by(model.created_at.desc(), model.id.desc())
+            result = await self.session.execute(query.limit(limit + 1))
+            return list(result.scalars().all())
+
+        messages = await self._read(run)
+        more = len(messages) > limit
+        messages = messages[:limit]
+        if newer:
+            return messages, True, more
+        return list(reversed(messages)), more, cursor_id is not None
 
     async def get_message_by_id(self, message_id: int) -> Optional[OrderMessage]:
         """Get message by ID"""
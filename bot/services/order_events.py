@@ -0,0 +1,78 @@
+"""События заказов для живой ленты дашборда (GET /orders/stream): Redis pub/sub после коммита.
+
+OrderService и MessageService кладут события в session.info (emit), после
+коммита они публикуются в канал ORDER_EVENTS_CHANNEL одним pipeline; события
+откатанной транзакции отбрасываются. Публикуют и бот, и API; каждый процесс API
+держит одну подписку и раздаёт события клиентам (api/live.py).
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import List, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SyncSession
+
+
+logger = logging.getLogger(__name__)
+
+ORDER_EVENTS_CHANNEL = "order_events"
+TEXT_PREVIEW_LENGTH = 200  # в событии — начало текста; полностью заказ читается через GET /orders/{id}
+_PENDING_KEY = "order_events"  # session.info: события текущей транзакции
+
+_redis = None  # redis.asyncio.Redis; None — события не публикуются
+_tasks: Set[asyncio.Task] = set()
+
+
+def set_redis(redis_client) -> None:
+    """Подключить Redis для публикации событий заказов (вызывается при старте бота и API)."""
+    global _redis
+    _redis = redis_client
+
+
+def emit(session, event_type: str, order_id: str, **data) -> None:
+    """Queue an order event; it is published only if the session's transaction commits"""
+    if not _redis:
+        return
+    if "text" in data and data["text"] is not None:
+        data["text"] = data["text"][:TEXT_PREVIEW_LENGTH]
+    payload = {"type": event_type, "order_id": order_id, **data, "at": datetime.utcnow()}
+    session.info.setdefault(_PENDING_KEY, []).append(json.dumps(payload, ensure_ascii=False, default=str))
+
+
+def emit_message(session, message) -> None:
+    """Queue an order_message event for a flushed OrderMessage"""
+    emit(
+        session, "order_message", message.order_id,
+        message_id=message.id, sender_id=message.sender_id, message_type=message.message_type,
+        text=message.message_text,
+    )
+
+
+async def publish(payloads: List[str]) -> None:
+    """Publish serialized events to ORDER_EVENTS_CHANNEL in commit order"""
+    if not _redis:
+        return
+    try:
+        pipe = _redis.pipeline(transaction=False)
+        for payload in payloads:
+            pipe.publish(ORDER_EVENTS_CHANNEL, payload)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning("Order event publish error: %s", e)
+
+
+@event.listens_for(SyncSession, "after_commit")
+def _publish_committed(session) -> None:
+    payloads = session.info.pop(_PENDING_KEY, None)
+    if not payloads or not _redis:
+        return
+    task = asyncio.get_running_loop().create_task(publish(payloads))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(SyncSession, "after_rollback")
+def _drop_rolled_back(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,5 +1,4 @@
 import logging
-import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Tuple
 from collections import defaultdict
@@ -7,49 +6,92 @@ from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
-from sqlalchemy import select, update, and_, or_
+from sqlalchemy import select, update, delete, and_, or_, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
 
-from db.models import Order, OrderMessage, Supplier, Filter, ActivityLog
+from db.models import Order, OrderArchive, OrderMessage, Supplier, Filter
+from .activity_service import ActivityService
+from .message_service import MessageService
+from .rollup_service import RollupService
+from .latency_service import LatencyService
+from .stats_service import record_supplier_deltas
+from .order_events import emit as emit_event, emit_message
+from .pagination import encode_cursor, decode_cursor
+from ..utils.order_ids import generate_order_id
+
+
+ORDER_ID_ATTEMPTS = 3  # столкновение ID возможно только между процессами в одну миллисекунду
+BULK_ACTIONS = ("delete", "cancel", "complete", "reassign")
+# Время в заказе (created_at, assigned_at, completed_at) ставит база — now(): задержки
+# для LatencyService считаются по одним часам, даже если часовой пояс сессии не UTC
+
+# Действие -> статусы, из которых оно разрешено. Переход — один UPDATE ... WHERE status IN (...),
+# поэтому повторное нажатие или параллельное действие из дашборда просто не срабатывает.
+# Принять, отклонить и завершить поставщик может только свой или ещё ничей заказ (owner_id в _transition)
+OPEN_STATUSES = ("NEW", "ASSIGNED", "ACCEPTED", "DECLINED")
+ORDER_TRANSITIONS = {
+    "accept": ("NEW", "ASSIGNED"),
+    "decline": ("ASSIGNED", "ACCEPTED"),
+    "complete": ("ASSIGNED", "ACCEPTED"),
+    "cancel": OPEN_STATUSES,
+    "reassign": OPEN_STATUSES,
+}
+
+
+def search_condition(query: str, model=Order):
+    """Substring or fuzzy (pg_trgm word similarity) match on order text; both use the text trigram index"""
+    return or_(model.text.icontains(query, autoescape=True), model.text.op("%>")(query))
+
+
+# Порядок обхода в search_orders: сначала горячая таблица, архив — только когда она исчерпана
+SEARCH_PHASES = (("orders", Order), ("archive", OrderArchive))
 
 
 class OrderService:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.rollups = RollupService(session)
+        self.latency = LatencyService(session)
 
     def generate_id(self) -> str:
-        """Generate short order ID"""
-        return str(uuid.uuid4())[:8].upper()
+        """Generate short time-ordered order ID (see bot/utils/order_ids.py)"""
+        return generate_order_id()
 
     async def create_order(
         self, text: str, admin_id: int, assign_supplier_id: Optional[int] = None
     ) -> Order:
-        """Create new order. If assign_supplier_id is set, assign to that supplier; else find by filters."""
-        order_id = self.generate_id()
-        
-        order = Order()
-        order.id = order_id
-        order.text = text
-        order.status = "NEW"
-        order.admin_id = admin_id
-        
-        self.session.add(order)
-        await self.session.flush()
+        """Create new order. If assign_supplier_id is set, assign to that supplier; else find by filters.
+
+        The returned order has its supplier loaded.
+        """
+        supplier_id = assign_supplier_id
+        if supplier_id is None:
+            supplier = await self._find_suitable_supplier(text)
+            supplier_id = supplier.id if supplier else None
+        values = {"text": text, "admin_id": admin_id, "status": "NEW"}
+        if supplier_id is not None:
+            values.update(supplier_id=supplier_id, assigned_at=func.now(), status="ASSIGNED")
         
-        if assign_supplier_id is not None:
-            order.supplier_id = assign_supplier_id
-            order.assigned_at = datetime.utcnow()
-            order.status = "ASSIGNED"
+        # INSERT ... ON CONFLICT DO NOTHING: занятый ID не ломает транзакцию, берём следующий
+        for _ in range(ORDER_ID_ATTEMPTS):
+            order_id = self.generate_id()
+            stmt = insert(Order).values(id=order_id, **values).on_conflict_do_nothing(index_elements=[Order.id])
+            stmt = stmt.returning(Order).options(selectinload(Order.supplier))
+            order = (await self.session.scalars(stmt)).first()
+            if order:
+                break
         else:
-            supplier = await self._find_suitable_supplier(text)
-            if supplier:
-                order.supplier_id = supplier.id
-                order.assigned_at = datetime.utcnow()
-                order.status = "ASSIGNED"
+            raise RuntimeError("Could not allocate a unique order ID")
         
+        await self.rollups.order_created(order.status, order.supplier_id)
+        emit_event(
+            self.session, "order_created", order.id,
+            status=order.status, supplier_id=order.supplier_id, admin_id=admin_id, text=order.text,
+        )
         await self._log_activity(admin_id, "order_created", f"Order {order_id} created")
         
-        await self.session.commit()
+        await self._commit()
         return order
 
     def _parse_bulk_lines(self, message_text: str) -> List[str]:
@@ -150,102 +192,329 @@ class OrderService:
         matching_suppliers.sort(key=lambda x: x[1], reverse=True)
         return matching_suppliers[0][0]
 
-    async def accept_order(self, order_id: str, supplier_id: int) -> bool:
-        """Accept order by supplier"""
-        result = await self.session.execute(
-            update(Order)
-            .where(Order.id == order_id)
-            .values(
-                status="ACCEPTED",
-                supplier_id=supplier_id,
-                assigned_at=datetime.utcnow()
-            )
+    async def accept_order(self, order_id: str, supplier_id: int) -> Optional[Order]:
+        """Accept order by supplier. Returns the updated order, None if not allowed from its status.
+
+        Raises PermissionError if the order is assigned to another supplier (same for decline/complete).
+        """
+        row = await self._transition(
+            order_id, "accept", owner_id=supplier_id,
+            status="ACCEPTED", supplier_id=supplier_id, assigned_at=func.now(),
+        )
+        if not row:
+            return None
+        await self.rollups.order_moved(row.day, row.old_status, row.old_supplier_id, "ACCEPTED", supplier_id)
+        await self.latency.record(
+            "accept", supplier_id, row.old_assigned_at or row.Order.created_at, row.Order.assigned_at
         )
+        await self._log_activity(supplier_id, "order_accepted", f"Order {order_id} accepted")
+        await self._commit()
+        return row.Order
+
+    async def decline_order(self, order_id: str, supplier_id: int) -> Optional[Order]:
+        """Decline order and try to reassign (the returned order carries the new supplier_id)"""
+        # Поставщик подбирается до UPDATE: сам переход — один условный оператор
+        order_text = await self.session.scalar(select(Order.text).where(Order.id == order_id))
+        if order_text is None:
+            return None
+        values = {"status": "NEW", "supplier_id": None, "assigned_at": None}
+        new_supplier = await self._find_suitable_supplier(order_text)
+        if new_supplier and new_supplier.id != supplier_id:
+            values = {"status": "ASSIGNED", "supplier_id": new_supplier.id, "assigned_at": func.now()}
         
-        if result.rowcount > 0:
-            await self._log_activity(supplier_id, "order_accepted", f"Order {order_id} accepted")
-            await self.session.commit()
-            return True
-        return False
-
-    async def decline_order(self, order_id: str, supplier_id: int) -> bool:
-        """Decline order and try to reassign"""
-        result = await self.session.execute(
-            update(Order)
+        row = await self._transition(order_id, "decline", owner_id=supplier_id, **values)
+        if not row:
+            return None
+        await self.rollups.order_moved(
+            row.day, row.old_status, row.old_supplier_id, values["status"], values["supplier_id"]
+        )
+        await self._log_activity(supplier_id, "order_declined", f"Order {order_id} declined")
+        await self._commit()
+        return row.Order
+
+    async def complete_order(self, order_id: str, supplier_id: int) -> Optional[Order]:
+        """Complete order. Returns the updated order, None if not allowed from its status."""
+        row = await self._transition(
+            order_id, "complete", owner_id=supplier_id, status="COMPLETED", completed_at=func.now()
+        )
+        if not row:
+            return None
+        await self.rollups.order_moved(row.day, row.old_status, row.old_supplier_id, "COMPLETED", row.old_supplier_id)
+        await self.latency.record("complete", row.old_supplier_id, row.Order.created_at, row.Order.completed_at)
+        await self._log_activity(supplier_id, "order_completed", f"Order {order_id} completed")
+        await self._commit()
+        return row.Order
+
+    async def cancel_order(self, order_id: str, supplier_id: int) -> Optional[Order]:
+        """Cancel order. Returns the updated order, None if not allowed from its status."""
+        row = await self._transition(order_id, "cancel", status="CANCELLED", supplier_id=None, assigned_at=None)
+        if not row:
+            return None
+        await self.rollups.order_moved(row.day, row.old_status, row.old_supplier_id, "CANCELLED", None)
+        await self._log_activity(supplier_id, "order_cancelled", f"Order {order_id} cancelled")
+        await self._commit()
+        return row.Order
+
+    async def reassign_order(self, order_id: str, supplier_id: int) -> Optional[Order]:
+        """Assign order to another supplier (admin action). None if the order is already closed."""
+        row = await self._transition(
+            order_id, "reassign", status="ASSIGNED", supplier_id=supplier_id, assigned_at=func.now()
+        )
+        if not row:
+            return None
+        await self.rollups.order_moved(row.day, row.old_status, row.old_supplier_id, "ASSIGNED", supplier_id)
+        await self._commit()
+        return row.Order
+
+    async def _transition(self, order_id: str, action: Optional[str], owner_id: Optional[int] = None, **values):
+        """Conditional status transition in one statement: UPDATE ... WHERE status IN (allowed) RETURNING.
+
+        The previous status/supplier (needed by the rollups) come from a locking
+        subquery in the same statement. Returns a row (Order with its supplier
+        loaded, old_status, old_supplier_id, old_assigned_at, day) or None when
+        the order does not exist or `action` is not allowed from its current
+        status. action=None updates regardless of status (dashboard edit).
+        With owner_id (supplier actions) the order must also be unassigned or
+        assigned to that supplier; otherwise PermissionError is raised.
+        """
+        old = (
+            select(
+                Order.id,
+                Order.status,
+                Order.supplier_id,
+                Order.assigned_at,
+                func.date(Order.created_at).label("day"),
+            )
             .where(Order.id == order_id)
-            .values(
-                status="NEW",
-                supplier_id=None,
-                assigned_at=None
+            .with_for_update()
+            .subquery("old")
+        )
+        stmt = (
+            update(Order)
+            .where(Order.id == old.c.id)
+            .values(**values)
+            .returning(
+                Order,
+                old.c.status.label("old_status"),
+                old.c.supplier_id.label("old_supplier_id"),
+                old.c.assigned_at.label("old_assigned_at"),
+                old.c.day,
             )
+            .options(selectinload(Order.supplier))
         )
-        
-        if result.rowcount > 0:
-            # Try to reassign to another supplier
-            order = await self.get_order(order_id)
-            if order:
-                new_supplier = await self._find_suitable_supplier(order.text)
-                if new_supplier and new_supplier.id != supplier_id:
-                    order.supplier_id = new_supplier.id
-                    order.assigned_at = datetime.utcnow()
-                    order.status = "ASSIGNED"
-            
-            await self._log_activity(supplier_id, "order_declined", f"Order {order_id} declined")
-            await self.session.commit()
-            return True
-        return False
-
-    async def complete_order(self, order_id: str, supplier_id: int) -> bool:
-        """Complete order"""
+        if action is not None:
+            stmt = stmt.where(old.c.status.in_(ORDER_TRANSITIONS[action]))
+        if owner_id is not None:
+            stmt = stmt.where(or_(old.c.supplier_id.is_(None), old.c.supplier_id == owner_id))
+        # fetch: заказ мог уже быть в сессии — его атрибуты обновляются из RETURNING (без SELECT)
         result = await self.session.execute(
-            update(Order)
-            .where(Order.id == order_id)
-            .values(
-                status="COMPLETED",
-                completed_at=datetime.utcnow()
+            stmt, execution_options={"synchronize_session": "fetch"}
+        )
+        row = result.first()
+        if not row and owner_id is not None:
+            # Отказ: чужой заказ — «не разрешено», иначе — неподходящий статус (None)
+            owner = await self.session.scalar(select(Order.supplier_id).where(Order.id == order_id))
+            if owner is not None and owner != owner_id:
+                raise PermissionError(f"Order {order_id} is assigned to another supplier")
+        if row:
+            emit_event(
+                self.session, "order_updated", order_id,
+                status=row.Order.status, supplier_id=row.Order.supplier_id, old_status=row.old_status,
             )
+        return row
+
+    async def update_order(self, order_id: str, **values) -> Optional[Order]:
+        """Update order fields (dashboard edit). Keeps statistics rollups in sync.
+
+        Returns the updated order with its supplier loaded, None if there is no such order.
+        """
+        values["updated_at"] = func.now()
+        row = await self._transition(order_id, None, **values)
+        if not row:
+            return None
+        await self.rollups.order_moved(
+            row.day, row.old_status, row.old_supplier_id, row.Order.status, row.Order.supplier_id
         )
+        await self._commit()
+        return row.Order
+
+    async def delete_order(self, order_id: str) -> bool:
+        """Delete order and its messages (messages first due to FK)"""
+        state = await self._lock_state(order_id)
+        if not state:
+            return False
         
-        if result.rowcount > 0:
-            await self._log_activity(supplier_id, "order_completed", f"Order {order_id} completed")
-            await self.session.commit()
-            return True
-        return False
-
-    async def cancel_order(self, order_id: str, supplier_id: int) -> bool:
-        """Cancel order"""
+        await self.session.execute(delete(OrderMessage).where(OrderMessage.order_id == order_id))
+        await self.session.execute(delete(Order).where(Order.id == order_id))
+        await self.rollups.order_removed(state.day, state.status, state.supplier_id)
+        emit_event(self.session, "order_deleted", order_id)
+        await self._commit()
+        return True
+
+    async def bulk_action(
+        self, order_ids: List[str], action: str, actor_id: int, supplier_id: Optional[int] = None
+    ) -> Dict[str, Optional[str]]:
+        """Apply one of BULK_ACTIONS to many orders in one transaction with set-based statements.
+
+        Same effect per order as delete_order / cancel_order / complete_order / reassign_order,
+        including ORDER_TRANSITIONS (supplier_id is required for "reassign").
+        Returns {order_id: None if done, else "not_found" / "invalid_status"}.
+        """
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Unknown bulk action: {action}")
+        if action == "reassign" and supplier_id is None:
+            raise ValueError("supplier_id is required to reassign orders")
+        locked = await self._lock_states(order_ids)
+        states = {
+            order_id: state for order_id, state in locked.items()
+            if action == "delete" or state.status in ORDER_TRANSITIONS[action]
+        }
+        ids = list(states)
+        if ids:
+            now = func.now()
+            if action == "delete":
+                await self.session.execute(delete(OrderMessage).where(OrderMessage.order_id.in_(ids)))
+                await self.session.execute(delete(Order).where(Order.id.in_(ids)))
+                new_status, new_supplier = None, None
+            else:
+                values = {
+                    "cancel": {"status": "CANCELLED", "supplier_id": None, "assigned_at": None},
+                    "complete": {"status": "COMPLETED", "completed_at": now},
+                    "reassign": {"status": "ASSIGNED", "supplier_id": supplier_id, "assigned_at": now},
+                }[action]
+                await self.session.execute(update(Order).where(Order.id.in_(ids)).values(**values))
+                new_status = values["status"]
+                new_supplier = values.get("supplier_id")
+            await self.rollups.orders_moved(
+                (
+                    state.day,
+                    state.status,
+                    state.supplier_id,
+                    new_status,
+                    state.supplier_id if action == "complete" else new_supplier,
+                )
+                for state in states.values()
+            )
+            if action == "complete":
+                await self.latency.record_many(
+                    "complete",
+                    [(state.supplier_id, state.created_at, state.now) for state in states.values()],
+                )
+            for order_id, state in states.items():
+                if action == "delete":
+                    emit_event(self.session, "order_deleted", order_id)
+                else:
+                    emit_event(
+                        self.session, "order_updated", order_id,
+                        status=new_status,
+                        supplier_id=state.supplier_id if action == "complete" else new_supplier,
+                        old_status=state.status,
+                    )
+            if action in ("cancel", "complete"):
+                done = "cancelled" if action == "cancel" else "completed"
+                for order_id in ids:
+                    await self._log_activity(actor_id, f"order_{done}", f"Order {order_id} {done} (bulk)")
+        await self._commit()
+        return {
+            order_id: None if order_id in states else "invalid_status" if order_id in locked else "not_found"
+            for order_id in order_ids
+        }
+
+    async def unassign_supplier_orders(self, supplier_id: int) -> None:
+        """Unassign all orders of supplier (before deleting it). Does not commit."""
+        await self.session.execute(
+            update(Order).where(Order.supplier_id == supplier_id).values(supplier_id=None)
+        )
+        await self.session.execute(
+            update(OrderArchive).where(OrderArchive.supplier_id == supplier_id).values(supplier_id=None)
+        )
+        await self.rollups.unassign_supplier(supplier_id)
+
+    async def _commit(self):
+        """Commit and push the committed supplier counter changes to the Redis leaderboard"""
+        await self.session.commit()
+        deltas, self.rollups.pending = self.rollups.pending, []
+        await record_supplier_deltas(deltas)
+
+    async def _lock_state(self, order_id: str):
+        """Lock order row and return its (status, supplier_id, day, created_at, assigned_at) before a transition"""
         result = await self.session.execute(
-            update(Order)
+            select(
+                Order.status,
+                Order.supplier_id,
+                func.date(Order.created_at).label("day"),
+                Order.created_at,
+                Order.assigned_at,
+            )
             .where(Order.id == order_id)
-            .values(
-                status="CANCELLED",
-                supplier_id=None,
-                assigned_at=None
+            .with_for_update()
+        )
+        return result.one_or_none()
+
+    async def _lock_states(self, order_ids: List[str]) -> Dict[str, object]:
+        """_lock_state for many orders: one SELECT ... FOR UPDATE, rows locked in id order"""
+        result = await self.session.execute(
+            select(
+                Order.id,
+                Order.status,
+                Order.supplier_id,
+                func.date(Order.created_at).label("day"),
+                Order.created_at,
+                Order.assigned_at,
+                func.localtimestamp().label("now"),  # = now() в колонках заказа (часы базы)
             )
+            .where(Order.id.in_(set(order_ids)))
+            .order_by(Order.id)
+            .with_for_update()
         )
-        
-        if result.rowcount > 0:
-            await self._log_activity(supplier_id, "order_cancelled", f"Order {order_id} cancelled")
-            await self.session.commit()
-            return True
-        return False
-
-    async def get_order(self, order_id: str) -> Optional[Order]:
-        """Get order by ID"""
+        return {row.id: row for row in result.all()}
+
+    async def get_order(
+        self, order_id: str, include_archived: bool = True, with_messages: bool = False
+    ) -> Optional[Order]:
+        """Get order by ID, falling back to orders_archive (an OrderArchive, read-only).
+
+        Pass include_archived=False before changing the order or writing to its chat;
+        with_messages=True also loads its messages (OrderResponse), from
+        order_messages_archive for an archived order.
+        """
+        options = [selectinload(Order.supplier)]
+        if with_messages:
+            options.append(selectinload(Order.messages))
         result = await self.session.execute(
             select(Order)
-            .options(selectinload(Order.supplier))
+            .options(*options)
             .where(Order.id == order_id)
         )
+        order = result.scalar_one_or_none()
+        if order or not include_archived:
+            return order
+        options = [selectinload(OrderArchive.supplier)]
+        if with_messages:
+            options.append(selectinload(OrderArchive.messages))
+        result = await self.session.execute(
+            select(OrderArchive)
+            .options(*options)
+            .where(OrderArchive.id == order_id)
+        )
         return result.scalar_one_or_none()
 
-    async def get_orders_by_supplier(self, supplier_id: int, status: Optional[str] = None) -> List[Order]:
-        """Get orders for specific supplier"""
+    async def get_orders_by_supplier(
+        self,
+        supplier_id: int,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Order]:
+        """Get orders for specific supplier, newest first (idx_orders_supplier_status)"""
         query = select(Order).where(Order.supplier_id == supplier_id)
         if status:
             query = query.where(Order.status == status)
         
-        result = await self.session.execute(query.order_by(Order.created_at.desc()))
+        query = query.order_by(Order.created_at.desc(), Order.id.desc()).offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self.session.execute(query)
         return result.scalars().all()
 
     async def get_orders_by_admin(self, admin_id: int, limit: int = 50) -> List[Order]:
@@ -259,16 +528,45 @@ class OrderService:
         )
         return result.scalars().all()
 
-    async def search_orders(self, query: str, limit: int = 20) -> List[Order]:
-        """Search orders by text"""
-        result = await self.session.execute(
-            select(Order)
-            .options(selectinload(Order.supplier))
-            .where(Order.text.ilike(f"%{query}%"))
-            .order_by(Order.created_at.desc())
-            .limit(limit)
-        )
-        return result.scalars().all()
+    async def search_orders(
+        self, query: str, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Order], Optional[str]]:
+        """Search orders by text, best matches first (pg_trgm similarity), newest first among equals.
+
+        Archived orders follow all matches from the hot table (the archive is
+        queried only once those are exhausted).
+        Keyset pagination: pass the returned cursor to get the next page (None — last page).
+        Raises ValueError for a malformed cursor.
+        """
+        phases = [name for name, _model in SEARCH_PHASES]
+        phase, after = phases[0], None
+        if cursor:
+            phase, last_rank, last_created_at, last_id = decode_cursor(cursor, (str, float, str, str))
+            if phase not in phases:
+                raise ValueError("Invalid cursor")
+            after = (last_rank, datetime.fromisoformat(last_created_at), last_id)
+
+        rows = []
+        for name, model in SEARCH_PHASES[phases.index(phase):]:
+            rank = func.word_similarity(query, model.text)
+            stmt = (
+                select(model, rank.label("rank"))
+                .options(selectinload(model.supplier))
+                .where(search_condition(query, model))
+            )
+            if after and name == phase:
+                stmt = stmt.where(tuple_(rank, model.created_at, model.id) < tuple_(*after))
+            stmt = stmt.order_by(rank.desc(), model.created_at.desc(), model.id.desc()).limit(limit + 1 - len(rows))
+            rows += [(name, order, order_rank) for order, order_rank in (await self.session.execute(stmt)).all()]
+            if len(rows) > limit:
+                break
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            name, last, last_rank = rows[-1]
+            next_cursor = encode_cursor([name, last_rank, last.created_at, last.id])
+        return [order for _name, order, _rank in rows], next_cursor
 
     async def add_message(self, order_id: str, sender_id: int, message_text: str, message_type: str = "text") -> OrderMessage:
         """Add message to order"""
@@ -280,23 +578,15 @@ class OrderService:
         )
         
         self.session.add(message)
+        await self.session.flush()
+        emit_message(self.session, message)
         await self.session.commit()
         return message
 
     async def get_order_messages(self, order_id: str) -> List[OrderMessage]:
-        """Get all messages for order"""
-        result = await self.session.execute(
-            select(OrderMessage)
-            .where(OrderMessage.order_id == order_id)
-            .order_by(OrderMessage.created_at)
-        )
-        return result.scalars().all()
+        """Get all messages for order, archived orders included (see MessageService)"""
+        return await MessageService(self.session).get_order_messages(order_id)
 
     async def _log_activity(self, user_id: int, action: str, details: str = None):
         """Log user activity"""
-        log = ActivityLog(
-            user_id=user_id,
-            action=action,
-            details=details
-        )
-        self.session.add(log)
+        await ActivityService(self.session).log(user_id, action, details)
@@ -0,0 +1,107 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, select, func, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Ниже этой оценки планировщика total считается точно (count(*) по небольшой выборке дешёвый)
+EXACT_COUNT_THRESHOLD = 10_000
+
+_explain_dialect = postgresql.dialect(paramstyle="named")
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque keyset cursor from the sort-key values of the last row on a page"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """Sort-key values back from a cursor, one per entry of `types`; ValueError if it is malformed.
+
+    The values go into row comparisons as bind parameters, so a value of the wrong
+    JSON type would fail in Postgres (500) instead of being rejected here.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    if not all(_is_type(value, expected) for value, expected in zip(values, types)):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _is_type(value: Any, expected: type) -> bool:
+    # bool — подкласс int, а целое в JSON годится и для float (ранг 0 или 1)
+    if isinstance(value, bool):
+        return expected is bool
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def created_before(created_at_column, id_column, cursor: str, id_type: type = int):
+    """Keyset condition for lists ordered by (created_at DESC, id DESC); id_type — str for order IDs"""
+    created_at, row_id = decode_cursor(cursor, (str, id_type))
+    created_at = datetime.fromisoformat(created_at)
+    # Отдельное условие по created_at — для отсечения секций (activity_logs); по row-сравнению его нет
+    return and_(
+        created_at_column <= created_at,
+        tuple_(created_at_column, id_column) < tuple_(created_at, row_id),
+    )
+
+
+def next_created_cursor(rows: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+    """Trim a (limit + 1)-row page; cursor after the last kept row, None on the last page"""
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = list(rows[:limit])
+    return rows, encode_cursor([rows[-1].created_at, rows[-1].id])
+
+
+async def count_total(session: AsyncSession, query, exact: bool = False) -> Tuple[int, bool]:
+    """(total, is_exact) for the rows of `query` (a select without order/limit).
+
+    Unless exact is requested, large results return the planner's row estimate
+    instead of running count(*).
+    """
+    if not exact:
+        estimate = await estimate_rows(session, query)
+        if estimate > EXACT_COUNT_THRESHOLD:
+            return estimate, False
+    total = await session.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    return total or 0, True
+
+
+async def estimate_rows(session: AsyncSession, query) -> int:
+    """Planner row estimate (EXPLAIN) for a select"""
+    compiled = query.order_by(None).compile(dialect=_explain_dialect)
+    explain = text(f"EXPLAIN (FORMAT JSON) {compiled}").bindparams(**compiled.params)
+    plan = (await session.execute(explain)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate(session: AsyncSession, model, conditions, order_by, skip: int, limit: int) -> Tuple[list, int]:
+    """Page of `model` rows plus total matches, counted in the same query (count(*) OVER ())"""
+    result = await session.execute(
+        select(model, func.count().over().label("total"))
+        .where(*conditions)
+        .order_by(*order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = result.all()
+    if rows:
+        return [row[0] for row in rows], rows[0].total
+    # Страница за концом выборки: окно пустое, считаем отдельно
+    total = await session.scalar(select(func.count()).select_from(model).where(*conditions)) if skip else 0
+    return [], total or 0
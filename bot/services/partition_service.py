@@ -0,0 +1,96 @@
+import re
+from datetime import date, datetime
+from typing import List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+
+# Таблицы с помесячными секциями <table>_pYYYYMM (см. миграцию 0008) и секцией <table>_default (0012)
+PARTITIONED_TABLES = ("activity_logs",)
+PARTITION_MONTHS_AHEAD = 3  # секции создаются заранее, чтобы вставка не упала на границе месяца
+PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(day: date, shift: int = 0) -> date:
+    """First day of the month `shift` months from `day`'s month"""
+    months = day.year * 12 + day.month - 1 + shift
+    return date(months // 12, months % 12 + 1, 1)
+
+
+class PartitionService:
+    """Monthly range partitions: creation ahead of time and the retention window."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def partitions(self, table: str) -> List[Tuple[str, date]]:
+        """(partition name, month start) of a partitioned table, oldest first"""
+        result = await self.session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": table},
+        )
+        partitions = []
+        for name in result.scalars().all():
+            match = PARTITION_NAME.search(name)
+            if match:
+                partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda item: item[1])
+
+    async def ensure_partitions(self, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+        """Create partitions for the current and next `months_ahead` months. Returns created names.
+
+        Rows of those months that went to the DEFAULT partition meanwhile are moved
+        into the new partition: it is filled as a plain table and then attached.
+        """
+        this_month = month_start(datetime.utcnow().date())
+        created = []
+        for table in PARTITIONED_TABLES:
+            existing = {month for _name, month in await self.partitions(table)}
+            for shift in range(months_ahead + 1):
+                month = month_start(this_month, shift)
+                if month in existing:
+                    continue
+                name = f"{table}_p{month:%Y%m}"
+                bounds = f"'{month.isoformat()}'", f"'{month_start(month, 1).isoformat()}'"
+                await self.session.execute(
+                    text(f'CREATE TABLE IF NOT EXISTS "{name}" (LIKE "{table}" INCLUDING DEFAULTS)')
+                )
+                await self.session.execute(
+                    text(
+                        f'WITH moved AS (DELETE FROM "{table}_default" '
+                        f"WHERE created_at >= {bounds[0]} AND created_at < {bounds[1]} RETURNING *) "
+                        f'INSERT INTO "{name}" SELECT * FROM moved'
+                    )
+                )
+                await self.session.execute(
+                    text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM ({bounds[0]}) TO ({bounds[1]})')
+                )
+                created.append(name)
+        await self.session.commit()
+        return created
+
+    async def drop_expired(self, retention_months: int) -> List[str]:
+        """Detach and drop partitions that end before the retention window. Returns dropped names.
+
+        The window is whole months: with retention_months=12 rows of the current
+        month and the 12 previous ones are kept. Expired rows of the DEFAULT
+        partition are deleted.
+        """
+        cutoff = month_start(datetime.utcnow().date(), -retention_months)
+        dropped = []
+        for table in PARTITIONED_TABLES:
+            await self.session.execute(
+                text(f'DELETE FROM "{table}_default" WHERE created_at < \'{cutoff.isoformat()}\'')
+            )
+            for name, month in await self.partitions(table):
+                if month_start(month, 1) > cutoff:
+                    break
+                await self.session.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+                await self.session.execute(text(f'DROP TABLE "{name}"'))
+                dropped.append(name)
+        await self.session.commit()
+        return dropped
@@ -0,0 +1,194 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, literal, text
+from sqlalchemy.dialects.postgresql import insert
+
+from db.models import OrderDailyStat, SupplierStat
+from .archive_service import all_orders
+
+
+UNASSIGNED = 0  # supplier_id в order_daily_stats для заказов без поставщика
+
+# Статус заказа -> счётчик в supplier_stats (total считается для любого статуса)
+SUPPLIER_STATUS_COUNTERS = {"ACCEPTED": "accepted", "COMPLETED": "completed", "DECLINED": "declined"}
+SUPPLIER_COUNTER_COLUMNS = ("total", "accepted", "completed", "declined")
+
+
+def supplier_counter_deltas(deltas) -> Dict[int, Dict[str, int]]:
+    """Fold rollup deltas ((day, status, supplier_id), delta) into per-supplier counter deltas"""
+    per_supplier: Dict[int, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(SUPPLIER_COUNTER_COLUMNS, 0))
+    for (_day, status, supplier_id), delta in deltas:
+        if supplier_id == UNASSIGNED:
+            continue
+        counters = per_supplier[supplier_id]
+        counters["total"] += delta
+        column = SUPPLIER_STATUS_COUNTERS.get(status)
+        if column:
+            counters[column] += delta
+    return {supplier_id: counters for supplier_id, counters in per_supplier.items() if any(counters.values())}
+
+
+class RollupService:
+    """Incremental maintenance of the order_daily_stats rollup and supplier_stats counters.
+
+    Methods only stage statements in the caller's session; the caller commits
+    them together with the order change itself.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        # Изменения счётчиков с последнего коммита: ((day, status, supplier_id), delta)
+        self.pending: List[Tuple[Tuple[Optional[date], str, int], int]] = []
+
+    async def order_created(self, status: str, supplier_id: Optional[int]) -> None:
+        """Count a new order (created_at = now(), i.e. current_date of this transaction)"""
+        stmt = insert(OrderDailyStat).values(
+            day=func.current_date(),
+            status=status,
+            supplier_id=supplier_id or UNASSIGNED,
+            count=1,
+        )
+        await self.session.execute(self._accumulate(stmt))
+        deltas = [((None, status, supplier_id or UNASSIGNED), 1)]
+        await self._apply_supplier_stats(deltas)
+        self.pending.extend(deltas)
+
+    async def order_moved(
+        self,
+        day: date,
+        old_status: str,
+        old_supplier_id: Optional[int],
+        new_status: str,
+        new_supplier_id: Optional[int],
+    ) -> None:
+        """Move one order of `day` from (old_status, old_supplier) to (new_status, new_supplier)"""
+        old_key = (day, old_status, old_supplier_id or UNASSIGNED)
+        new_key = (day, new_status, new_supplier_id or UNASSIGNED)
+        if old_key == new_key:
+            return
+        await self._apply([(old_key, -1), (new_key, 1)])
+
+    async def order_removed(self, day: date, status: str, supplier_id: Optional[int]) -> None:
+        """Uncount a deleted order"""
+        await self._apply([((day, status, supplier_id or UNASSIGNED), -1)])
+
+    async def orders_moved(
+        self, moves: Iterable[Tuple[date, str, Optional[int], Optional[str], Optional[int]]]
+    ) -> None:
+        """order_moved / order_removed for many orders in one statement (bulk actions).
+
+        moves are (day, old_status, old_supplier_id, new_status, new_supplier_id);
+        new_status=None uncounts a deleted order.
+        """
+        # Одинаковые ключи суммируются: ON CONFLICT не может обновить строку дважды за оператор
+        totals: Dict[Tuple[date, str, int], int] = defaultdict(int)
+        for day, old_status, old_supplier_id, new_status, new_supplier_id in moves:
+            totals[(day, old_status, old_supplier_id or UNASSIGNED)] -= 1
+            if new_status is not None:
+                totals[(day, new_status, new_supplier_id or UNASSIGNED)] += 1
+        deltas = [(key, delta) for key, delta in totals.items() if delta]
+        if deltas:
+            await self._apply(deltas)
+
+    async def unassign_supplier(self, supplier_id: int) -> None:
+        """Move all counts of a supplier to «не назначен» (supplier is being deleted)"""
+        rows = select(
+            OrderDailyStat.day,
+            OrderDailyStat.status,
+            literal(UNASSIGNED),
+            OrderDailyStat.count,
+        ).where(OrderDailyStat.supplier_id == supplier_id)
+        stmt = insert(OrderDailyStat).from_select(["day", "status", "supplier_id", "count"], rows)
+        await self.session.execute(self._accumulate(stmt))
+        await self.session.execute(delete(OrderDailyStat).where(OrderDailyStat.supplier_id == supplier_id))
+        await self.session.execute(delete(SupplierStat).where(SupplierStat.supplier_id == supplier_id))
+
+    async def rebuild(self) -> int:
+        """Recompute the rollup and supplier counters from orders and orders_archive (backfill / drift repair).
+
+        Returns number of rollup rows.
+        """
+        # Блокируем таблицы, чтобы параллельные переходы статусов не потерялись во время пересчёта
+        await self.session.execute(text("LOCK TABLE order_daily_stats, supplier_stats IN SHARE ROW EXCLUSIVE MODE"))
+        await self.session.execute(delete(OrderDailyStat))
+        await self.session.execute(delete(SupplierStat))
+        orders = all_orders()
+        day = func.date(orders.c.created_at)
+        supplier = func.coalesce(orders.c.supplier_id, UNASSIGNED)
+        rows = (
+            select(day, orders.c.status, supplier, func.count())
+            .group_by(day, orders.c.status, supplier)
+        )
+        await self.session.execute(
+            insert(OrderDailyStat).from_select(["day", "status", "supplier_id", "count"], rows)
+        )
+        counters = (
+            select(
+                orders.c.supplier_id,
+                func.count(),
+                *(func.count().filter(orders.c.status == status) for status in SUPPLIER_STATUS_COUNTERS),
+            )
+            .where(orders.c.supplier_id.is_not(None))
+            .group_by(orders.c.supplier_id)
+        )
+        await self.session.execute(
+            insert(SupplierStat).from_select(
+                ["supplier_id", "total", *SUPPLIER_STATUS_COUNTERS.values()], counters
+            )
+        )
+        result = await self.session.execute(select(func.count()).select_from(OrderDailyStat))
+        await self.session.commit()
+        return result.scalar() or 0
+
+    async def needs_backfill(self) -> bool:
+        """True if the rollup or supplier counters are empty while there are orders to count"""
+        orders = all_orders()
+        result = await self.session.execute(
+            select(
+                select(OrderDailyStat.day).exists(),
+                select(orders.c.id).exists(),
+                select(SupplierStat.supplier_id).exists(),
+                select(orders.c.id).where(orders.c.supplier_id.is_not(None)).exists(),
+            )
+        )
+        has_rollup, has_orders, has_supplier_stats, has_assigned = result.one()
+        return (has_orders and not has_rollup) or (has_assigned and not has_supplier_stats)
+
+    async def _apply(self, deltas: List[Tuple[Tuple[date, str, int], int]]) -> None:
+        # Один INSERT ... ON CONFLICT на все строки; сортировка ключей даёт одинаковый
+        # порядок блокировок в параллельных транзакциях (без взаимных блокировок)
+        deltas = sorted(deltas, key=lambda item: item[0])
+        stmt = insert(OrderDailyStat).values([
+            {"day": day, "status": status, "supplier_id": supplier_id, "count": delta}
+            for (day, status, supplier_id), delta in deltas
+        ])
+        await self.session.execute(self._accumulate(stmt))
+        await self._apply_supplier_stats(deltas)
+        self.pending.extend(deltas)
+
+    async def _apply_supplier_stats(self, deltas) -> None:
+        per_supplier = supplier_counter_deltas(deltas)
+        if not per_supplier:
+            return
+        stmt = insert(SupplierStat).values([
+            {"supplier_id": supplier_id, **counters}
+            for supplier_id, counters in sorted(per_supplier.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SupplierStat.supplier_id],
+            set_={
+                column: getattr(SupplierStat, column) + getattr(stmt.excluded, column)
+                for column in SUPPLIER_COUNTER_COLUMNS
+            },
+        )
+        await self.session.execute(stmt)
+
+    @staticmethod
+    def _accumulate(stmt):
+        return stmt.on_conflict_do_update(
+            index_elements=[OrderDailyStat.day, OrderDailyStat.status, OrderDailyStat.supplier_id],
+            set_={"count": OrderDailyStat.count + stmt.excluded.count},
+        )
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal, case, union_all, Integer, String
+
+from db.models import Order, OrderMessage, OrderArchive, OrderMessageArchive
+
+
+TS_CONFIG = "russian"  # встроенная pg_catalog.russian (стемминг snowball)
+HEADLINE_OPTIONS = "MaxWords=25, MinWords=10, MaxFragments=2"
+
+
+class SearchService:
+    """Word-level full-text search over order text and order messages.
+
+    Matches use the GIN indexes on the generated search_vector columns;
+    ts_headline (the expensive part) runs only for the rows of the returned page.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def search(
+        self,
+        query: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = 20,
+    ) -> List[dict]:
+        """Best matches first: order_id, source (order/message), rank, created_at, status, snippet.
+
+        Archived orders are searched only when the hot tables give fewer than `limit` hits.
+        """
+        hits = await self._search_tables(Order, OrderMessage, query, date_from, date_to, limit)
+        if len(hits) < limit:
+            hits += await self._search_tables(
+                OrderArchive, OrderMessageArchive, query, date_from, date_to, limit - len(hits)
+            )
+        return hits
+
+    async def _search_tables(
+        self,
+        order_model,
+        message_model,
+        query: str,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        limit: int,
+    ) -> List[dict]:
+        ts_query = func.websearch_to_tsquery(TS_CONFIG, query)
+
+        orders = select(
+            order_model.id.label("order_id"),
+            literal(None, Integer).label("message_id"),
+            literal("order", String).label("source"),
+            func.ts_rank(order_model.search_vector, ts_query).label("rank"),
+            order_model.created_at.label("created_at"),
+        ).where(order_model.search_vector.op("@@")(ts_query))
+        messages = select(
+            message_model.order_id,
+            message_model.id,
+            literal("message", String),
+            func.ts_rank(message_model.search_vector, ts_query),
+            message_model.created_at,
+        ).where(message_model.search_vector.op("@@")(ts_query))
+        if date_from:
+            orders = orders.where(order_model.created_at >= date_from)
+            messages = messages.where(message_model.created_at >= date_from)
+        if date_to:
+            orders = orders.where(order_model.created_at < date_to + timedelta(days=1))
+            messages = messages.where(message_model.created_at < date_to + timedelta(days=1))
+
+        hits = union_all(orders, messages).subquery()
+        page = (
+            select(hits)
+            .order_by(hits.c.rank.desc(), hits.c.created_at.desc())
+            .limit(limit)
+            .subquery()
+        )
+        document = case((page.c.source == "order", order_model.text), else_=message_model.message_text)
+        result = await self.session.execute(
+            select(
+                page.c.order_id,
+                page.c.message_id,
+                page.c.source,
+                page.c.rank,
+                page.c.created_at,
+                order_model.status,
+                func.ts_headline(TS_CONFIG, document, ts_query, HEADLINE_OPTIONS).label("snippet"),
+            )
+            .select_from(page)
+            .join(order_model, order_model.id == page.c.order_id)
+            .outerjoin(message_model, message_model.id == page.c.message_id)
+            .order_by(page.c.rank.desc(), page.c.created_at.desc())
+        )
+        return [dict(row._mapping) for row in result.all()]
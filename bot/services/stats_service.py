@@ -0,0 +1,383 @@
+import json
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, cast, true, Date, JSON
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from db.models import Supplier, OrderDailyStat, SupplierStat
+from .archive_service import all_orders
+from .rollup_service import supplier_counter_deltas
+
+logger = logging.getLogger(__name__)
+
+_redis = None  # redis.asyncio.Redis (decode_responses=True); None — без кэша
+_update_counters = None  # Lua script, registered in set_redis
+CACHE_TTL = 30  # seconds
+
+# Supplier leaderboard: hash of counters per supplier + sorted set ranked by completion rate
+LEADERBOARD_KEY = "leaderboard:suppliers"
+SUPPLIER_COUNTERS_KEY = "leaderboard:supplier:{supplier_id}"
+
+# KEYS[1] — hash счётчиков поставщика, KEYS[2] — sorted set рейтинга
+# ARGV: supplier_id, d_total, d_completed, d_declined
+UPDATE_COUNTERS_LUA = """
+local total = redis.call('HINCRBY', KEYS[1], 'total', ARGV[2])
+local completed = redis.call('HINCRBY', KEYS[1], 'completed', ARGV[3])
+redis.call('HINCRBY', KEYS[1], 'declined', ARGV[4])
+local rate = 0
+if total > 0 then rate = completed * 100 / total end
+redis.call('ZADD', KEYS[2], rate, ARGV[1])
+return tostring(rate)
+"""
+
+PENDING_STATUSES = ("NEW", "ASSIGNED", "ACCEPTED")
+CANCELLED_STATUSES = ("DECLINED", "CANCELLED")
+
+
+def set_redis(redis_client):
+    """Подключить Redis для кэша статистики и рейтинга поставщиков (вызывается при старте бота и API)."""
+    global _redis, _update_counters
+    _redis = redis_client
+    _update_counters = redis_client.register_script(UPDATE_COUNTERS_LUA) if redis_client else None
+
+
+async def record_supplier_deltas(deltas) -> None:
+    """Apply committed order_daily_stats deltas ((day, status, supplier_id), delta) to the leaderboard.
+
+    Redis is updated after the Postgres commit, so a crash in between leaves drift;
+    StatsService.reconcile_leaderboard() repairs it periodically.
+    """
+    if not _redis or not deltas:
+        return
+    try:
+        for supplier_id, counters in supplier_counter_deltas(deltas).items():
+            await _update_counters(
+                keys=[SUPPLIER_COUNTERS_KEY.format(supplier_id=supplier_id), LEADERBOARD_KEY],
+                args=[supplier_id, counters["total"], counters["completed"], counters["declined"]],
+            )
+    except Exception as e:
+        logger.warning("Leaderboard update error: %s", e)
+
+
+async def remove_supplier_from_leaderboard(supplier_id: int) -> None:
+    """Drop a deleted supplier from the leaderboard"""
+    if not _redis:
+        return
+    try:
+        await _redis.zrem(LEADERBOARD_KEY, supplier_id)
+        await _redis.delete(SUPPLIER_COUNTERS_KEY.format(supplier_id=supplier_id))
+    except Exception as e:
+        logger.warning("Leaderboard remove error: %s", e)
+
+
+def period_start(period: str) -> Optional[ColumnElement]:
+    """Start of the statistics period as an SQL expression (None for 'all').
+
+    Computed on the database clock: orders.created_at (now()) and the rollup day
+    (current_date) are stamped by Postgres, whose session time zone may not be UTC.
+    """
+    now = func.localtimestamp()
+    if period == "today":
+        return func.date_trunc("day", now)
+    if period == "week":
+        return now - timedelta(days=7)
+    if period == "month":
+        return now - timedelta(days=30)
+    return None
+
+
+def daily_window(days: int):
+    """Zero-filled (day, count) rows from order_daily_stats for the last `days` days, database clock"""
+    series = (
+        func.generate_series(func.current_date() - (days - 1), func.current_date(), timedelta(days=1))
+        .table_valued("day")
+        .render_derived(name="series")
+    )
+    series_day = cast(series.c.day, Date)
+    # Диапазон по day повторён в ON: по одному равенству с series планировщик читает весь rollup
+    in_window = and_(OrderDailyStat.day == series_day, OrderDailyStat.day >= func.current_date() - (days - 1))
+    return (
+        select(
+            series_day.label("day"),
+            func.coalesce(func.sum(OrderDailyStat.count), 0).label("count"),
+        )
+        .select_from(series.outerjoin(OrderDailyStat, in_window))
+        .group_by(series_day)
+    )
+
+
+def order_stats_from_counts(status_counts: Dict[str, int]) -> dict:
+    """Totals (total/completed/pending/cancelled/completion_rate) from per-status counts"""
+    total = sum(status_counts.values())
+    completed = status_counts.get("COMPLETED", 0)
+    return {
+        "total": total,
+        "completed": completed,
+        "pending": sum(status_counts.get(s, 0) for s in PENDING_STATUSES),
+        "cancelled": sum(status_counts.get(s, 0) for s in CANCELLED_STATUSES),
+        "completion_rate": (completed / total * 100) if total > 0 else 0.0,
+    }
+
+
+class StatsService:
+    """Order/supplier statistics aggregated in SQL, shared by the bot and the API.
+
+    System-wide numbers come from the order_daily_stats rollup; per-admin numbers
+    are aggregated over orders (admin_id, created_at index). Results are cached
+    in Redis for CACHE_TTL seconds.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def order_stats(self, period: str, admin_id: Optional[int] = None) -> dict:
+        """Order totals for period, system-wide or only for orders created by admin_id"""
+        key = f"stats:orders:{period}" if admin_id is None else f"stats:orders:{period}:admin:{admin_id}"
+        cached = await _cache_get(key)
+        if cached is not None:
+            return cached
+
+        counts = await self.status_counts(period_start(period), admin_id=admin_id)
+        stats = order_stats_from_counts(counts)
+        await _cache_set(key, stats)
+        return stats
+
+    async def status_counts(self, start_date: Optional[ColumnElement] = None, admin_id: Optional[int] = None) -> Dict[str, int]:
+        """Order counts by status for orders created since start_date (see period_start)"""
+        if admin_id is None:
+            query = select(OrderDailyStat.status, func.sum(OrderDailyStat.count))
+            if start_date is not None:
+                # rollup хранит дни, поэтому граница периода округляется до начала дня
+                query = query.where(OrderDailyStat.day >= cast(start_date, Date))
+            query = query.group_by(OrderDailyStat.status)
+        else:
+            orders = all_orders()
+            query = select(orders.c.status, func.count()).where(orders.c.admin_id == admin_id)
+            if start_date is not None:
+                query = query.where(orders.c.created_at >= start_date)
+            query = query.group_by(orders.c.status)
+
+        result = await self.session.execute(query)
+        return {status: int(count) for status, count in result.all() if count}
+
+    async def supplier_counts(self) -> dict:
+        """Total/active/inactive suppliers in one query"""
+        result = await self.session.execute(
+            select(
+                func.count(Supplier.id),
+                func.count(Supplier.id).filter(Supplier.active == True),
+            )
+        )
+        total, active = result.one()
+        return {"total": total, "active": active, "inactive": total - active}
+
+    async def daily_counts(self, days: int) -> List[dict]:
+        """Orders per day for the last `days` days, zero-filled"""
+        daily = daily_window(days).subquery()
+        result = await self.session.execute(select(daily.c.day, daily.c.count).order_by(daily.c.day))
+        return [{"date": day.isoformat(), "count": int(count)} for day, count in result.all()]
+
+    async def supplier_counters(self, supplier_id: int) -> Dict[str, int]:
+        """Order counters of one supplier (total/accepted/completed/declined), primary key lookup"""
+        result = await self.session.execute(
+            select(SupplierStat.total, SupplierStat.accepted, SupplierStat.completed, SupplierStat.declined)
+            .where(SupplierStat.supplier_id == supplier_id)
+        )
+        row = result.one_or_none()
+        return dict(row._mapping) if row else dict.fromkeys(("total", "accepted", "completed", "declined"), 0)
+
+    async def supplier_performance(self, limit: int) -> List[dict]:
+        """Top suppliers by completion rate (all time).
+
+        Served from the Redis leaderboard (ZREVRANGE, O(log n + limit)); falls back to
+        reading supplier_stats when Redis is unavailable or not yet filled.
+        """
+        top = await self._leaderboard_top(limit)
+        if top is not None:
+            return top
+
+        performance_list = [_performance_row(*row) for row in await self._supplier_totals()]
+        performance_list.sort(key=lambda x: x["completion_rate"], reverse=True)
+        return performance_list[:limit]
+
+    async def reconcile_leaderboard(self) -> int:
+        """Rebuild Redis supplier counters and ranking from Postgres. Returns number of suppliers."""
+        if not _redis:
+            return 0
+        rows = await self._supplier_totals()
+        tmp_key = f"{LEADERBOARD_KEY}:rebuild"
+        pipe = _redis.pipeline(transaction=True)
+        pipe.delete(tmp_key)
+        for supplier_id, _name, total, completed, declined in rows:
+            row = _performance_row(supplier_id, _name, total, completed, declined)
+            pipe.hset(
+                SUPPLIER_COUNTERS_KEY.format(supplier_id=supplier_id),
+                mapping={
+                    "total": row["total_orders"],
+                    "completed": row["completed_orders"],
+                    "declined": row["declined_orders"],
+                },
+            )
+            pipe.zadd(tmp_key, {str(supplier_id): row["completion_rate"]})
+        if rows:
+            pipe.rename(tmp_key, LEADERBOARD_KEY)
+        else:
+            pipe.delete(LEADERBOARD_KEY)
+        await pipe.execute()
+        return len(rows)
+
+    async def _leaderboard_top(self, limit: int) -> Optional[List[dict]]:
+        if not _redis:
+            return None
+        try:
+            ranked = await _redis.zrevrange(LEADERBOARD_KEY, 0, limit - 1, withscores=True)
+            if not ranked:
+                return None
+            pipe = _redis.pipeline(transaction=False)
+            for supplier_id, _rate in ranked:
+                pipe.hgetall(SUPPLIER_COUNTERS_KEY.format(supplier_id=supplier_id))
+            counters = await pipe.execute()
+        except Exception as e:
+            logger.warning("Leaderboard read error: %s", e)
+            return None
+
+        ids = [int(supplier_id) for supplier_id, _rate in ranked]
+        result = await self.session.execute(select(Supplier.id, Supplier.name).where(Supplier.id.in_(ids)))
+        names = dict(result.all())
+        return [
+            _performance_row(
+                supplier_id,
+                names[supplier_id],
+                int(values.get("total", 0)),
+                int(values.get("completed", 0)),
+                int(values.get("declined", 0)),
+            )
+            for supplier_id, values in zip(ids, counters)
+            if supplier_id in names
+        ]
+
+    async def _supplier_totals(self):
+        """(id, name, total, completed, declined) for every supplier, from supplier_stats"""
+        result = await self.session.execute(
+            select(
+                Supplier.id,
+                Supplier.name,
+                SupplierStat.total,
+                SupplierStat.completed,
+                SupplierStat.declined,
+            )
+            .select_from(Supplier)
+            .outerjoin(SupplierStat, Supplier.id == SupplierStat.supplier_id)
+        )
+        return result.all()
+
+    async def summary(self, period: str, days: int) -> dict:
+        """Dashboard summary in one statement.
+
+        Totals are for `period`; the daily series and status distribution cover the last `days` days.
+        """
+        key = f"stats:summary:{period}:{days}"
+        cached = await _cache_get(key)
+        if cached is not None:
+            return cached
+
+        # Обе границы — по часам базы, как и день в order_daily_stats (current_date)
+        start_date = period_start(period)
+        window_start = func.current_date() - (days - 1)
+
+        # Per-status counts for the period and for the daily window in one pass (FILTER aggregates)
+        in_period = OrderDailyStat.day >= cast(start_date, Date) if start_date is not None else true()
+        by_status = (
+            select(
+                OrderDailyStat.status,
+                func.sum(OrderDailyStat.count).filter(in_period).label("period_count"),
+                func.sum(OrderDailyStat.count).filter(OrderDailyStat.day >= window_start).label("window_count"),
+            )
+            .group_by(OrderDailyStat.status)
+        )
+        if start_date is not None:
+            # Дни старше обоих окон не нужны: rollup читается диапазоном по первичному ключу
+            by_status = by_status.where(OrderDailyStat.day >= func.least(cast(start_date, Date), window_start))
+        by_status = by_status.cte("by_status")
+
+        # Zero-filled daily series
+        daily = daily_window(days).cte("daily")
+
+        def status_json(column):
+            return (
+                select(func.json_object_agg(by_status.c.status, column, type_=JSON))
+                .where(column > 0)
+                .scalar_subquery()
+            )
+
+        summary_query = select(
+            status_json(by_status.c.period_count).label("period_status"),
+            status_json(by_status.c.window_count).label("window_status"),
+            select(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object("date", daily.c.day, "count", daily.c.count),
+                        daily.c.day,
+                    ),
+                    type_=JSON,
+                )
+            ).scalar_subquery().label("daily"),
+            func.count(Supplier.id).label("suppliers_total"),
+            func.count(Supplier.id).filter(Supplier.active == True).label("suppliers_active"),
+        ).select_from(Supplier)
+
+        row = (await self.session.execute(summary_query)).one()
+
+        period_status = {status: int(count) for status, count in (row.period_status or {}).items()}
+        window_status = row.window_status or {}
+        summary = {
+            "period": period,
+            "orders": order_stats_from_counts(period_status),
+            "suppliers": {
+                "total": row.suppliers_total,
+                "active": row.suppliers_active,
+                "inactive": row.suppliers_total - row.suppliers_active,
+            },
+            "status_distribution": [
+                {"status": status, "count": int(count)} for status, count in window_status.items()
+            ],
+            "daily": [{"date": item["date"], "count": int(item["count"])} for item in (row.daily or [])],
+        }
+        await _cache_set(key, summary)
+        return summary
+
+
+def _performance_row(supplier_id: int, name: str, total, completed, declined) -> dict:
+    total, completed, declined = int(total or 0), int(completed or 0), int(declined or 0)
+    return {
+        "supplier_id": supplier_id,
+        "name": name,
+        "total_orders": total,
+        "completed_orders": completed,
+        "declined_orders": declined,
+        "completion_rate": (completed / total * 100) if total > 0 else 0.0,
+    }
+
+
+async def _cache_get(key: str) -> Optional[Any]:
+    if not _redis:
+        return None
+    try:
+        value = await _redis.get(key)
+        return json.loads(value) if value else None
+    except Exception as e:
+        logger.warning("Stats cache get error (%s): %s", key, e)
+        return None
+
+
+async def _cache_set(key: str, value: Any) -> None:
+    if not _redis:
+        return
+    try:
+        await _redis.set(key, json.dumps(value, ensure_ascii=False), ex=CACHE_TTL)
+    except Exception as e:
+        logger.warning("Stats cache set error (%s): %s", key, e)
@@ -1,9 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, and_
 
-from db.models import Supplier, ActivityLog
+from db.models import Supplier
+from .activity_service import ActivityService
+from .pagination import paginate
 
 
 class SupplierService:
@@ -48,6 +50,24 @@ class SupplierService:
         result = await self.session.execute(query.order_by(Supplier.name))
         return result.scalars().all()
 
+    async def list_suppliers(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        active_only: bool = True,
+        role: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[Supplier], int]:
+        """One page of suppliers ordered by name and the total number of matches"""
+        conditions = []
+        if active_only:
+            conditions.append(Supplier.active == True)
+        if role:
+            conditions.append(Supplier.role == role)
+        if search:
+            conditions.append(Supplier.name.icontains(search, autoescape=True))
+        return await paginate(self.session, Supplier, conditions, (Supplier.name, Supplier.id), skip, limit)
+
     async def activate_supplier(self, supplier_id: int) -> bool:
         """Activate supplier"""
         result = await self.session.execute(
@@ -76,6 +96,30 @@ class SupplierService:
             return True
         return False
 
+    async def update_supplier(self, supplier_id: int, **values) -> Optional[Supplier]:
+        """Update supplier fields (name, active, role) in one UPDATE ... RETURNING and commit.
+
+        Returns the updated supplier, None if there is no such supplier.
+        """
+        result = await self.session.execute(
+            update(Supplier)
+            .where(Supplier.id == supplier_id)
+            .values(**values)
+            .returning(Supplier),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        supplier = result.scalar_one_or_none()
+        if not supplier:
+            return None
+        
+        if "active" in values:
+            state = "activated" if values["active"] else "deactivated"
+            await self._log_activity(supplier_id, f"supplier_{state}", f"Supplier {supplier_id} {state}")
+        if values.keys() - {"active"}:
+            await self._log_activity(supplier_id, "supplier_updated", f"Supplier {supplier_id} updated")
+        await self.session.commit()
+        return supplier
+
     async def update_supplier_name(self, supplier_id: int, name: str) -> bool:
         """Update supplier name"""
         result = await self.session.execute(
@@ -111,11 +155,4 @@ class SupplierService:
 
     async def _log_activity(self, user_id: int, action: str, details: str = None):
         """Log user activity"""
-        from db.models import ActivityLog
-        
-        log = ActivityLog(
-            user_id=user_id,
-            action=action,
-            details=details
-        )
-        self.session.add(log)
+        await ActivityService(self.session).log(user_id, action, details)
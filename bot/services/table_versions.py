@@ -0,0 +1,103 @@
+"""Счётчики версий таблиц в Redis: меняются после каждого коммита, изменившего таблицу.
+
+API строит из них слабые ETag для списков (api/etag.py) и отвечает 304, не
+обращаясь к Postgres. Изменённые таблицы собираются событиями сессии (ORM
+flush и ORM-операторы INSERT/UPDATE/DELETE), поэтому счётчики ведут и API, и бот.
+Запись через text() отмечается вручную: mark_changed(session, "orders").
+"""
+import asyncio
+import logging
+import time
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SyncSession
+
+
+logger = logging.getLogger(__name__)
+
+VERSIONED_TABLES = ("orders", "suppliers", "filters")
+VERSIONS_KEY = "table_versions"  # hash: <table> -> счётчик, <table>:at -> время последнего изменения (unix)
+_CHANGED_KEY = "changed_tables"  # session.info: таблицы, изменённые в текущей транзакции
+
+_redis = None  # redis.asyncio.Redis (decode_responses=True); None — версии не ведутся
+_tasks: Set[asyncio.Task] = set()
+
+
+def set_redis(redis_client) -> None:
+    """Подключить Redis для счётчиков версий (вызывается при старте бота и API)."""
+    global _redis
+    _redis = redis_client
+
+
+def mark_changed(session, *tables: str) -> None:
+    """Record tables changed by statements the session events cannot see (text SQL)"""
+    changed = {table for table in tables if table in VERSIONED_TABLES}
+    if changed:
+        session.info.setdefault(_CHANGED_KEY, set()).update(changed)
+
+
+async def bump(tables: Iterable[str]) -> None:
+    """Increment the version counters of `tables` (after their change is committed)"""
+    if not _redis:
+        return
+    now = int(time.time())
+    try:
+        pipe = _redis.pipeline(transaction=True)
+        for table in sorted(set(tables)):
+            pipe.hincrby(VERSIONS_KEY, table, 1)
+            pipe.hset(VERSIONS_KEY, f"{table}:at", now)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning("Table version bump error: %s", e)
+
+
+async def wait_for_bumps() -> None:
+    """Wait for increments scheduled by commits (short-lived processes, before the loop closes)"""
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
+
+
+async def get_versions(tables: Iterable[str]) -> Optional[dict]:
+    """{table: counter, table + ':at': last change time} or None without Redis"""
+    if not _redis:
+        return None
+    fields = [field for table in tables for field in (table, f"{table}:at")]
+    try:
+        values = await _redis.hmget(VERSIONS_KEY, fields)
+    except Exception as e:
+        logger.warning("Table version read error: %s", e)
+        return None
+    return {field: int(value or 0) for field, value in zip(fields, values)}
+
+
+@event.listens_for(SyncSession, "do_orm_execute")
+def _track_statement(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            mark_changed(orm_execute_state.session, table.name)
+
+
+@event.listens_for(SyncSession, "after_flush")
+def _track_flush(session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            mark_changed(session, table)
+
+
+@event.listens_for(SyncSession, "after_commit")
+def _bump_committed(session) -> None:
+    tables = session.info.pop(_CHANGED_KEY, None)
+    if not tables or not _redis:
+        return
+    # Слушатель синхронный; инкремент уходит в event loop после коммита
+    task = asyncio.get_running_loop().create_task(bump(tables))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(SyncSession, "after_rollback")
+def _drop_rolled_back(session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
@@ -1,3 +1,4 @@
 from .status_labels import order_status_ru, ORDER_STATUS_RU
+from .order_ids import generate_order_id, normalize_order_id, find_order_id
 
-__all__ = ["order_status_ru", "ORDER_STATUS_RU"]
+__all__ = ["order_status_ru", "ORDER_STATUS_RU", "generate_order_id", "normalize_order_id", "find_order_id"]
@@ -0,0 +1,83 @@
+"""Короткие ID заказов: упорядочены по времени, base32 (Crockford), с контрольным символом.
+
+Формат — 11 символов: 10 символов полезной нагрузки (50 бит) + 1 контрольный.
+Нагрузка — миллисекунды от ORDER_ID_EPOCH (40 бит, хватает до 2058 года) и 10
+случайных бит. Внутри процесса ID строго возрастают (при совпадении миллисекунды
+берётся предыдущее значение + 1), поэтому новые строки попадают в правый край
+индекса orders_pkey, а не в случайные страницы B-дерева.
+
+Старые ID (8 hex-символов из uuid4) остаются валидными.
+"""
+import re
+import secrets
+import time
+from typing import Optional
+
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32: без I, L, O, U
+ORDER_ID_LENGTH = 11
+ORDER_ID_EPOCH_MS = 1704067200000  # 2024-01-01 00:00:00 UTC
+RANDOM_BITS = 10
+PAYLOAD_CHARS = ORDER_ID_LENGTH - 1
+
+# "#XXXXXXXXXXX" (новый формат) или "#XXXXXXXX" (старый hex) в тексте сообщения, без учёта регистра
+ORDER_ID_PATTERN = re.compile(r"#([0-9A-Z]{11}|[0-9A-F]{8})(?![0-9A-Z])", re.IGNORECASE)
+
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+# Частые опечатки при ручном вводе
+_DECODE.update({"I": 1, "L": 1, "O": 0})
+_LEGACY_ID = re.compile(r"[0-9A-F]{8}")
+
+_last_value = 0
+
+
+def _check_char(payload: str) -> str:
+    # Нечётные веса обратимы по модулю 32: любая замена одного символа меняет контрольный символ
+    total = sum((2 * position + 1) * _DECODE[char] for position, char in enumerate(payload))
+    return ALPHABET[total % 32]
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(PAYLOAD_CHARS):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def generate_order_id() -> str:
+    """New time-ordered order ID (strictly increasing within the process)"""
+    global _last_value
+    millis = int(time.time() * 1000) - ORDER_ID_EPOCH_MS
+    value = (millis << RANDOM_BITS) | secrets.randbits(RANDOM_BITS)
+    if value <= _last_value:
+        value = _last_value + 1
+    _last_value = value
+    payload = _encode(value)
+    return payload + _check_char(payload)
+
+
+def normalize_order_id(raw: str) -> Optional[str]:
+    """Canonical form of a typed or quoted order ID, None if it is not a valid ID.
+
+    Case-insensitive, ignores a leading '#', maps I/L to 1 and O to 0 and
+    verifies the check character of new-format IDs.
+    """
+    order_id = (raw or "").strip().lstrip("#").upper()
+    if _LEGACY_ID.fullmatch(order_id):
+        return order_id
+    if len(order_id) != ORDER_ID_LENGTH or any(char not in _DECODE for char in order_id):
+        return None
+    order_id = "".join(ALPHABET[_DECODE[char]] for char in order_id)
+    if _check_char(order_id[:-1]) != order_id[-1]:
+        return None
+    return order_id
+
+
+def find_order_id(text: str) -> Optional[str]:
+    """First valid '#ID' mentioned in a message text"""
+    for match in ORDER_ID_PATTERN.finditer(text or ""):
+        order_id = normalize_order_id(match.group(1))
+        if order_id:
+            return order_id
+    return None
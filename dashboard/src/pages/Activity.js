@@ -96,13 +96,12 @@ function Activity() {
         activityAPI.getRecentActivity({ limit: 10 })
       ]);
 
-      setLogs(logsResponse.data);
+      setLogs(logsResponse.data.items);
       setAvailableActions(actionsResponse.data.actions);
       setRecentActivity(recentResponse.data);
       
-      // For pagination, we'd need the total count from the API
-      // For now, we'll use the current logs length
-      setTotalCount(logsResponse.data.length);
+      // total — оценка планировщика для больших выборок (total_exact=false)
+      setTotalCount(logsResponse.data.total);
     } catch (err) {
       setError('Ошибка загрузки данных активности');
       console.error('Activity data fetch error:', err);
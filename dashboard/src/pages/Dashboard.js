@@ -16,7 +16,7 @@ import {
   Pending as PendingIcon
 } from '@mui/icons-material';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, PieChart, Pie, Cell } from 'recharts';
-import { statsAPI, ordersAPI } from '../services/api';
+import { statsAPI } from '../services/api';
 
 const COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042'];
 
@@ -58,15 +58,12 @@ function Dashboard() {
       setLoading(true);
       setError(null);
 
-      const [statsResponse, dailyResponse, statusResponse] = await Promise.all([
-        statsAPI.getStats({ period: 'today' }),
-        statsAPI.getDailyStats({ days: 7 }),
-        statsAPI.getOrderStatusDistribution({ period: 'week' })
-      ]);
+      // Одна сводка вместо трёх запросов: итоги за сегодня, график и распределение статусов за 7 дней
+      const { data } = await statsAPI.getSummary({ period: 'today', days: 7 });
 
-      setStats(statsResponse.data);
-      setDailyStats(dailyResponse.data);
-      setStatusDistribution(statusResponse.data.distribution);
+      setStats(data);
+      setDailyStats(data.daily);
+      setStatusDistribution(data.status_distribution);
     } catch (err) {
       setError('Ошибка загрузки данных');
       console.error('Dashboard data fetch error:', err);
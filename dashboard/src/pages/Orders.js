@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Box,
   Paper,
@@ -152,6 +152,32 @@ function Orders() {
     fetchOrders();
   }, [pagination.page, pagination.pageSize]);
 
+  // Живая лента: смена статуса у заказа на странице — правим строку, остальное — перечитываем страницу
+  const fetchOrdersRef = useRef(null);
+  fetchOrdersRef.current = () => fetchOrders();
+  const ordersRef = useRef(orders);
+  ordersRef.current = orders;
+  useEffect(() => {
+    let refetchTimer = null;
+    const scheduleRefetch = () => {
+      clearTimeout(refetchTimer);
+      refetchTimer = setTimeout(() => fetchOrdersRef.current(), 1000);
+    };
+    const source = ordersAPI.streamOrders((event) => {
+      if (event.type === 'order_message') return;
+      const onPage = ordersRef.current.some((row) => row.id === event.order_id && row.supplier_id === event.supplier_id);
+      if (event.type === 'order_updated' && onPage) {
+        setOrders((rows) => rows.map((row) => (row.id === event.order_id ? { ...row, status: event.status } : row)));
+        return;
+      }
+      scheduleRefetch();
+    });
+    return () => {
+      clearTimeout(refetchTimer);
+      source.close();
+    };
+  }, []);
+
   const fetchOrders = async () => {
     try {
       setLoading(true);
@@ -221,17 +247,11 @@ function Orders() {
     if (!window.confirm(`Удалить выбранные заказы (${rowSelectionModel.length})?`)) return;
     try {
       setError(null);
-      const results = await Promise.allSettled(
-        rowSelectionModel.map((id) => ordersAPI.deleteOrder(id))
-      );
-      const failed = results.filter((r) => r.status === 'rejected');
+      const response = await ordersAPI.bulkAction(rowSelectionModel, 'delete');
+      const { processed, results } = response.data;
+      const failed = results.filter((r) => !r.ok);
       if (failed.length) {
-        const firstMsg = failed[0].reason?.response?.data?.detail;
-        setError(
-          firstMsg
-            ? `Удалено: ${results.length - failed.length}. Ошибки: ${firstMsg}${failed.length > 1 ? ` (и ещё ${failed.length - 1})` : ''}`
-            : `Удалено: ${results.length - failed.length}. Ошибок: ${failed.length}.`
-        );
+        setError(`Удалено: ${processed}. Не найдены: ${failed.slice(0, 5).map((r) => `#${r.id}`).join(', ')}${failed.length > 5 ? ` (и ещё ${failed.length - 5})` : ''}`);
       }
       setRowSelectionModel([]);
       fetchOrders();
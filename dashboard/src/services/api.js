@@ -43,12 +43,19 @@ export const ordersAPI = {
   createOrder: (data) => api.post('/orders/', data),
   updateOrder: (id, data) => api.put(`/orders/${id}`, data),
   deleteOrder: (id) => api.delete(`/orders/${id}`),
+  bulkAction: (ids, action, supplierId) => api.post('/orders/bulk', { ids, action, supplier_id: supplierId }),
   getOrderMessages: (id) => api.get(`/orders/${id}/messages`),
   addOrderMessage: (id, message) => api.post(`/orders/${id}/messages`, { message_text: message }),
   acceptOrder: (id, supplierId) => api.post(`/orders/${id}/accept`, { supplier_id: supplierId }),
   declineOrder: (id, supplierId) => api.post(`/orders/${id}/decline`, { supplier_id: supplierId }),
   completeOrder: (id, supplierId) => api.post(`/orders/${id}/complete`, { supplier_id: supplierId }),
   cancelOrder: (id, supplierId) => api.post(`/orders/${id}/cancel`, { supplier_id: supplierId }),
+  // Живая лента (SSE): onEvent получает разобранный JSON события; EventSource переподключается сам
+  streamOrders: (onEvent) => {
+    const source = new EventSource(`${API_BASE_URL}/orders/stream`);
+    source.onmessage = (e) => onEvent(JSON.parse(e.data));
+    return source;
+  },
 };
 
 // Suppliers API
@@ -79,6 +86,7 @@ export const filtersAPI = {
 // Stats API
 export const statsAPI = {
   getStats: (params = {}) => api.get('/stats/', { params }),
+  getSummary: (params = {}) => api.get('/stats/summary', { params }),
   getDailyStats: (params = {}) => api.get('/stats/orders/daily', { params }),
   getSupplierPerformance: (params = {}) => api.get('/stats/suppliers/performance', { params }),
   getActivityStats: (params = {}) => api.get('/stats/activity', { params }),
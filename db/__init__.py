@@ -1,3 +1,9 @@
-from .models import Base, Supplier, Filter, Order, OrderMessage, ActivityLog
+from .models import (
+    Base, Supplier, Filter, Order, OrderMessage, ActivityLog, OrderDailyStat, SupplierStat, OrderLatencyBucket,
+    ActivityHourlyStat, ActivityAction, OrderArchive, OrderMessageArchive,
+)
 
-__all__ = ["Base", "Supplier", "Filter", "Order", "OrderMessage", "ActivityLog"]
+__all__ = [
+    "Base", "Supplier", "Filter", "Order", "OrderMessage", "ActivityLog", "OrderDailyStat", "SupplierStat", "OrderLatencyBucket",
+    "ActivityHourlyStat", "ActivityAction", "OrderArchive", "OrderMessageArchive",
+]
@@ -9,7 +9,9 @@ CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 CREATE TEXT SEARCH CONFIGURATION russian (COPY = simple);
 
 -- Create indexes for better performance
--- These will be created after the tables are created by SQLAlchemy
+-- Tables and indexes are created by Alembic migrations (db/migrations);
+-- status/created_at/supplier_status/order_id/activity created_at/filters indexes:
+-- db/migrations/versions/0003_hot_path_indexes.py
 
 -- Order text search index
 -- CREATE INDEX IF NOT EXISTS idx_orders_text_gin ON orders USING gin(to_tsvector('russian', text));
@@ -0,0 +1,41 @@
+"""Применение миграций Alembic при старте api и bot (вместо Base.metadata.create_all)."""
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).with_name("alembic.ini")
+BASELINE_REVISION = "0001"
+# api и bot стартуют одновременно — миграции выполняет только один из них
+MIGRATION_LOCK_KEY = 720_331
+
+
+async def upgrade_database(engine: AsyncEngine) -> None:
+    """Upgrade the schema to head (stamps pre-migration databases with the baseline first)"""
+    async with engine.connect() as conn:
+        await conn.run_sync(_upgrade)
+
+
+def _upgrade(connection) -> None:
+    connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    connection.commit()
+    try:
+        config = Config(str(ALEMBIC_INI))
+        config.attributes["connection"] = connection
+
+        tables = set(inspect(connection).get_table_names())
+        connection.commit()
+        if "orders" in tables and "alembic_version" not in tables:
+            # База создана create_all до появления миграций
+            logger.info("Stamping existing schema with baseline revision %s", BASELINE_REVISION)
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+    finally:
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
@@ -0,0 +1,81 @@
+"""statistics rollups: order_daily_stats, supplier_stats, latency and activity rollups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Tables may already exist where they were created by create_all before
+migrations were introduced, so each one is created only if missing. They are
+filled by init_db (backfill) or `python -m bot.maintenance rebuild-*`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_orders_admin_created_at", "orders", ["admin_id", "created_at"], if_not_exists=True
+    )
+    if not _has_table("order_daily_stats"):
+        op.create_table(
+            "order_daily_stats",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("status", sa.String(50), primary_key=True),
+            sa.Column("supplier_id", sa.Integer(), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+    if not _has_table("supplier_stats"):
+        op.create_table(
+            "supplier_stats",
+            sa.Column(
+                "supplier_id",
+                sa.Integer(),
+                sa.ForeignKey("suppliers.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("total", sa.Integer(), nullable=False),
+            sa.Column("accepted", sa.Integer(), nullable=False),
+            sa.Column("completed", sa.Integer(), nullable=False),
+            sa.Column("declined", sa.Integer(), nullable=False),
+        )
+    if not _has_table("order_latency_buckets"):
+        op.create_table(
+            "order_latency_buckets",
+            sa.Column("hour", sa.DateTime(), primary_key=True),
+            sa.Column("metric", sa.String(20), primary_key=True),
+            sa.Column("supplier_id", sa.Integer(), primary_key=True),
+            sa.Column("bucket", sa.Integer(), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+    if not _has_table("activity_hourly_stats"):
+        op.create_table(
+            "activity_hourly_stats",
+            sa.Column("hour", sa.DateTime(), primary_key=True),
+            sa.Column("action", sa.String(100), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+    if not _has_table("activity_actions"):
+        op.create_table(
+            "activity_actions",
+            sa.Column("action", sa.String(100), primary_key=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("activity_actions")
+    op.drop_table("activity_hourly_stats")
+    op.drop_table("order_latency_buckets")
+    op.drop_table("supplier_stats")
+    op.drop_table("order_daily_stats")
+    op.drop_index("idx_orders_admin_created_at", table_name="orders")
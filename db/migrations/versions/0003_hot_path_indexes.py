@@ -0,0 +1,38 @@
+"""hot-path indexes (the ones commented out in db/init.sql)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Built with CREATE INDEX CONCURRENTLY outside a transaction, so existing
+tables stay writable while the indexes build.
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("idx_orders_status", "orders", ["status"]),
+    ("idx_orders_created_at", "orders", ["created_at"]),
+    ("idx_orders_supplier_status", "orders", ["supplier_id", "status"]),
+    ("idx_order_messages_order_id", "order_messages", ["order_id"]),
+    ("idx_activity_logs_created_at", "activity_logs", ["created_at"]),
+    ("idx_filters_supplier_active", "filters", ["supplier_id", "active"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
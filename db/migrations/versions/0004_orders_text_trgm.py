@@ -0,0 +1,35 @@
+"""trigram index for order text search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+GIN (gin_trgm_ops) index over orders.text: serves both ILIKE '%q%' and the
+word-similarity operator used by OrderService.search_orders.
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_orders_text_trgm",
+            "orders",
+            ["text"],
+            postgresql_using="gin",
+            postgresql_ops={"text": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_orders_text_trgm", table_name="orders", postgresql_concurrently=True, if_exists=True)
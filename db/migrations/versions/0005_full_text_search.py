@@ -0,0 +1,49 @@
+"""full-text search: generated tsvector columns on orders and order_messages
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Adding a stored generated column rewrites the table under an exclusive lock;
+on a large production table run this migration in a maintenance window.
+The GIN indexes are built concurrently afterwards.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "orders",
+        sa.Column("search_vector", TSVECTOR(), sa.Computed("to_tsvector('russian', text)", persisted=True)),
+    )
+    op.add_column(
+        "order_messages",
+        sa.Column(
+            "search_vector", TSVECTOR(), sa.Computed("to_tsvector('russian', message_text)", persisted=True)
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_orders_search_vector", "orders", ["search_vector"],
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "idx_order_messages_search_vector", "order_messages", ["search_vector"],
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_order_messages_search_vector", table_name="order_messages", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("idx_orders_search_vector", table_name="orders", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("order_messages", "search_vector")
+    op.drop_column("orders", "search_vector")
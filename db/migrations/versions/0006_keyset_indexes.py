@@ -0,0 +1,49 @@
+"""keyset pagination indexes: (created_at, id) on orders and activity_logs
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+Lists are ordered by (created_at DESC, id DESC) and continue from a cursor with
+a row comparison on the same pair; the composite indexes replace the
+created_at-only ones from 0003.
+"""
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_orders_created_at_id", "orders", ["created_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "idx_activity_logs_created_at_id", "activity_logs", ["created_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index("idx_orders_created_at", table_name="orders", postgresql_concurrently=True, if_exists=True)
+        op.drop_index(
+            "idx_activity_logs_created_at", table_name="activity_logs", postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_activity_logs_created_at", "activity_logs", ["created_at"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "idx_orders_created_at", "orders", ["created_at"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            "idx_activity_logs_created_at_id", table_name="activity_logs", postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index("idx_orders_created_at_id", table_name="orders", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,54 @@
+"""indexes for supplier and filter lists
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+GET /suppliers/ and GET /filters/ now filter, sort and page in SQL:
+(active, name) serves the default supplier list, trigram GIN indexes serve
+the substring search (ILIKE '%q%') over supplier names and filter keywords.
+"""
+from alembic import op
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_suppliers_active_name",
+            "suppliers",
+            ["active", "name"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_suppliers_name_trgm",
+            "suppliers",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_filters_keyword_trgm",
+            "filters",
+            ["keyword"],
+            postgresql_using="gin",
+            postgresql_ops={"keyword": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_filters_keyword_trgm", table_name="filters", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("idx_suppliers_name_trgm", table_name="suppliers", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("idx_suppliers_active_name", table_name="suppliers", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,97 @@
+"""monthly range partitioning of activity_logs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+activity_logs becomes a table partitioned by RANGE (created_at), one partition
+per month (activity_logs_pYYYYMM). The primary key turns into (id, created_at),
+as a partitioned table requires; ids keep coming from activity_logs_id_seq.
+Partitions for existing rows and for the next months are created here; later
+ones are created (and expired ones dropped) by PartitionService.
+
+Existing rows are copied under an exclusive lock: on a large log run this
+migration in a maintenance window.
+"""
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+MONTHS_AHEAD = 3  # как PARTITION_MONTHS_AHEAD в bot/services/partition_service.py
+
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', least(coalesce((SELECT min(created_at) FROM activity_logs_unpartitioned), now()), now())),
+            date_trunc('month', now()) + interval '{months_ahead} months',
+            interval '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+            'activity_logs_p' || to_char(month, 'YYYYMM'), month, (month + interval '1 month')::date
+        );
+    END LOOP;
+END $$
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_unpartitioned")
+    op.execute("ALTER TABLE activity_logs_unpartitioned RENAME CONSTRAINT activity_logs_pkey TO activity_logs_unpartitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS idx_activity_logs_created_at_id")
+    op.execute("DROP INDEX IF EXISTS idx_activity_logs_created_at")
+    op.execute(
+        """
+        CREATE TABLE activity_logs (
+            id integer NOT NULL DEFAULT nextval('activity_logs_id_seq'),
+            user_id bigint NOT NULL,
+            action varchar(100) NOT NULL,
+            details text,
+            created_at timestamp without time zone NOT NULL DEFAULT now(),
+            CONSTRAINT activity_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    # Последовательность принадлежала старой таблице и удалилась бы вместе с ней
+    op.execute("ALTER SEQUENCE activity_logs_id_seq OWNED BY activity_logs.id")
+    op.execute("CREATE INDEX idx_activity_logs_created_at_id ON activity_logs (created_at, id)")
+    op.execute(CREATE_PARTITIONS.format(months_ahead=MONTHS_AHEAD))
+    op.execute(
+        """
+        INSERT INTO activity_logs (id, user_id, action, details, created_at)
+        SELECT id, user_id, action, details, coalesce(created_at, now()) FROM activity_logs_unpartitioned
+        """
+    )
+    op.execute("DROP TABLE activity_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_partitioned")
+    op.execute("ALTER TABLE activity_logs_partitioned RENAME CONSTRAINT activity_logs_pkey TO activity_logs_partitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS idx_activity_logs_created_at_id")
+    op.execute(
+        """
+        CREATE TABLE activity_logs (
+            id integer NOT NULL DEFAULT nextval('activity_logs_id_seq'),
+            user_id bigint NOT NULL,
+            action varchar(100) NOT NULL,
+            details text,
+            created_at timestamp without time zone DEFAULT now(),
+            CONSTRAINT activity_logs_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE activity_logs_id_seq OWNED BY activity_logs.id")
+    op.execute("INSERT INTO activity_logs SELECT id, user_id, action, details, created_at FROM activity_logs_partitioned")
+    op.execute("DROP TABLE activity_logs_partitioned")
+    op.execute("CREATE INDEX idx_activity_logs_created_at_id ON activity_logs (created_at, id)")
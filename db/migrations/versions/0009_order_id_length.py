@@ -0,0 +1,29 @@
+"""longer order ids: varchar(8) -> varchar(11)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+New order IDs are 11 characters (time-ordered base32 with a check character,
+bot/utils/order_ids.py); existing 8-character IDs stay as they are. Widening a
+varchar is a catalog-only change in Postgres: no table rewrite, no reindex.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column("orders", "id", type_=sa.String(11), existing_type=sa.String(8), existing_nullable=False)
+    op.alter_column("order_messages", "order_id", type_=sa.String(11), existing_type=sa.String(8), existing_nullable=False)
+
+
+def downgrade() -> None:
+    # Возможно, только пока в таблицах нет новых 11-символьных ID
+    op.alter_column("order_messages", "order_id", type_=sa.String(8), existing_type=sa.String(11), existing_nullable=False)
+    op.alter_column("orders", "id", type_=sa.String(8), existing_type=sa.String(11), existing_nullable=False)
@@ -0,0 +1,38 @@
+"""order history index: (order_id, created_at, id) on order_messages
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+Serves the "last N" and keyset-paged history reads of MessageService in
+either direction; it replaces idx_order_messages_order_id (its prefix).
+"""
+from alembic import op
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_order_messages_order_created", "order_messages", ["order_id", "created_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            "idx_order_messages_order_id", table_name="order_messages", postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_order_messages_order_id", "order_messages", ["order_id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            "idx_order_messages_order_created", table_name="order_messages", postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,70 @@
+"""cold tables for closed orders: orders_archive and order_messages_archive
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+
+ArchiveService moves orders that were closed (COMPLETED/CANCELLED) long ago,
+together with their messages, out of the hot tables in small batches.
+The tables are new and empty, so their indexes are built inline.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_table(
+        "orders_archive",
+        sa.Column("id", sa.String(11), primary_key=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(50)),
+        sa.Column("supplier_id", sa.Integer(), nullable=True),
+        sa.Column("admin_id", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("assigned_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("search_vector", TSVECTOR(), sa.Computed("to_tsvector('russian', text)", persisted=True)),
+    )
+    op.create_index("idx_orders_archive_admin_created_at", "orders_archive", ["admin_id", "created_at"])
+    op.create_index(
+        "idx_orders_archive_text_trgm", "orders_archive", ["text"],
+        postgresql_using="gin", postgresql_ops={"text": "gin_trgm_ops"},
+    )
+    op.create_index("idx_orders_archive_search_vector", "orders_archive", ["search_vector"], postgresql_using="gin")
+
+    op.create_table(
+        "order_messages_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column(
+            "order_id", sa.String(11), sa.ForeignKey("orders_archive.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("sender_id", sa.BigInteger(), nullable=False),
+        sa.Column("message_text", sa.Text(), nullable=False),
+        sa.Column("message_type", sa.String(20)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column(
+            "search_vector", TSVECTOR(), sa.Computed("to_tsvector('russian', message_text)", persisted=True)
+        ),
+    )
+    op.create_index(
+        "idx_order_messages_archive_order_created", "order_messages_archive", ["order_id", "created_at", "id"]
+    )
+    op.create_index(
+        "idx_order_messages_archive_search_vector", "order_messages_archive", ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("order_messages_archive")
+    op.drop_table("orders_archive")
@@ -0,0 +1,29 @@
+"""DEFAULT partition for activity_logs
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+
+Monthly partitions are created ahead of time by the bot (PartitionService).
+If it has not run for longer than PARTITION_MONTHS_AHEAD months, or the API
+runs without the bot, rows without a monthly partition land in
+activity_logs_default instead of failing the insert. ensure_partitions moves
+them into the monthly partition when it is created.
+"""
+from alembic import op
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TABLE IF NOT EXISTS activity_logs_default PARTITION OF activity_logs DEFAULT")
+
+
+def downgrade() -> None:
+    # Строки из DEFAULT-секции теряются, если для их месяца нет обычной секции
+    op.execute("ALTER TABLE activity_logs DETACH PARTITION activity_logs_default")
+    op.execute("DROP TABLE activity_logs_default")
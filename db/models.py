@@ -1,5 +1,6 @@
-from sqlalchemy import BigInteger, String, Boolean, Integer, ForeignKey, DateTime, Text, func, Column
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import BigInteger, String, Boolean, Integer, ForeignKey, DateTime, Date, Text, func, Column, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import declarative_base, relationship, deferred
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
 Base = declarative_base()
@@ -19,6 +20,11 @@ class Supplier(Base):
     filters = relationship("Filter", back_populates="supplier", cascade="all, delete-orphan")
     orders = relationship("Order", back_populates="supplier")
 
+    __table_args__ = (
+        Index("idx_suppliers_active_name", "active", "name"),  # список поставщиков: WHERE active ORDER BY name
+        Index("idx_suppliers_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
     def __repr__(self):
         return f"<Supplier(id={self.id}, name='{self.name}', active={self.active})>"
 
@@ -36,6 +42,11 @@ class Filter(Base):
     # Relationships
     supplier = relationship("Supplier", back_populates="filters")
 
+    __table_args__ = (
+        Index("idx_filters_supplier_active", "supplier_id", "active"),
+        Index("idx_filters_keyword_trgm", "keyword", postgresql_using="gin", postgresql_ops={"keyword": "gin_trgm_ops"}),
+    )
+
     def __repr__(self):
         return f"<Filter(id={self.id}, keyword='{self.keyword}', supplier_id={self.supplier_id})>"
 
@@ -43,7 +54,7 @@ class Filter(Base):
 class Order(Base):
     __tablename__ = "orders"
 
-    id = Column(String(8), primary_key=True)  # Short UUID
+    id = Column(String(11), primary_key=True)  # bot/utils/order_ids.py (старые заказы — 8 hex-символов)
     text = Column(Text, nullable=False)
     status = Column(String(50), default="NEW")  # NEW, ACCEPTED, DECLINED, COMPLETED, CANCELLED
     supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=True)
@@ -52,11 +63,23 @@ class Order(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     assigned_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
+    # Полнотекстовый поиск (/search); вычисляется Postgres, в ORM не загружается
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('russian', text)", persisted=True)))
     
     # Relationships
     supplier = relationship("Supplier", back_populates="orders")
     messages = relationship("OrderMessage", back_populates="order", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("idx_orders_admin_created_at", "admin_id", "created_at"),  # статистика админа в боте
+        Index("idx_orders_status", "status"),
+        Index("idx_orders_created_at_id", "created_at", "id"),  # списки: ORDER BY created_at DESC, id DESC + курсор
+        Index("idx_orders_supplier_status", "supplier_id", "status"),
+        # поиск по тексту (ILIKE и word_similarity), нужен pg_trgm
+        Index("idx_orders_text_trgm", "text", postgresql_using="gin", postgresql_ops={"text": "gin_trgm_ops"}),
+        Index("idx_orders_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"<Order(id='{self.id}', status='{self.status}', supplier_id={self.supplier_id})>"
 
@@ -65,27 +88,164 @@ class OrderMessage(Base):
     __tablename__ = "order_messages"
 
     id = Column(Integer, primary_key=True)
-    order_id = Column(String(8), ForeignKey("orders.id"), nullable=False)
+    order_id = Column(String(11), ForeignKey("orders.id"), nullable=False)
     sender_id = Column(BigInteger, nullable=False)  # Telegram user ID
     message_text = Column(Text, nullable=False)
     message_type = Column(String(20), default="text")  # text, system, status_change
     created_at = Column(DateTime, server_default=func.now())
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('russian', message_text)", persisted=True)))
     
     # Relationships
     order = relationship("Order", back_populates="messages")
 
+    __table_args__ = (
+        Index("idx_order_messages_order_created", "order_id", "created_at", "id"),  # история заказа по страницам
+        Index("idx_order_messages_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"<OrderMessage(id={self.id}, order_id='{self.order_id}', sender_id={self.sender_id})>"
 
 
+class OrderArchive(Base):
+    # Закрытые заказы, перенесённые из orders (bot/services/archive_service.py)
+    __tablename__ = "orders_archive"
+
+    id = Column(String(11), primary_key=True)
+    text = Column(Text, nullable=False)
+    status = Column(String(50))
+    supplier_id = Column(Integer, nullable=True)  # без внешнего ключа: поставщика могут удалить позже
+    admin_id = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    assigned_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, server_default=func.now(), nullable=False)
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('russian', text)", persisted=True)))
+
+    supplier = relationship("Supplier", primaryjoin="foreign(OrderArchive.supplier_id) == Supplier.id", viewonly=True)
+    messages = relationship("OrderMessageArchive", viewonly=True)  # только чтение, как и сам архив
+
+    __table_args__ = (
+        Index("idx_orders_archive_admin_created_at", "admin_id", "created_at"),
+        Index("idx_orders_archive_text_trgm", "text", postgresql_using="gin", postgresql_ops={"text": "gin_trgm_ops"}),
+        Index("idx_orders_archive_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    def __repr__(self):
+        return f"<OrderArchive(id='{self.id}', status='{self.status}', supplier_id={self.supplier_id})>"
+
+
+class OrderMessageArchive(Base):
+    __tablename__ = "order_messages_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # id из order_messages сохраняется
+    order_id = Column(String(11), ForeignKey("orders_archive.id", ondelete="CASCADE"), nullable=False)
+    sender_id = Column(BigInteger, nullable=False)
+    message_text = Column(Text, nullable=False)
+    message_type = Column(String(20))
+    created_at = Column(DateTime)
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('russian', message_text)", persisted=True)))
+
+    __table_args__ = (
+        Index("idx_order_messages_archive_order_created", "order_id", "created_at", "id"),
+        Index("idx_order_messages_archive_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    def __repr__(self):
+        return f"<OrderMessageArchive(id={self.id}, order_id='{self.order_id}', sender_id={self.sender_id})>"
+
+
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, nullable=False)
     action = Column(String(100), nullable=False)  # order_created, order_accepted, etc.
     details = Column(Text, nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
+    # Ключ помесячного партиционирования, поэтому входит в первичный ключ (секции: PartitionService)
+    created_at = Column(DateTime, primary_key=True, server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_activity_logs_created_at_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     def __repr__(self):
         return f"<ActivityLog(id={self.id}, user_id={self.user_id}, action='{self.action}')>"
+
+
+class OrderDailyStat(Base):
+    """Rollup of order counts per creation day, status and supplier.
+
+    Maintained incrementally by OrderService in the same transaction as every
+    status change, so statistics never have to scan ``orders``.
+    """
+    __tablename__ = "order_daily_stats"
+
+    day = Column(Date, primary_key=True)  # date(orders.created_at)
+    status = Column(String(50), primary_key=True)
+    supplier_id = Column(Integer, primary_key=True, default=0)  # 0 — заказ не назначен
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<OrderDailyStat(day={self.day}, status='{self.status}', supplier_id={self.supplier_id}, count={self.count})>"
+
+
+class SupplierStat(Base):
+    """Per-supplier order counters for the profile screen and leaderboard.
+
+    Counts orders currently assigned to the supplier by status; maintained by
+    OrderService together with order_daily_stats.
+    """
+    __tablename__ = "supplier_stats"
+
+    supplier_id = Column(Integer, ForeignKey("suppliers.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    accepted = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    declined = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SupplierStat(supplier_id={self.supplier_id}, total={self.total}, completed={self.completed})>"
+
+
+class OrderLatencyBucket(Base):
+    """Hourly latency histograms (time-to-accept / time-to-complete) per supplier.
+
+    Each row is one logarithmic bucket of a mergeable sketch; any time window is
+    answered by summing bucket counts over its hours.
+    """
+    __tablename__ = "order_latency_buckets"
+
+    hour = Column(DateTime, primary_key=True)  # час перехода по часам базы (как orders.completed_at), усечён до часа
+    metric = Column(String(20), primary_key=True)  # accept, complete
+    supplier_id = Column(Integer, primary_key=True, default=0)  # 0 — без поставщика
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<OrderLatencyBucket(hour={self.hour}, metric='{self.metric}', supplier_id={self.supplier_id}, bucket={self.bucket})>"
+
+
+class ActivityHourlyStat(Base):
+    """Rollup of activity_logs: number of actions per hour, maintained on write"""
+    __tablename__ = "activity_hourly_stats"
+
+    hour = Column(DateTime, primary_key=True)  # date_trunc('hour', activity_logs.created_at)
+    action = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ActivityHourlyStat(hour={self.hour}, action='{self.action}', count={self.count})>"
+
+
+class ActivityAction(Base):
+    """Catalog of actions ever written to activity_logs"""
+    __tablename__ = "activity_actions"
+
+    action = Column(String(100), primary_key=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+    def __repr__(self):
+        return f"<ActivityAction(action='{self.action}')>"
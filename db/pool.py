@@ -0,0 +1,151 @@
+"""Пул соединений с метриками: ожидание выдачи соединения, занятые соединения, overflow, возраст соединений.
+
+Движки api и bot создаются с poolclass=InstrumentedPool и регистрируются через
+instrument_engine; снимок всех пулов процесса отдаёт pool_snapshot() (GET /debug/pool в api).
+"""
+import logging
+import time
+from typing import Dict, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+logger = logging.getLogger(__name__)
+
+SATURATION_LOG_INTERVAL = 10.0  # не чаще одной строки о насыщении пула на столько секунд
+
+_engines: Dict[str, Tuple[AsyncEngine, "PoolMetrics"]] = {}
+
+
+class PoolMetrics:
+    """Counters of one connection pool (since start or the last reset)"""
+
+    def __init__(self, name: str, slow_checkout_ms: float):
+        self.name = name
+        self.slow_checkout = slow_checkout_ms / 1000
+        self.connected_at: Dict[int, float] = {}  # id(connection record) -> время подключения (monotonic)
+        self.in_use = 0
+        self._saturation_logged_at = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.in_use_peak = self.in_use
+        self.overflow_peak = 0
+
+    def record_wait(self, pool: "InstrumentedPool", waited: float) -> None:
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.overflow_peak = max(self.overflow_peak, pool.overflow())
+        saturated = pool.checkedout() >= pool.size() + pool._max_overflow
+        if waited >= self.slow_checkout:
+            self.slow_checkouts += 1
+        if waited >= self.slow_checkout or saturated:
+            self._log_saturation(pool, waited)
+
+    def record_timeout(self, pool: "InstrumentedPool", waited: float) -> None:
+        self.timeouts += 1
+        self._log_saturation(pool, waited, force=True)
+
+    def _log_saturation(self, pool: "InstrumentedPool", waited: float, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._saturation_logged_at < SATURATION_LOG_INTERVAL:
+            return
+        self._saturation_logged_at = now
+        logger.warning(
+            "DB pool %s saturated: checkout waited %.0f ms, in use %s/%s (overflow %s), timeouts %s",
+            self.name,
+            waited * 1000,
+            pool.checkedout(),
+            pool.size() + pool._max_overflow,
+            max(pool.overflow(), 0),
+            self.timeouts,
+        )
+
+    def snapshot(self, pool: "InstrumentedPool") -> dict:
+        now = time.monotonic()
+        ages = [now - connected for connected in self.connected_at.values()]
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+            "recycle_s": pool._recycle,
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow_in_use": max(pool.overflow(), 0),
+            "in_use_peak": self.in_use_peak,
+            "overflow_peak": self.overflow_peak,
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "slow_checkouts": self.slow_checkouts,
+            "timeouts": self.timeouts,
+            "connections": len(ages),
+            "connection_age_max_s": round(max(ages), 1) if ages else 0.0,
+            "connection_age_avg_s": round(sum(ages) / len(ages), 1) if ages else 0.0,
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that measures how long a checkout waits for a free connection"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(self, time.perf_counter() - started)
+            raise
+        self.metrics.record_wait(self, time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() пересоздаёт пул — счётчики переносим
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument_engine(engine: AsyncEngine, name: str, slow_checkout_ms: float) -> PoolMetrics:
+    """Attach metrics to an engine created with poolclass=InstrumentedPool"""
+    metrics = PoolMetrics(name, slow_checkout_ms)
+    engine.sync_engine.pool.metrics = metrics
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        metrics.connected_at[id(connection_record)] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, "close")
+    def _close(dbapi_connection, connection_record):
+        metrics.connected_at.pop(id(connection_record), None)
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.in_use += 1
+        metrics.in_use_peak = max(metrics.in_use_peak, metrics.in_use)
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        metrics.in_use -= 1
+
+    _engines[name] = (engine, metrics)
+    return metrics
+
+
+def pool_snapshot(reset: bool = False) -> dict:
+    """Metrics of all instrumented pools of this process; reset=True starts a new measuring window"""
+    snapshot = {}
+    for name, (engine, metrics) in _engines.items():
+        snapshot[name] = metrics.snapshot(engine.sync_engine.pool)
+        if reset:
+            metrics.reset()
+    return snapshot
@@ -0,0 +1,87 @@
+"""CPU time of one GET /orders/ page: Pydantic + stdlib json (было) и кортежи + orjson (стало).
+
+Собирает страницу из N заказов с текстом заданной длины и поставщиком и
+прогоняет оба пути сериализации ответа так, как их выполняет FastAPI:
+
+  было:  ORM-объекты -> проверка OrderListPaginatedResponse -> dump -> json.dumps (JSONResponse)
+  стало: кортежи строк -> словари (api/serialization.py) -> orjson (ORJSONResponse)
+
+Запрос к БД одинаков для обоих путей и в замер не входит. Запуск из корня проекта:
+
+    python scripts/bench_list_serialization.py [--rows 100] [--text 2000] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from api.models.schemas import OrderListPaginatedResponse  # noqa: E402
+from api.serialization import ORDER_FIELDS, SUPPLIER_FIELDS, order_rows  # noqa: E402
+from bot.utils.order_ids import generate_order_id  # noqa: E402
+from db.models import Order, Supplier  # noqa: E402
+
+
+def make_page(rows: int, text_len: int):
+    now = datetime.utcnow()
+    supplier = Supplier(id=7, telegram_id=123456789, name="ООО «Поставщик»", active=True, role="supplier", created_at=now)
+    orders = []
+    for i in range(rows):
+        created = now - timedelta(minutes=i)
+        orders.append(Order(
+            id=generate_order_id(), text=("Позиция заказа " * (text_len // 15 + 1))[:text_len], status="ACCEPTED",
+            supplier_id=7, admin_id=42, created_at=created, updated_at=created, assigned_at=created, completed_at=None,
+        ))
+        orders[-1].supplier = supplier
+    tuples = [
+        tuple(getattr(order, field) for field in ORDER_FIELDS) + tuple(getattr(supplier, field) for field in SUPPLIER_FIELDS)
+        for order in orders
+    ]
+    return orders, tuples
+
+
+def before(orders, adapter) -> bytes:
+    content = {"items": orders, "total": len(orders), "total_exact": True, "next_cursor": None}
+    value = adapter.validate_python(content, from_attributes=True)
+    return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+
+def after(tuples) -> bytes:
+    content = {"items": order_rows(tuples), "total": len(tuples), "total_exact": True, "next_cursor": None}
+    return ORJSONResponse(content).body
+
+
+def cpu_ms(fn, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--text", type=int, default=2000, help="длина текста заказа, символов")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    orders, tuples = make_page(args.rows, args.text)
+    adapter = TypeAdapter(OrderListPaginatedResponse)
+    # Оба пути должны давать один и тот же JSON
+    assert json.loads(before(orders, adapter)) == json.loads(after(tuples))
+
+    old = cpu_ms(lambda: before(orders, adapter), args.repeat)
+    new = cpu_ms(lambda: after(tuples), args.repeat)
+    print(f"{args.rows} rows x {args.text} chars, CPU per response:")
+    print(f"  pydantic + json: {old:8.3f} ms")
+    print(f"  tuples + orjson: {new:8.3f} ms  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
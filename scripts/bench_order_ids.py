@@ -0,0 +1,66 @@
+"""Сравнение ID заказов: старые (8 hex из uuid4) и новые (bot/utils/order_ids.py).
+
+Вставляет по N строк в две временные таблицы с первичным ключом varchar, как у
+orders, и печатает скорость вставки и размер индекса первичного ключа (случайные
+ключи расщепляют страницы B-дерева по всему индексу, упорядоченные — только правую).
+Ничего не меняет в рабочих таблицах. Запуск из корня проекта:
+
+    python scripts/bench_order_ids.py [--rows 50000] [--batch 1]
+
+Столкновения старых ID не роняют прогон (ON CONFLICT DO NOTHING), а считаются.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import asyncpg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.config import settings  # noqa: E402
+from bot.utils.order_ids import generate_order_id  # noqa: E402
+
+
+def legacy_id() -> str:
+    return str(uuid.uuid4())[:8].upper()
+
+
+async def bench(conn, name: str, make_id, rows: int, batch: int) -> None:
+    table = f"bench_ids_{name}"
+    await conn.execute(f"CREATE TEMP TABLE {table} (id varchar(11) PRIMARY KEY, text text NOT NULL)")
+    started = time.perf_counter()
+    for _ in range(0, rows, batch):
+        await conn.executemany(
+            f"INSERT INTO {table} (id, text) VALUES ($1, $2) ON CONFLICT DO NOTHING",
+            [(make_id(), "benchmark order") for _ in range(batch)],
+        )
+    elapsed = time.perf_counter() - started
+    collisions = rows - await conn.fetchval(f"SELECT count(*) FROM {table}")
+    index_size = await conn.fetchval(f"SELECT pg_relation_size('{table}_pkey')")
+    leaf_pages = index_size // 8192
+    print(
+        f"{name:>8}: {rows / elapsed:9.0f} rows/s, pkey {index_size / 1024:8.0f} KiB "
+        f"({leaf_pages} pages, {rows / max(leaf_pages, 1):.0f} keys/page), collisions: {collisions}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch", type=int, default=1, help="rows per executemany (1 = как create_order)")
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(settings.database_url.replace("postgresql+asyncpg://", "postgresql://"))
+    try:
+        # Случайные ID сначала, чтобы кэш не был прогрет в их пользу
+        await bench(conn, "uuid_hex", legacy_id, args.rows, args.batch)
+        await bench(conn, "short_id", generate_order_id, args.rows, args.batch)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+"""Test harness: a disposable Postgres database, migrated to head and seeded.
+
+TEST_POSTGRES_DB names an existing throwaway database on the server given by
+POSTGRES_HOST / POSTGRES_PORT / POSTGRES_USER / POSTGRES_PASSWORD. Its tables
+are truncated and re-seeded on every run. Without it all tests are skipped.
+
+    TEST_POSTGRES_DB=supply_test python -m pytest -q
+"""
+import os
+
+import pytest
+
+TEST_DB = os.environ.get("TEST_POSTGRES_DB")
+if TEST_DB:
+    os.environ["POSTGRES_DB"] = TEST_DB  # до первого импорта api.config / bot.config
+os.environ.setdefault("BOT_TOKEN", "test")
+
+import httpx  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+
+# Объём подобран так, чтобы планировщик предпочитал индексы последовательному чтению
+SEED_SUPPLIERS = 50
+SEED_FILTERS_PER_SUPPLIER = 100
+SEED_ORDERS = 50_000
+SEED_MESSAGES_PER_ORDER = 2
+SEED_ACTIVITY_DAYS = 20
+# Архив — почти год более старых закрытых заказов: и архивные индексы, и длинная история в rollup
+SEED_ARCHIVED_ORDERS = 60_000
+SEED_ARCHIVE_SPACING_MINUTES = 8
+
+SEED_SQL = [
+    "TRUNCATE suppliers, filters, orders, order_messages, orders_archive, order_messages_archive, "
+    "activity_logs, order_daily_stats, supplier_stats, order_latency_buckets, "
+    "activity_hourly_stats, activity_actions RESTART IDENTITY CASCADE",
+    f"""
+    INSERT INTO suppliers (telegram_id, name, active, role)
+    SELECT 1000 + i, 'Поставщик ' || i, i % 10 <> 0, 'supplier' FROM generate_series(1, {SEED_SUPPLIERS}) i
+    """,
+    f"""
+    INSERT INTO filters (keyword, supplier_id, active, priority)
+    SELECT 'ключ' || i, i % {SEED_SUPPLIERS} + 1, i % 3 <> 0, i % 5
+    FROM generate_series(1, {SEED_SUPPLIERS * SEED_FILTERS_PER_SUPPLIER}) i
+    """,
+    # Статусы как в живой базе: в основном закрытые заказы, открытых и отклонённых мало
+    f"""
+    INSERT INTO orders (id, text, status, supplier_id, admin_id, created_at, updated_at, assigned_at, completed_at)
+    SELECT
+        lpad(upper(to_hex(i)), 11, '0'),
+        'Позиция ' || i || ' ' || md5(i::text),
+        status,
+        CASE WHEN status = 'NEW' THEN NULL ELSE i % {SEED_SUPPLIERS} + 1 END,
+        1 + i % 3,
+        created_at, created_at, created_at,
+        CASE WHEN status = 'COMPLETED' THEN created_at + interval '1 hour' END
+    FROM generate_series(1, {SEED_ORDERS}) i,
+    LATERAL (SELECT now() - i * interval '1 minute' AS created_at) t,
+    LATERAL (SELECT CASE
+        WHEN i % 100 = 0 THEN 'DECLINED'
+        WHEN i % 100 < 3 THEN 'NEW'
+        WHEN i % 100 < 6 THEN 'ASSIGNED'
+        WHEN i % 100 < 10 THEN 'ACCEPTED'
+        WHEN i % 100 < 15 THEN 'CANCELLED'
+        ELSE 'COMPLETED' END AS status) s
+    """,
+    f"""
+    INSERT INTO order_messages (order_id, sender_id, message_text, message_type, created_at)
+    SELECT o.id, o.admin_id, 'Сообщение ' || n, 'text', o.created_at + n * interval '1 minute'
+    FROM orders o, generate_series(1, {SEED_MESSAGES_PER_ORDER}) n
+    """,
+    f"""
+    INSERT INTO orders_archive (id, text, status, supplier_id, admin_id, created_at, updated_at, assigned_at, completed_at)
+    SELECT
+        lpad(upper(to_hex(i)), 11, '0'),
+        'Позиция ' || i || ' ' || md5(i::text),
+        status,
+        CASE WHEN status = 'COMPLETED' THEN i % {SEED_SUPPLIERS} + 1 END,
+        1 + i % 3,
+        created_at, created_at, created_at,
+        CASE WHEN status = 'COMPLETED' THEN created_at + interval '1 hour' END
+    FROM generate_series({SEED_ORDERS + 1}, {SEED_ORDERS + SEED_ARCHIVED_ORDERS}) i,
+    LATERAL (SELECT now() - ({SEED_ORDERS} + (i - {SEED_ORDERS}) * {SEED_ARCHIVE_SPACING_MINUTES}) * interval '1 minute'
+             AS created_at) t,
+    LATERAL (SELECT CASE WHEN i % 10 = 0 THEN 'CANCELLED' ELSE 'COMPLETED' END AS status) s
+    """,
+    f"""
+    INSERT INTO order_messages_archive (id, order_id, sender_id, message_text, message_type, created_at)
+    SELECT {SEED_ORDERS * SEED_MESSAGES_PER_ORDER} + row_number() OVER (ORDER BY o.id, n),
+           o.id, o.admin_id, 'Сообщение ' || n, 'text', o.created_at + n * interval '1 minute'
+    FROM orders_archive o, generate_series(1, {SEED_MESSAGES_PER_ORDER}) n
+    """,
+    # id сообщений в архиве — из той же последовательности, что и в order_messages
+    "SELECT setval(pg_get_serial_sequence('order_messages', 'id'), (SELECT max(id) FROM order_messages_archive))",
+    f"""
+    INSERT INTO activity_logs (user_id, action, details, created_at)
+    SELECT 1 + i % 7, (ARRAY['order_created', 'order_accepted', 'order_completed'])[1 + i % 3], NULL,
+           now() - i * interval '1 minute'
+    FROM generate_series(1, {SEED_ACTIVITY_DAYS * 24 * 60}) i
+    """,
+]
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DB:
+        return
+    skip = pytest.mark.skip(reason="TEST_POSTGRES_DB is not set (tests need a disposable Postgres database)")
+    for item in items:
+        item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database():
+    """The app's engine on the test database, migrated to head, seeded and analyzed"""
+    from api.database import engine, Session
+    from db.migrate import upgrade_database
+    from bot.services import PartitionService, RollupService, ActivityService
+
+    await upgrade_database(engine)
+    async with Session() as session:
+        await PartitionService(session).ensure_partitions()
+    async with engine.begin() as conn:
+        for statement in SEED_SQL:
+            await conn.execute(text(statement))
+    async with Session() as session:
+        await RollupService(session).rebuild()
+        await ActivityService(session).rebuild()
+    # VACUUM, не только ANALYZE: строки сида ещё в pending list GIN-индексов, и с ним
+    # планировщик оценивает триграммный поиск дороже последовательного чтения
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(database, monkeypatch):
+    """API client without lifespan (no Redis); activity events are queued as with the running sink"""
+    from api.database import Session
+    from api.main import app
+    from bot.services import activity_service
+
+    monkeypatch.setattr(activity_service, "_sink", activity_service.ActivitySink(Session))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def statements(database):
+    """SQL statements sent to Postgres while the test runs (clear() before the measured call)"""
+    issued = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        issued.append(statement)
+
+    event.listen(database.sync_engine, "before_cursor_execute", record)
+    yield issued
+    event.remove(database.sync_engine, "before_cursor_execute", record)
@@ -0,0 +1,64 @@
+"""Archived orders keep their chat: reads fall back to order_messages_archive."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from db.models import Order, OrderArchive
+
+
+pytestmark = pytest.mark.anyio
+
+# Граница архивации далеко в прошлом: архивируется только заказ теста, сид не трогается
+ARCHIVE_AFTER_DAYS = 20 * 365
+
+
+@pytest.fixture
+async def archived_order(client):
+    from api.database import Session
+    from bot.services import ArchiveService
+
+    order = (await client.post("/orders/", json={"text": "Архивный заказ", "admin_id": 1})).json()
+    for i in range(12):
+        response = await client.post(f"/orders/{order['id']}/messages", params={"message_text": f"Сообщение {i}"})
+        assert response.status_code == 200
+    async with Session() as session:
+        await session.execute(
+            update(Order)
+            .where(Order.id == order["id"])
+            .values(status="COMPLETED", completed_at=datetime(2000, 1, 1), updated_at=datetime(2000, 1, 1))
+        )
+        await session.commit()
+        assert await ArchiveService(session).archive_closed(ARCHIVE_AFTER_DAYS) == 1
+        assert await session.get(OrderArchive, order["id"]) is not None
+    return order["id"]
+
+
+async def test_get_order_includes_archived_messages(client, archived_order):
+    response = await client.get(f"/orders/{archived_order}")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "COMPLETED"
+    assert [m["message_text"] for m in body["messages"]] == [f"Сообщение {i}" for i in range(12)]
+
+    response = await client.get(f"/orders/{archived_order}/messages")
+    assert response.status_code == 200
+    assert len(response.json()) == 12
+
+
+async def test_message_service_reads_archive(archived_order):
+    from api.database import Session
+    from bot.services import MessageService
+
+    async with Session() as session:
+        service = MessageService(session)
+        assert await service.count_messages(archived_order) == 12
+        last = await service.get_last_messages(archived_order, 5, message_type="text")
+        assert [m.message_text for m in last] == [f"Сообщение {i}" for i in range(7, 12)]
+
+        newest, has_older, has_newer = await service.get_history_page(archived_order)
+        assert [m.message_text for m in newest] == [f"Сообщение {i}" for i in range(2, 12)]
+        assert has_older and not has_newer
+        older, has_older, has_newer = await service.get_history_page(archived_order, before_id=newest[0].id)
+        assert [m.message_text for m in older] == ["Сообщение 0", "Сообщение 1"]
+        assert not has_older and has_newer
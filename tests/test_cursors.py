@@ -0,0 +1,52 @@
+"""Malformed keyset cursors are rejected with 400, never passed on to Postgres."""
+import pytest
+
+from bot.services.pagination import encode_cursor
+
+
+pytestmark = pytest.mark.anyio
+
+CREATED_AT = "2026-01-01T00:00:00"
+WRONG_ID = pytest.mark.parametrize("row_id", ["abc", 1.5, True, None, [1], {"id": 1}])
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([CREATED_AT]), encode_cursor([1, "00000000001"])])
+async def test_orders_malformed(client, cursor):
+    response = await client.get("/orders/", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("row_id", [1, 1.5, None, [1], {"id": 1}])
+async def test_orders_wrong_id_type(client, row_id):
+    response = await client.get("/orders/", params={"cursor": encode_cursor([CREATED_AT, row_id])})
+    assert response.status_code == 400
+
+
+@WRONG_ID
+async def test_activity_wrong_id_type(client, row_id):
+    response = await client.get("/activity/", params={"cursor": encode_cursor([CREATED_AT, row_id])})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["orders", "0.5", CREATED_AT, "00000000001"],
+        ["orders", 0.5, CREATED_AT, 1],
+        ["orders", None, CREATED_AT, "00000000001"],
+        ["orders", 0.5, 12, "00000000001"],
+        ["nowhere", 0.5, CREATED_AT, "00000000001"],
+    ],
+)
+async def test_search_wrong_types(client, values):
+    response = await client.get("/orders/search", params={"q": "Позиция", "cursor": encode_cursor(values)})
+    assert response.status_code == 400
+
+
+async def test_valid_cursors_page(client):
+    response = await client.get("/orders/", params={"cursor": encode_cursor([CREATED_AT, "00000000001"])})
+    assert response.status_code == 200
+    response = await client.get(
+        "/orders/search", params={"q": "Позиция", "cursor": encode_cursor(["orders", 1, CREATED_AT, "00000000001"])}
+    )
+    assert response.status_code == 200
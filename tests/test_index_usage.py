@@ -0,0 +1,205 @@
+"""EXPLAIN checks: the statements the app actually sends use the hot-path indexes.
+
+Each test runs a real code path (an API request, or a service call as the bot
+makes it), records the SELECTs it sends and EXPLAINs them with the same
+parameters, so a change in the service code is checked as well. Indexes are
+from 0003_hot_path_indexes and the migrations that replaced or extended them:
+0004 (trigram), 0005 (full text), 0006/0008/0010 (keyset), 0011 (archive).
+"""
+import json
+from typing import Awaitable, Callable, Iterator, List, Set
+
+import pytest
+from sqlalchemy import event, select
+
+from db.models import OrderArchive
+
+
+pytestmark = pytest.mark.anyio
+
+# md5('1') — последнее слово в тексте сидового заказа 1 (см. SEED_SQL в conftest.py)
+HOT_TOKEN = "c4ca4238a0b923820dcc509a6f75849b"
+TRIGRAM_QUERY = HOT_TOKEN[:8]
+SEED_ORDER_ID = "00000000457"
+
+
+async def explain_issued(database, action: Callable[[], Awaitable]) -> List[dict]:
+    """Plans of the SELECTs sent to Postgres while `action()` runs"""
+    issued = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            issued.append((statement, parameters))
+
+    event.listen(database.sync_engine, "before_cursor_execute", record)
+    try:
+        await action()
+    finally:
+        event.remove(database.sync_engine, "before_cursor_execute", record)
+
+    plans = []
+    async with database.connect() as conn:
+        for statement, parameters in issued:
+            plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plans.append(plan[0]["Plan"])
+    assert plans, "the code path sent no SELECT"
+    return plans
+
+
+def plan_nodes(plans: List[dict]) -> Iterator[dict]:
+    for node in plans:
+        yield node
+        yield from plan_nodes(node.get("Plans", []))
+
+
+def index_names(plans: List[dict]) -> Set[str]:
+    return {node["Index Name"] for node in plan_nodes(plans) if "Index Name" in node}
+
+
+def seq_scanned(plans: List[dict]) -> Set[str]:
+    return {node["Relation Name"] for node in plan_nodes(plans) if node["Node Type"] == "Seq Scan"}
+
+
+def relations(plans: List[dict]) -> Set[str]:
+    return {node["Relation Name"] for node in plan_nodes(plans) if "Relation Name" in node}
+
+
+async def api_plans(client, database, url: str) -> List[dict]:
+    async def request():
+        response = await client.get(url)
+        assert response.status_code == 200, response.text
+
+    return await explain_issued(database, request)
+
+
+async def service_plans(database, call) -> List[dict]:
+    """Plans of `call(session)`, run in its own session like a bot handler"""
+    from api.database import Session
+
+    async def run():
+        async with Session() as session:
+            await call(session)
+
+    return await explain_issued(database, run)
+
+
+# --- списки и поиск заказов (API)
+
+async def test_orders_list_page(client, database):
+    plans = await api_plans(client, database, "/orders/")
+    assert "idx_orders_created_at_id" in index_names(plans)
+    assert "orders" not in seq_scanned(plans)
+
+
+async def test_orders_count_by_status(client, database):
+    plans = await api_plans(client, database, "/orders/?status=DECLINED&include_total=true")
+    assert "idx_orders_status" in index_names(plans)
+    assert "orders" not in seq_scanned(plans)
+
+
+async def test_orders_text_filter(client, database):
+    # search_condition: ILIKE и word similarity по триграммному индексу
+    plans = await api_plans(client, database, f"/orders/?search={TRIGRAM_QUERY}&include_total=true")
+    assert "idx_orders_text_trgm" in index_names(plans)
+    assert "orders" not in seq_scanned(plans)
+
+
+async def test_ranked_search(client, database):
+    # OrderService.search_orders: горячая таблица, затем архив (совпадений меньше страницы)
+    plans = await api_plans(client, database, f"/orders/search?q={TRIGRAM_QUERY}")
+    assert {"idx_orders_text_trgm", "idx_orders_archive_text_trgm"} <= index_names(plans)
+    assert not {"orders", "orders_archive"} & seq_scanned(plans)
+
+
+async def test_full_text_search(client, database):
+    plans = await api_plans(client, database, f"/search/?q={HOT_TOKEN}")
+    assert {
+        "idx_orders_search_vector",
+        "idx_order_messages_search_vector",
+        "idx_orders_archive_search_vector",
+        "idx_order_messages_archive_search_vector",
+    } <= index_names(plans)
+    assert not {"orders", "order_messages", "orders_archive", "order_messages_archive"} & seq_scanned(plans)
+
+
+# --- статистика: только rollup-таблицы, окно дней — диапазоном по ключу
+
+@pytest.mark.parametrize(
+    "url", ["/stats/summary?period=week&days=7", "/stats/?period=week", "/stats/orders/daily?days=7"]
+)
+async def test_stats_from_rollup(client, database, url):
+    plans = await api_plans(client, database, url)
+    assert "order_daily_stats_pkey" in index_names(plans)
+    assert not {"orders", "orders_archive"} & relations(plans)
+
+
+async def test_supplier_performance_from_counters(client, database):
+    # Без Redis: supplier_stats целиком (по строке на поставщика), заказы не читаются
+    plans = await api_plans(client, database, "/stats/suppliers/performance")
+    assert "supplier_stats" in relations(plans)
+    assert not {"orders", "orders_archive"} & relations(plans)
+
+
+async def test_admin_order_stats(database):
+    from bot.services import StatsService
+
+    plans = await service_plans(database, lambda session: StatsService(session).order_stats("week", admin_id=1))
+    assert {"idx_orders_admin_created_at", "idx_orders_archive_admin_created_at"} <= index_names(plans)
+
+
+# --- журнал действий
+
+async def test_recent_activity(client, database):
+    plans = await api_plans(client, database, "/activity/recent")
+    names = index_names(plans)
+    assert names and all(name.endswith("created_at_id_idx") for name in names)
+    assert not seq_scanned(plans)
+
+
+# --- чтения бота
+
+async def test_supplier_orders_by_status(database):
+    from bot.services import OrderService
+
+    plans = await service_plans(
+        database, lambda session: OrderService(session).get_orders_by_supplier(7, "ACCEPTED")
+    )
+    assert "idx_orders_supplier_status" in index_names(plans)
+    assert "orders" not in seq_scanned(plans)
+
+
+async def test_supplier_filters(database):
+    from bot.services import FilterService
+
+    plans = await service_plans(database, lambda session: FilterService(session).get_filters_by_supplier(7))
+    assert "idx_filters_supplier_active" in index_names(plans)
+
+
+async def read_history(session, order_id: str) -> None:
+    """What the bot's status and history views read for one order"""
+    from bot.services import MessageService
+
+    service = MessageService(session)
+    await service.count_messages(order_id)
+    await service.get_last_messages(order_id, 5, message_type="text")
+    messages, _has_older, _has_newer = await service.get_history_page(order_id, limit=1)
+    await service.get_history_page(order_id, limit=1, before_id=messages[0].id)
+
+
+async def test_order_history(database):
+    plans = await service_plans(database, lambda session: read_history(session, SEED_ORDER_ID))
+    assert index_names(plans) <= {"idx_order_messages_order_created", "order_messages_pkey"}
+    assert "idx_order_messages_order_created" in index_names(plans)
+    assert "order_messages" not in seq_scanned(plans)
+
+
+async def test_archived_order_history(database):
+    from api.database import Session
+
+    async with Session() as session:
+        order_id = await session.scalar(select(OrderArchive.id).order_by(OrderArchive.id).limit(1))
+    plans = await service_plans(database, lambda session: read_history(session, order_id))
+    assert "idx_order_messages_archive_order_created" in index_names(plans)
+    assert not {"order_messages", "order_messages_archive"} & seq_scanned(plans)
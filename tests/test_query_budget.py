@@ -0,0 +1,81 @@
+"""Statement budgets of the mutation endpoints (UPDATE/INSERT ... RETURNING, set-based bulk actions).
+
+Counted with the activity sink queueing events, as in the running API; the
+counts include rollup upserts and selectin loads of the supplier.
+"""
+import pytest
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_order(client, text="Бюджет запросов") -> dict:
+    response = await client.post("/orders/", json={"text": text, "admin_id": 1})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_create_order(client, statements):
+    statements.clear()
+    order = await create_order(client)
+    # поставщики с фильтрами (2: выборка + selectin фильтров), INSERT ... RETURNING, счётчики
+    assert order["status"] == "NEW"
+    assert len(statements) == 4, statements
+
+
+async def test_update_order(client, statements):
+    order = await create_order(client)
+    statements.clear()
+    response = await client.put(f"/orders/{order['id']}", json={"status": "CANCELLED"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "CANCELLED"
+    # UPDATE ... RETURNING (с блокирующим подзапросом) и счётчики статистики
+    assert len(statements) == 2, statements
+
+
+async def test_update_missing_order(client, statements):
+    statements.clear()
+    response = await client.put("/orders/NOSUCHORDER", json={"status": "CANCELLED"})
+    assert response.status_code == 404
+    assert len(statements) == 1, statements
+
+
+async def test_delete_order(client, statements):
+    order = await create_order(client)
+    statements.clear()
+    response = await client.delete(f"/orders/{order['id']}")
+    assert response.status_code == 200
+    # блокировка строки, DELETE сообщений, DELETE заказа, счётчики — без отдельного чтения заказа
+    assert len(statements) == 4, statements
+
+    statements.clear()
+    response = await client.delete(f"/orders/{order['id']}")
+    assert response.status_code == 404
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.parametrize("count", [2, 10])
+async def test_bulk_cancel_is_set_based(client, statements, count):
+    ids = [(await create_order(client, f"Массовая отмена {i}"))["id"] for i in range(count)]
+    statements.clear()
+    response = await client.post("/orders/bulk", json={"ids": ids, "action": "cancel"})
+    assert response.status_code == 200
+    assert response.json()["processed"] == count
+    # блокировка, UPDATE, счётчики — столько же при любом числе заказов
+    assert len(statements) == 3, statements
+
+
+async def test_update_supplier(client, statements):
+    statements.clear()
+    response = await client.put("/suppliers/3", json={"name": "Переименован", "active": True, "role": "supplier"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Переименован"
+    assert len(statements) == 1, statements
+
+
+async def test_update_filter(client, statements):
+    statements.clear()
+    response = await client.put("/filters/5", json={"keyword": "новый ключ", "priority": 3})
+    assert response.status_code == 200
+    assert response.json()["keyword"] == "новый ключ"
+    assert len(statements) == 1, statements